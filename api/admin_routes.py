@@ -5,6 +5,11 @@ from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from fastapi.responses import JSONResponse
 from fastapi.templating import Jinja2Templates
 
+from app.providers.health import get_provider_health
+from app.providers.http import get_http_stats
+from app.providers.rate_limit import get_rate_limiter
+from app.providers.routing import get_provider_router
+from app.providers.selector import get_bars_cache_stats, get_coalescing_stats, get_swr_stats
 from core.repositories.sentiment_settings import (
     DEFAULT_SENTIMENT_SETTINGS,
     SCOPES,
@@ -12,6 +17,10 @@ from core.repositories.sentiment_settings import (
     is_local_or_dev_env,
 )
 from core.repositories.trading_tactics import TradingTacticsRepository
+from core.storage.db import get_pool_stats
+from core.storage.maintenance import get_maintenance_scheduler
+from core.storage.query_stats import QUERY_STATS
+from core.storage.write_behind import get_write_behind
 
 router = APIRouter()
 templates = Jinja2Templates(directory="api/templates")
@@ -155,3 +164,85 @@ def delete_tactic(tactic_id: str, _: str = Depends(require_admin)):
         return {"ok": True, "data": {"id": tactic_id, "deleted": True}}
     except Exception as exc:
         return JSONResponse(status_code=500, content={"ok": False, "error": str(exc)})
+
+
+@router.get("/api/db/pool")
+def get_db_pool_stats(_: str = Depends(require_admin)):
+    try:
+        return {"ok": True, "data": get_pool_stats()}
+    except Exception as exc:
+        return JSONResponse(status_code=500, content={"ok": False, "error": str(exc)})
+
+
+@router.get("/api/db/queries")
+def get_db_query_stats(
+    limit: int = 50,
+    order_by: str = "total_ms",
+    _: str = Depends(require_admin),
+):
+    try:
+        return {"ok": True, "data": QUERY_STATS.snapshot(limit=limit, order_by=order_by)}
+    except Exception as exc:
+        return JSONResponse(status_code=500, content={"ok": False, "error": str(exc)})
+
+
+@router.post("/api/db/queries/reset")
+def reset_db_query_stats(_: str = Depends(require_admin)):
+    QUERY_STATS.reset()
+    return {"ok": True}
+
+
+@router.get("/api/db/write-behind")
+def get_write_behind_stats(_: str = Depends(require_admin)):
+    try:
+        return {"ok": True, "data": get_write_behind().stats()}
+    except Exception as exc:
+        return JSONResponse(status_code=500, content={"ok": False, "error": str(exc)})
+
+
+@router.get("/api/http/clients")
+def get_http_client_stats(_: str = Depends(require_admin)):
+    return {"ok": True, "data": get_http_stats()}
+
+
+@router.get("/api/providers/coalescing")
+def get_provider_coalescing_stats(_: str = Depends(require_admin)):
+    return {"ok": True, "data": get_coalescing_stats()}
+
+
+@router.get("/api/providers/bars-cache")
+def get_provider_bars_cache_stats(_: str = Depends(require_admin)):
+    return {"ok": True, "data": get_bars_cache_stats()}
+
+
+@router.get("/api/providers/swr")
+def get_provider_swr_stats(_: str = Depends(require_admin)):
+    return {"ok": True, "data": get_swr_stats()}
+
+
+@router.get("/api/providers/rate-limits")
+def get_provider_rate_limits(_: str = Depends(require_admin)):
+    return {"ok": True, "data": get_rate_limiter().stats()}
+
+
+@router.get("/api/providers/health")
+def get_provider_health_status(_: str = Depends(require_admin)):
+    return {"ok": True, "data": get_provider_health().snapshot()}
+
+
+@router.get("/api/providers/routing")
+def get_provider_routing_scores(_: str = Depends(require_admin)):
+    return {"ok": True, "data": get_provider_router().scores()}
+
+
+@router.get("/api/db/maintenance")
+def get_db_maintenance(_: str = Depends(require_admin)):
+    return {"ok": True, "data": get_maintenance_scheduler().status()}
+
+
+@router.post("/api/db/maintenance/run")
+def run_db_maintenance(_: str = Depends(require_admin)):
+    try:
+        return {"ok": True, "data": get_maintenance_scheduler().run_now()}
+    except Exception as exc:
+        return JSONResponse(status_code=500, content={"ok": False, "error": str(exc)})
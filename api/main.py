@@ -21,15 +21,24 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
 from api.admin_routes import router as admin_router
-from app.providers.selector import get_bars_with_fallback, get_quote_with_fallback
+from app.providers.bar_series import BarSeries
+from app.providers.deadline import in_context, with_deadline
+from app.providers.http import close_http_clients
+from app.providers.selector import (
+    get_bars_batch_with_fallback,
+    get_bars_with_fallback,
+    get_quote_with_fallback,
+    get_quotes_with_fallback,
+)
 from app.providers.twelvedata import ProviderError, TwelveDataClient
 from app.ws.twelvedata_ws import get_ws_client
 from app.services.basic_signal import compute_basic_signal
-from app.services.scanner import build_scanner_row, rank_buy_opportunity
+from app.services.scanner import build_scanner_row, rank_buy_opportunity, warm_scanner_universe
 from app.services.trade_signal import compute_trade_signal
-from app.validation.market_data import ValidationError, validate_bars
+from app.validation.market_data import ValidationError
 from core.config import get_config, initialise_config
 from core.repositories.curated_datasets import CuratedDatasetsRepository
+from core.repositories.latest_quotes import LatestQuotesRepository
 from core.repositories.monitor_positions import MonitorPositionsRepository
 from core.repositories.paper_trading import PaperTradingRepository
 from core.repositories.strategies_dashboard import StrategiesDashboardRepository
@@ -39,7 +48,7 @@ from core.repositories.scanner_source_controls import (
 )
 from core.repositories.scanner_connectors import ScannerConnectorsRepository
 from core.repositories.scanner_sources import ScannerSourceBreakdownsRepository
-from core.strategies.backtest import run_backtest
+from core.strategies.backtest import run_backtest, run_backtest_archive
 from core.strategies.library import STRATEGY_LIBRARY, strategy_by_id, strategy_list
 from core.scanners.connectors.registry import get_default_connector_registry, registry_by_group
 from core.scanners.pipeline import fetch_items
@@ -53,7 +62,10 @@ from core.papertrading.engine import (
     ROTATE_N,
     PaperTradingEngine,
 )
-from core.storage.db import DB_DRIVER_MARKER, check_db_connectivity, get_connection, init_db
+from core.storage.bar_archive import archive_enabled
+from core.storage.db import DB_DRIVER_MARKER, check_db_connectivity, close_pools, get_connection, init_db
+from core.storage.maintenance import start_maintenance_scheduler, stop_maintenance_scheduler
+from core.storage.write_behind import close_write_behind, get_write_behind
 
 logger = logging.getLogger(__name__)
 
@@ -76,6 +88,7 @@ _BATCH_CACHE: dict[str, tuple[float, Any]] = {}
 _SCANNER_UNIVERSE_PATH = BASE_DIR / "app" / "data" / "universe.json"
 _SCANNER_UNIVERSE_CACHE: Optional[List[Dict[str, Any]]] = None
 _curated_repo = CuratedDatasetsRepository()
+_latest_quotes_repo = LatestQuotesRepository()
 _monitor_repo = MonitorPositionsRepository()
 _paper_repo = PaperTradingRepository()
 _paper_engine = PaperTradingEngine(_paper_repo)
@@ -538,7 +551,7 @@ def _save_scanner_breakdown(symbol: str, scanner_type: str, row: Dict[str, Any])
         "sources": sources,
         "totals": _recompute_source_totals(sources),
     }
-    _scanner_sources_repo.insert_breakdown(symbol=symbol, scanner_type=scanner_type, payload=payload)
+    _scanner_sources_repo.insert_breakdown(symbol=symbol, scanner_type=scanner_type, payload=payload, deferred=True)
 
 
 def _strategy_instruction_to_payload(instruction: str, preset_id: Optional[str] = None) -> Dict[str, Any]:
@@ -647,6 +660,10 @@ async def startup() -> None:
         await ws_client.start()
     except Exception as exc:
         logger.warning("ws startup failed: %s", exc)
+    try:
+        start_maintenance_scheduler()
+    except Exception as exc:
+        logger.warning("maintenance scheduler startup failed: %s", exc)
     print(f"DB_DRIVER={DB_DRIVER_MARKER}")
 
 
@@ -656,6 +673,22 @@ async def shutdown() -> None:
         await get_ws_client().stop()
     except Exception:
         pass
+    try:
+        stop_maintenance_scheduler()
+    except Exception:
+        pass
+    try:
+        close_http_clients()
+    except Exception:
+        pass
+    try:
+        close_write_behind()
+    except Exception as exc:
+        logger.warning("write-behind flush on shutdown failed: %s", exc)
+    try:
+        close_pools()
+    except Exception:
+        pass
 
 
 @app.get("/healthz")
@@ -1201,15 +1234,34 @@ def backtest_run(symbol: str, strategy_id: str, interval: str = "1day", lookback
         strategy_payload = strategy_row.get("payload") if isinstance(strategy_row.get("payload"), dict) else {}
         strategy_meta = {"id": strategy_row.get("id"), "name": strategy_row.get("name"), "group": strategy_row.get("group")}
 
+    window = max(50, min(int(lookback), 2000))
+    if archive_enabled():
+        try:
+            archived = run_backtest_archive(
+                strategy_payload,
+                symbol_value,
+                interval,
+                limit=window,
+                min_bars=window,
+                max_age_seconds=int(get_config().scanner_bars_ttl_seconds),
+            )
+        except Exception as exc:
+            logger.warning("backtest_archive_read_failed symbol=%s error=%s", symbol_value, exc)
+            archived = None
+        if archived is not None:
+            return {
+                "ok": True,
+                "symbol": symbol_value,
+                "strategy": strategy_meta,
+                "provider": "archive",
+                "interval": interval,
+                "lookback": lookback,
+                "metrics": archived,
+            }
+
     try:
-        bars_result = get_bars_with_fallback(symbol=symbol_value, interval=interval, outputsize=max(50, min(int(lookback), 2000)))
-        bars_data: List[Dict[str, Any]] = []
-        for bar in bars_result.bars or []:
-            if hasattr(bar, "model_dump"):
-                bars_data.append(bar.model_dump(mode="json"))
-            elif isinstance(bar, dict):
-                bars_data.append(bar)
-        metrics = run_backtest(strategy_payload=strategy_payload, bars=bars_data)
+        bars_result = get_bars_with_fallback(symbol=symbol_value, interval=interval, outputsize=window)
+        metrics = run_backtest(strategy_payload=strategy_payload, bars=bars_result.bars)
         return {
             "ok": True,
             "symbol": symbol_value,
@@ -1236,8 +1288,8 @@ def config_view():
 
 @app.get("/debug/init-db")
 def force_init():
-    init_db()
-    return {"status": "init_db executed"}
+    applied = init_db(force=True)
+    return {"status": "init_db executed", "applied_migrations": applied}
 
 
 def _mask(s: str) -> str:
@@ -1270,6 +1322,7 @@ def debug_keys():
 # -----------------------------------------------------------------------------
 
 @app.get("/market/quote")
+@with_deadline("quote", 8.0)
 def market_quote(symbol: str):
     try:
         cfg = get_config()
@@ -1278,6 +1331,7 @@ def market_quote(symbol: str):
             "provider": result.provider,
             "symbol": symbol.upper(),
             "quote": result.quote.model_dump(mode="json"),
+            "stale_seconds": result.stale_seconds,
         }
     except (ProviderError, ValidationError, ValueError) as exc:
         return JSONResponse(
@@ -1286,19 +1340,13 @@ def market_quote(symbol: str):
         )
 
 
-def _bars_to_json(bars: list[Any]) -> list[Any]:
-    out: list[Any] = []
-    for b in bars or []:
-        if hasattr(b, "model_dump"):
-            out.append(b.model_dump(mode="json"))
-        elif isinstance(b, dict):
-            out.append(b)
-        else:
-            out.append(b)
-    return out
+def _bars_to_json(bars: Any) -> list[dict[str, Any]]:
+    # Bars stay columnar through the selector and signals; this is the only place rows become dicts.
+    return BarSeries.coerce(bars).to_dicts()
 
 
 @app.get("/market/bars")
+@with_deadline("bars", 15.0)
 def market_bars(symbol: str, interval: str = "1day", outputsize: int = 500):
     try:
         result = get_bars_with_fallback(symbol=symbol, interval=interval, outputsize=outputsize)
@@ -1307,7 +1355,8 @@ def market_bars(symbol: str, interval: str = "1day", outputsize: int = 500):
             "symbol": symbol.upper(),
             "interval": interval,
             "outputsize": outputsize,
-            "bars": _bars_to_json(result.bars or []),
+            "bars": _bars_to_json(result.bars),
+            "stale_seconds": result.stale_seconds,
         }
     except (ProviderError, ValidationError, ValueError) as exc:
         return JSONResponse(
@@ -1341,7 +1390,7 @@ def provider_twelvedata_bars(symbol: str, interval: str = "1day", outputsize: in
             "symbol": symbol.upper(),
             "interval": interval,
             "outputsize": outputsize,
-            "bars": _bars_to_json(result.bars or []),
+            "bars": _bars_to_json(result.bars),
         }
     except (ProviderError, ValidationError, ValueError) as exc:
         return JSONResponse(
@@ -1374,29 +1423,14 @@ def provider_twelvedata_quote(symbol: str):
 def _compute_basic_signal_payload(symbol: str) -> dict[str, Any]:
     # selector provides fallback
     result = get_bars_with_fallback(symbol=symbol, interval="1day", outputsize=60)
-    bars = result.bars or []
-
-    # Validate bars regardless of shape (your validator handles dict/tuple/object)
-    if bars:
-        validate_bars(bars)
-
-    # Compute signal expects dict-ish
-    bars_for_signal = []
-    for b in bars:
-        if hasattr(b, "model_dump"):
-            bars_for_signal.append(b.model_dump(mode="json"))
-        elif isinstance(b, dict):
-            bars_for_signal.append(b)
-        else:
-            bars_for_signal.append(b)
-
-    bars_for_signal = sorted(bars_for_signal, key=lambda x: str(getattr(x, "get", lambda k, d=None: None)("ts_event", "")) if isinstance(x, dict) else str(getattr(x, "ts_event", "")))
+    # The series was sorted and validated when the provider response was parsed.
+    bars = result.bars
 
-    signal = compute_basic_signal(bars_for_signal)
+    signal = compute_basic_signal(bars)
 
     debug = signal.get("debug", {}) if isinstance(signal, dict) else {}
     debug.setdefault("provider_used", result.provider)
-    debug.setdefault("bars_count", len(bars_for_signal) if bars_for_signal else None)
+    debug.setdefault("bars_count", len(bars) if bars else None)
     signal["debug"] = debug
     signal["score_components"] = _components_for_signal_basic(signal)
     return signal
@@ -1427,23 +1461,9 @@ def signal_trade(symbol: str, interval: str = "1day", outputsize: int = 60):
             )
 
         res = get_bars_with_fallback(symbol=symbol, interval=interval, outputsize=outputsize)
-        bars = res.bars or []
-
-        # normalize to list[dict] for compute_trade_signal
-        bars_dicts: list[Any] = []
-        for b in bars:
-            if hasattr(b, "model_dump"):
-                bars_dicts.append(b.model_dump(mode="json"))
-            elif isinstance(b, dict):
-                bars_dicts.append(b)
-            else:
-                bars_dicts.append(b)
-
-        if bars_dicts:
-            validate_bars(bars_dicts)
 
         trade = compute_trade_signal(
-            bars_dicts,
+            res.bars,
             symbol=symbol.upper(),
             provider_used=res.provider,
             timeframe=interval,
@@ -1463,12 +1483,23 @@ def signal_trade(symbol: str, interval: str = "1day", outputsize: int = 60):
 
 
 @app.get("/scanner/sector")
+@with_deadline("scanner", 60.0)
 def scanner_sector():
     cfg = get_config()
     universe = _load_scanner_universe()
     rows: List[Dict[str, Any]] = []
     errors: List[Dict[str, Any]] = []
 
+    # Warm quotes and the 60-bar windows for the whole universe up front; the per-symbol signal
+    # computation below then reads bars from the selector's memory cache.
+    universe_symbols = [str(item.get("symbol", "")).strip().upper() for item in universe]
+    universe_symbols = [symbol for symbol in universe_symbols if symbol]
+    quotes_batch = get_quotes_with_fallback(universe_symbols, freshness_seconds=cfg.data_freshness_sla_seconds)
+    try:
+        get_bars_batch_with_fallback(universe_symbols, interval="1day", outputsize=60)
+    except Exception as exc:
+        logger.warning("scanner_sector bars warm-up failed: %s", exc)
+
     for item in universe:
         symbol = str(item.get("symbol", "")).strip().upper()
         if not symbol:
@@ -1476,10 +1507,9 @@ def scanner_sector():
         sector = str(item.get("sector", "")).strip() or "Unclassified"
 
         try:
-            quote_result = get_quote_with_fallback(
-                symbol=symbol,
-                freshness_seconds=cfg.data_freshness_sla_seconds,
-            )
+            quote_result = quotes_batch.quotes.get(symbol)
+            if quote_result is None:
+                raise ProviderError(quotes_batch.errors.get(symbol) or f"No quote for {symbol}")
             signal_payload = _compute_basic_signal_payload(symbol)
             rows.append(
                 {
@@ -1529,6 +1559,7 @@ def scanner_sector():
     }
 
 
+@with_deadline("scanner", 60.0)
 def _scanner_agent(
     agent: str,
     interval: str = "1day",
@@ -1555,17 +1586,31 @@ def _scanner_agent(
         return cached
 
     symbols_to_scan = symbols[:refresh_limit] if allow_live else symbols
+    # Symbols missing from the warm-up (e.g. it failed outright) fall back to per-row fetches.
+    prefetched: Dict[str, Dict[str, Any]] = {}
+    try:
+        prefetched = warm_scanner_universe(
+            symbols_to_scan,
+            interval=interval,
+            bars=bars_value,
+            allow_live=allow_live,
+            bars_ttl_seconds=int(cfg.scanner_bars_ttl_seconds),
+            quote_ttl_seconds=int(cfg.scanner_quote_ttl_seconds),
+        )
+    except Exception as exc:
+        logger.warning("scanner warm-up failed for agent %s: %s", agent_key, exc)
     rows: List[Dict[str, Any]] = []
     with ThreadPoolExecutor(max_workers=4) as pool:
         futures = {
             pool.submit(
-                build_scanner_row,
+                in_context(build_scanner_row),
                 symbol,
                 interval,
                 bars_value,
                 allow_live,
                 int(cfg.scanner_bars_ttl_seconds),
                 int(cfg.scanner_quote_ttl_seconds),
+                prefetched.get(str(symbol or "").strip().upper()),
             ): symbol
             for symbol in symbols_to_scan
         }
@@ -1720,6 +1765,7 @@ def _scanner_update_progress(key: str, stage: str, done: int, total: int, starte
     )
 
 
+@with_deadline("scanner", 60.0)
 def _scanner_discover_payload(
     tab: str = "overall",
     market: str = "ALL",
@@ -1774,6 +1820,19 @@ def _scanner_discover_payload(
     def _mark_fail(reason: str) -> None:
         fail_reason_counts[reason] = int(fail_reason_counts.get(reason) or 0) + 1
 
+    prefetched: Dict[str, Dict[str, Any]] = {}
+    try:
+        prefetched = warm_scanner_universe(
+            [str(base.get("symbol") or "") for batch in discovered_batches.values() for base in batch],
+            interval=interval,
+            bars=bars_value,
+            allow_live=True,
+            bars_ttl_seconds=int(cfg.scanner_bars_ttl_seconds),
+            quote_ttl_seconds=int(cfg.scanner_quote_ttl_seconds),
+        )
+    except Exception as exc:
+        logger.warning("scanner discover warm-up failed: %s", exc)
+
     for mk in markets_to_scan:
         rows: List[Dict[str, Any]] = []
         discovered = discovered_batches.get(mk, [])
@@ -1791,6 +1850,7 @@ def _scanner_discover_payload(
                     allow_live=True,
                     bars_ttl_seconds=int(cfg.scanner_bars_ttl_seconds),
                     quote_ttl_seconds=int(cfg.scanner_quote_ttl_seconds),
+                    prefetched=prefetched.get(symbol),
                 )
                 if _as_float_or_none(live_row.get("price")) is not None:
                     quote_ok_count += 1
@@ -2116,22 +2176,21 @@ def _row_from_breakdown_snapshot(symbol: str, scanner_type: str, payload: Dict[s
 
 
 @app.get("/scanner/latest")
-def scanner_latest(type: str = "overall", limit: int = 10):
+def scanner_latest(type: str = "overall", limit: int = 10, action: Optional[str] = None):
     scanner_type = str(type or "overall").strip().lower()
     if scanner_type not in _SCANNER_AGENT_UNIVERSES:
         return JSONResponse(status_code=404, content={"error": f"Unknown scanner type: {scanner_type}"})
 
-    recent = _scanner_sources_repo.list_recent_breakdowns(scanner_type=scanner_type, limit=1000)
-    latest_by_symbol: Dict[str, Dict[str, Any]] = {}
-    for row in recent:
-        symbol = str(row.get("symbol") or "").strip().upper()
-        payload = row.get("payload") if isinstance(row.get("payload"), dict) else {}
-        if not symbol or symbol in latest_by_symbol:
-            continue
-        latest_by_symbol[symbol] = _row_from_breakdown_snapshot(symbol=symbol, scanner_type=scanner_type, payload=payload)
-
-    rows = list(latest_by_symbol.values())
-    if not rows and scanner_type in {"social", "news"}:
+    latest = _scanner_sources_repo.list_latest_breakdown_per_symbol(
+        scanner_type=scanner_type,
+        limit=max(1, min(int(limit), 50)),
+        action=action,
+    )
+    rows = [
+        _row_from_breakdown_snapshot(symbol=row["symbol"], scanner_type=scanner_type, payload=row["payload"])
+        for row in latest
+    ]
+    if not rows and not action and scanner_type in {"social", "news"}:
         for symbol in _SCANNER_AGENT_UNIVERSES.get(scanner_type, [])[:max(1, min(int(limit), 10))]:
             payload = {
                 "totals": {
@@ -2806,23 +2865,44 @@ def _batch_cache_set(key: str, payload: Any) -> None:
         _BATCH_CACHE[key] = (expires_at, payload)
 
 
-def _batch_quote_for_symbol(symbol: str):
-    cached = _batch_cache_get(f"batch_quote:{symbol}")
-    if cached is not None:
-        return cached
-
-    cfg = get_config()
-    result = get_quote_with_fallback(symbol=symbol, freshness_seconds=cfg.data_freshness_sla_seconds)
-    payload = {
+def _batch_quote_payload(symbol: str, result: Any) -> dict[str, Any]:
+    return {
         "ok": True,
         "data": {
             "provider": result.provider,
             "symbol": symbol.upper(),
             "quote": result.quote.model_dump(mode="json"),
+            "stale_seconds": getattr(result, "stale_seconds", 0.0),
         },
     }
-    _batch_cache_set(f"batch_quote:{symbol}", payload)
-    return payload
+
+
+def _batch_quotes_for_symbols(symbols: list[str]) -> tuple[dict[str, Any], dict[str, str]]:
+    payloads: dict[str, Any] = {}
+    missing: list[str] = []
+    for symbol in symbols:
+        cached = _batch_cache_get(f"batch_quote:{symbol}")
+        if cached is not None:
+            payloads[symbol] = cached
+        else:
+            missing.append(symbol)
+    if not missing:
+        return payloads, {}
+
+    cfg = get_config()
+    batch = get_quotes_with_fallback(missing, freshness_seconds=cfg.data_freshness_sla_seconds)
+    errors: dict[str, str] = {}
+    for symbol in missing:
+        result = batch.quotes.get(symbol.upper())
+        if result is None:
+            errors[symbol] = batch.errors.get(symbol.upper(), "No quote")
+            continue
+        payload = _batch_quote_payload(symbol, result)
+        # Stale hits are not re-cached here, so the next call picks up the background refresh.
+        if not result.stale_seconds:
+            _batch_cache_set(f"batch_quote:{symbol}", payload)
+        payloads[symbol] = payload
+    return payloads, errors
 
 
 def _batch_signal_for_symbol(symbol: str):
@@ -2882,23 +2962,22 @@ def _table_columns(conn, table: str) -> set[str]:
         return set()
 
 
+_INSERT_QUOTE_EVENT_SQL = "INSERT INTO events (event_type, source, payload, symbol) VALUES (?, ?, ?, ?)"
+# payload column is JSONB in Postgres
+_INSERT_QUOTE_EVENT_SQL_PG = "INSERT INTO events (event_type, source, payload, symbol) VALUES (?, ?, ?::jsonb, ?)"
+_INSERT_SIGNAL_SQL = "INSERT INTO signals (symbol, timeframe, score, payload) VALUES (?, ?, ?, ?)"
+_INSERT_SIGNAL_SQL_PG = "INSERT INTO signals (symbol, timeframe, score, payload) VALUES (?, ?, ?, ?::jsonb)"
+
+
 def _insert_worker_quote_event(symbol: str, provider: str, quote_payload: dict[str, Any]) -> None:
     payload_obj = {"provider": provider, "symbol": symbol, "quote": quote_payload}
     payload_json = json.dumps(payload_obj)
-
-    with get_connection() as conn:
-        if conn.backend == "postgres":
-            # payload column is JSONB in Postgres
-            conn.execute(
-                "INSERT INTO events (event_type, source, payload) VALUES (?, ?, ?::jsonb)",
-                ("worker.quote", provider or "selector", payload_json),
-            )
-        else:
-            # payload column is TEXT in SQLite
-            conn.execute(
-                "INSERT INTO events (event_type, source, payload) VALUES (?, ?, ?)",
-                ("worker.quote", provider or "selector", payload_json),
-            )
+    # Audit-only write; batched off the request path by the write-behind queue.
+    get_write_behind().submit_insert(
+        _INSERT_QUOTE_EVENT_SQL,
+        ("worker.quote", provider or "selector", payload_json, symbol.upper()),
+        postgres_sql=_INSERT_QUOTE_EVENT_SQL_PG,
+    )
 
 
 def _insert_signal_row(symbol: str, timeframe: str, signal_payload: dict[str, Any]) -> None:
@@ -2910,18 +2989,11 @@ def _insert_signal_row(symbol: str, timeframe: str, signal_payload: dict[str, An
         score_value = 0.0
 
     payload_json = json.dumps(signal_payload)
-
-    with get_connection() as conn:
-        if conn.backend == "postgres":
-            conn.execute(
-                "INSERT INTO signals (symbol, timeframe, score, payload) VALUES (?, ?, ?, ?::jsonb)",
-                (symbol, timeframe, score_value, payload_json),
-            )
-        else:
-            conn.execute(
-                "INSERT INTO signals (symbol, timeframe, score, payload) VALUES (?, ?, ?, ?)",
-                (symbol, timeframe, score_value, payload_json),
-            )
+    get_write_behind().submit_insert(
+        _INSERT_SIGNAL_SQL,
+        (symbol, timeframe, score_value, payload_json),
+        postgres_sql=_INSERT_SIGNAL_SQL_PG,
+    )
 
 
 def _cached_quotes_results(symbols: list[str]) -> dict[str, Any]:
@@ -2929,45 +3001,34 @@ def _cached_quotes_results(symbols: list[str]) -> dict[str, Any]:
     if not symbols:
         return results
 
-    with get_connection() as conn:
-        rows = conn.execute(
-            """
-            SELECT id, source, payload, created_at
-            FROM events
-            WHERE event_type = ?
-            ORDER BY id DESC
-            LIMIT 2000
-            """,
-            ("worker.quote",),
-        ).fetchall()
-
-    wanted = set(symbols)
+    # 1) Serve from the latest_quotes table (one row per symbol, primary-key lookup)
     found: set[str] = set()
-
-    # 1) Serve from DB cache if present
-    for row in rows:
-        payload = _decode_payload(row.get("payload"))
-        symbol = str(payload.get("symbol", "")).strip().upper()
-        quote_payload = payload.get("quote")
-        provider = payload.get("provider") or row.get("source") or "cache"
-
-        if symbol not in wanted or symbol in found:
-            continue
+    for symbol, row in _latest_quotes_repo.get_many(symbols).items():
+        quote_payload = row.get("quote")
         if not isinstance(quote_payload, dict):
             continue
-
+        provider = row.get("provider") or "cache"
         results[symbol] = {"ok": True, "data": {"provider": provider, "symbol": symbol, "quote": quote_payload}}
         found.add(symbol)
-        if len(found) == len(wanted):
-            return results
+    if len(found) == len(symbols):
+        return results
 
     # 2) For misses, fetch live and write to DB
     missing = [s for s in symbols if s not in found]
     if missing and _has_any_market_key():
         cfg = get_config()
+        try:
+            batch = get_quotes_with_fallback(missing, freshness_seconds=cfg.data_freshness_sla_seconds)
+        except Exception as exc:
+            for s in missing:
+                results[s] = {"ok": False, "error": str(exc)}
+            return results
         for s in missing:
+            live = batch.quotes.get(s.upper())
+            if live is None:
+                results[s] = {"ok": False, "error": batch.errors.get(s.upper(), "No quote")}
+                continue
             try:
-                live = get_quote_with_fallback(symbol=s, freshness_seconds=cfg.data_freshness_sla_seconds)
                 quote_dict = live.quote.model_dump(mode="json")
                 _insert_worker_quote_event(s, live.provider, quote_dict)
                 results[s] = {"ok": True, "data": {"provider": live.provider, "symbol": s, "quote": quote_dict}}
@@ -3045,17 +3106,18 @@ def batch_quotes(symbols: str):
     succeeded: list[str] = []
     failed: list[str] = []
 
-    with ThreadPoolExecutor(max_workers=_BATCH_MAX_WORKERS) as pool:
-        futures = {pool.submit(_batch_quote_for_symbol, symbol): symbol for symbol in requested}
-        for future in as_completed(futures):
-            symbol = futures[future]
-            try:
-                payload = future.result()
-                results[symbol] = payload
-                succeeded.append(symbol)
-            except Exception as exc:
-                results[symbol] = {"ok": False, "error": str(exc)}
-                failed.append(symbol)
+    # One batched provider pass for every symbol, instead of one fallback chain per symbol.
+    try:
+        payloads, errors = _batch_quotes_for_symbols(requested)
+    except Exception as exc:
+        payloads, errors = {}, {symbol: str(exc) for symbol in requested}
+    for symbol in requested:
+        if symbol in payloads:
+            results[symbol] = payloads[symbol]
+            succeeded.append(symbol)
+        else:
+            results[symbol] = {"ok": False, "error": errors.get(symbol, "No quote")}
+            failed.append(symbol)
 
     duration_ms = int((time.monotonic() - started) * 1000)
     logger.info(
@@ -3080,6 +3142,7 @@ def cache_quotes(symbols: str):
 
 
 @app.get("/batch/signals/basic")
+@with_deadline("batch", 30.0)
 def batch_signals_basic(symbols: str):
     requested = _parse_symbols_csv(symbols)
     if len(requested) > _BATCH_MAX_SYMBOLS:
@@ -3098,7 +3161,7 @@ def batch_signals_basic(symbols: str):
     failed: list[str] = []
 
     with ThreadPoolExecutor(max_workers=_BATCH_MAX_WORKERS) as pool:
-        futures = {pool.submit(_batch_signal_for_symbol, symbol): symbol for symbol in requested}
+        futures = {pool.submit(in_context(_batch_signal_for_symbol), symbol): symbol for symbol in requested}
         for future in as_completed(futures):
             symbol = futures[future]
             try:
@@ -3135,15 +3198,11 @@ def cache_signals_basic(symbols: str):
 def cache_status():
     with get_connection() as conn:
         signal_count_row = conn.execute("SELECT COUNT(*) AS count FROM signals").fetchall()
-        quote_count_row = conn.execute(
-            "SELECT COUNT(*) AS count FROM events WHERE event_type = ?",
-            ("worker.quote",),
-        ).fetchall()
+        quote_count_row = conn.execute("SELECT COUNT(*) AS count FROM latest_quotes").fetchall()
         bars_count_row = conn.execute("SELECT COUNT(*) AS count FROM canonical_price_bars").fetchall()
         latest_signal_row = conn.execute("SELECT created_at FROM signals ORDER BY id DESC LIMIT 1").fetchall()
         latest_quote_row = conn.execute(
-            "SELECT created_at FROM events WHERE event_type = ? ORDER BY id DESC LIMIT 1",
-            ("worker.quote",),
+            "SELECT updated_at AS created_at FROM latest_quotes ORDER BY updated_at DESC LIMIT 1"
         ).fetchall()
         latest_bar_row = conn.execute(
             "SELECT ts_ingest FROM canonical_price_bars ORDER BY id DESC LIMIT 1"
@@ -3278,6 +3337,7 @@ def _paper_position_view(row: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
+@with_deadline("quote", 8.0)
 def _paper_submit_order(payload: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Optional[str], int]:
     side = str(payload.get("side") or "BUY").strip().upper()
     symbol = str(payload.get("symbol") or "").strip().upper()
@@ -3312,7 +3372,8 @@ def _paper_submit_order(payload: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any
     source = str(payload.get("source") or "ui")
 
     try:
-        quote = get_quote_with_fallback(symbol=symbol, freshness_seconds=60)
+        # Orders are priced from a live quote, never from a stale-while-revalidate cache hit.
+        quote = get_quote_with_fallback(symbol=symbol, freshness_seconds=60, swr=False)
         price = float(quote.quote.last)
     except Exception as exc:
         return None, f"quote unavailable: {exc}", 503
@@ -3482,14 +3543,15 @@ def paper_positions():
 
 
 @app.get("/paper/orders")
-def paper_orders(status: Optional[str] = None):
+def paper_orders(status: Optional[str] = None, strategy_key: Optional[str] = None):
     try:
         status_raw = str(status or "").strip().upper() or None
         alias = {"FILLED": "OPEN", "OPEN": "OPEN", "CLOSED": "CLOSED", "CANCELLED": "CANCELLED"}
         status_value = alias.get(status_raw) if status_raw else None
         if status_raw and status_value is None:
             return JSONResponse(status_code=400, content={"ok": False, "error": "status must be open|closed|cancelled"})
-        rows = _paper_repo.list_orders(status=status_value, limit=3000)
+        tactic_id = str(strategy_key or "").strip() or None
+        rows = _paper_repo.list_orders(status=status_value, limit=3000, tactic_id=tactic_id)
         return JSONResponse(status_code=200, content={"ok": True, "rows": [_paper_order_view(row) for row in rows]})
     except Exception as exc:
         return JSONResponse(status_code=500, content={"ok": False, "error": str(exc)})
@@ -3678,16 +3740,28 @@ def monitor_list(status: Optional[str] = None, limit: int = 200):
 
 
 @app.post("/monitor/refresh")
+@with_deadline("monitor_refresh", 15.0)
 def monitor_refresh():
     rows = _monitor_repo.list_positions(status="open", limit=500)
     refreshed: List[Dict[str, Any]] = []
+    symbols = [str(row.get("symbol") or "").strip().upper() for row in rows]
+    quotes: Dict[str, Any] = {}
+    errors: Dict[str, str] = {}
+    try:
+        batch = get_quotes_with_fallback([s for s in symbols if s], freshness_seconds=60)
+        quotes, errors = batch.quotes, batch.errors
+    except Exception as exc:
+        # A failed batch call becomes an error on every row, not a failed route.
+        errors = {s: str(exc) for s in symbols if s}
     for row in rows:
         position_id = int(row.get("id"))
         symbol = str(row.get("symbol") or "").strip().upper()
         if not symbol:
             continue
         try:
-            quote = get_quote_with_fallback(symbol=symbol, freshness_seconds=60)
+            quote = quotes.get(symbol)
+            if quote is None:
+                raise ProviderError(errors.get(symbol, f"No quote for {symbol}"))
             last_price = float(quote.quote.last)
         except Exception as exc:
             refreshed.append({"id": position_id, "symbol": symbol, "ok": False, "error": str(exc)})
@@ -2,7 +2,9 @@ import os
 from datetime import datetime, time, timezone
 from typing import Any, Optional
 
-from app.contracts.market_data import CanonicalBar, CanonicalQuote
+from app.contracts.market_data import CanonicalQuote
+from app.providers.bar_series import BarSeries
+from app.providers.http import http_get
 from app.providers.twelvedata import ProviderError
 
 
@@ -66,7 +68,7 @@ class AlphaVantageClient:
             quality_flags=[],
         )
 
-    def fetch_bars(self, symbol: str, interval: str, outputsize: int) -> list[CanonicalBar]:
+    def fetch_bars(self, symbol: str, interval: str, outputsize: int) -> BarSeries:
         if interval != "1day":
             raise ProviderError(f"Alpha Vantage fallback supports interval=1day only, got {interval}")
 
@@ -86,32 +88,27 @@ class AlphaVantageClient:
         if outputsize > 0:
             rows = rows[-outputsize:]
 
-        bars: list[CanonicalBar] = []
-        for day, item in rows:
-            if not isinstance(item, dict):
-                continue
-            ts_event = _parse_daily_timestamp(day)
-            bars.append(
-                CanonicalBar(
-                    instrument_id=f"ALPHAVANTAGE:{symbol}",
-                    ts_event=ts_event,
-                    ts_ingest=ts_ingest,
-                    open=float(item.get("1. open", 0)),
-                    high=float(item.get("2. high", 0)),
-                    low=float(item.get("3. low", 0)),
-                    close=float(item.get("4. close", 0)),
-                    volume=float(item.get("6. volume", 0) or 0),
-                    source_provider="alphavantage",
-                    quality_flags=[],
+        return BarSeries.from_rows(
+            (
+                (
+                    _parse_daily_timestamp(day),
+                    item.get("1. open"),
+                    item.get("2. high"),
+                    item.get("3. low"),
+                    item.get("4. close"),
+                    item.get("6. volume") or 0,
                 )
-            )
-        return bars
+                for day, item in rows
+                if isinstance(item, dict)
+            ),
+            instrument_id=f"ALPHAVANTAGE:{symbol}",
+            source_provider="alphavantage",
+            ts_ingest=ts_ingest,
+        )
 
 
 def _http_get(url: str, params: dict[str, Any], timeout: int):
-    import requests
-
-    return requests.get(url, params=params, timeout=timeout)
+    return http_get(url, params=params, timeout=timeout)
 
 
 def _optional_float(value: Any) -> Optional[float]:
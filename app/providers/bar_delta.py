@@ -0,0 +1,144 @@
+# app/providers/bar_delta.py
+
+from __future__ import annotations
+
+import bisect
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from app.providers.bar_series import BarSeries
+from core.repositories.instruments import canonical_instrument_id
+from core.storage.db import get_connection
+
+# Incremental bar refresh: instead of re-downloading a whole window, providers are asked only for
+# bars from the last stored ts_event onward. That last bar is re-fetched on purpose because it may
+# still be in progress; everything before it is final and is kept from storage.
+
+_DAY_SECONDS = 86400
+_INTERVAL_SECONDS = {
+    "1min": 60,
+    "1m": 60,
+    "5min": 300,
+    "5m": 300,
+    "15min": 900,
+    "15m": 900,
+    "30min": 1800,
+    "30m": 1800,
+    "1h": 3600,
+    "60m": 3600,
+    "60min": 3600,
+    "1day": _DAY_SECONDS,
+    "1d": _DAY_SECONDS,
+    "1week": 7 * _DAY_SECONDS,
+    "1w": 7 * _DAY_SECONDS,
+    "1month": 30 * _DAY_SECONDS,
+    "1mo": 30 * _DAY_SECONDS,
+}
+
+
+def interval_seconds(interval: str) -> int:
+    return _INTERVAL_SECONDS.get((interval or "1day").strip().lower(), _DAY_SECONDS)
+
+
+def _bucket(ts: int, step: int) -> int:
+    # Daily and longer bars are matched by UTC day: providers stamp the same session at midnight
+    # (TwelveData) or at the open (Yahoo), and those must not become two bars.
+    return ts // _DAY_SECONDS if step >= _DAY_SECONDS else ts
+
+
+def _bucket_start(ts: int, step: int) -> int:
+    return _bucket(ts, step) * _DAY_SECONDS if step >= _DAY_SECONDS else ts
+
+
+def _dedupe_buckets(bars: BarSeries, step: int) -> BarSeries:
+    # A series is already unique by ts; daily ones may still hold two stamps for one session.
+    if step < _DAY_SECONDS or len(bars) < 2:
+        return bars
+    days = [ts // _DAY_SECONDS for ts in bars.ts]
+    keep = [i for i in range(len(days)) if i + 1 == len(days) or days[i] != days[i + 1]]
+    return bars if len(keep) == len(days) else bars.select(keep)
+
+
+def merge_bars(stored: Any, fresh: Any, interval: str) -> BarSeries:
+    # Fresh bars win from their first bucket onward; older stored bars are kept as they are.
+    step = interval_seconds(interval)
+    stored = BarSeries.coerce(stored)
+    fresh = _dedupe_buckets(BarSeries.coerce(fresh), step)
+    if not len(fresh):
+        return stored
+    cut = bisect.bisect_left(stored.ts, _bucket_start(fresh.ts[0], step))
+    return stored[:cut].concat(fresh)
+
+
+def bars_since(bars: Any, start: datetime, interval: str) -> BarSeries:
+    # For providers without a range parameter: keep what a delta request would have returned.
+    bars = BarSeries.coerce(bars)
+    first = _bucket_start(int(start.timestamp()), interval_seconds(interval))
+    return bars[bisect.bisect_left(bars.ts, first):]
+
+
+def delta_start(stored: Any, interval: str, outputsize: int) -> Optional[datetime]:
+    # Only trust stored history that fills the requested window without holes, and only when the
+    # missing span is shorter than the window itself; otherwise a full fetch is cheaper and safer.
+    stored = BarSeries.coerce(stored)
+    size = max(1, int(outputsize))
+    if len(stored) < size:
+        return None
+    times = stored.ts[-size:]
+    step = interval_seconds(interval)
+    max_gap = max(5 * step, 4 * _DAY_SECONDS)
+    if any(cur - prev > max_gap for prev, cur in zip(times, times[1:])):
+        return None
+    last = times[-1]
+    if time.time() - last > step * size:
+        return None
+    return datetime.fromtimestamp(last, tz=timezone.utc)
+
+
+def load_stored_bars_many(symbols: List[str], interval: str, limit: int) -> Dict[str, BarSeries]:
+    # Latest `limit` stored bars per symbol, oldest first, with one windowed query. Twice the limit
+    # is read so per-day duplicates from different providers can be collapsed first.
+    by_instrument = {canonical_instrument_id(s): s for s in symbols if s}
+    if not by_instrument:
+        return {}
+    size = max(1, int(limit))
+    placeholders = ", ".join(["?"] * len(by_instrument))
+    with get_connection() as conn:
+        rows = conn.execute(
+            f"""
+            SELECT instrument_id, ts_event, ts_ingest, open, high, low, close, volume, source_provider
+            FROM (
+                SELECT instrument_id, ts_event, ts_ingest, open, high, low, close, volume, source_provider,
+                    ROW_NUMBER() OVER (PARTITION BY instrument_id ORDER BY ts_event DESC) AS rn
+                FROM canonical_price_bars
+                WHERE timeframe = ? AND instrument_id IN ({placeholders})
+            ) ranked
+            WHERE rn <= ?
+            ORDER BY instrument_id, ts_event
+            """,
+            (interval, *by_instrument.keys(), size * 2),
+        ).fetchall()
+    grouped: Dict[str, List[Dict[str, Any]]] = {}
+    for row in rows:
+        grouped.setdefault(str(row.get("instrument_id")), []).append(row)
+    step = interval_seconds(interval)
+    out: Dict[str, BarSeries] = {}
+    for instrument_id, instrument_rows in grouped.items():
+        newest = instrument_rows[-1]
+        series = BarSeries.from_rows(
+            (
+                (row.get("ts_event"), row.get("open"), row.get("high"), row.get("low"), row.get("close"), row.get("volume"))
+                for row in instrument_rows
+            ),
+            instrument_id=instrument_id,
+            source_provider=newest.get("source_provider"),
+            ts_ingest=newest.get("ts_ingest"),
+        )
+        out[by_instrument[instrument_id]] = _dedupe_buckets(series, step)[-size:]
+    return out
+
+
+def load_stored_bars(symbol: str, interval: str, limit: int) -> BarSeries:
+    symbol_u = (symbol or "").strip().upper()
+    return load_stored_bars_many([symbol_u], interval, limit).get(symbol_u, BarSeries())
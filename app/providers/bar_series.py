@@ -0,0 +1,264 @@
+# app/providers/bar_series.py
+
+from __future__ import annotations
+
+import math
+from array import array
+from datetime import datetime, timezone
+from typing import Any, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from app.validation.market_data import ValidationError
+
+# One symbol's bars as columns: ts is int64 epoch seconds (UTC) and the OHLCV columns are float64
+# arrays, with NaN for a missing volume. A series is parsed, validated, sorted and de-duplicated by
+# ts once, where the provider response (or a DB read) is turned into bars; after that it is treated
+# as immutable and the selector cache, delta merges, signals and the poller read the columns
+# directly. Rows only become dicts at the API edge, through to_dicts().
+#
+# Provenance (instrument_id, source_provider, ts_ingest) is kept once per series rather than per
+# bar: a provider fetch has a single source, and a merged series takes the newer side's.
+
+PRICE_COLUMNS = ("open", "high", "low", "close", "volume")
+
+Row = Tuple[Any, Any, Any, Any, Any, Any]
+
+
+def _epoch_seconds(value: Any) -> Optional[int]:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return int(value)
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        text = str(value or "").strip()
+        if not text:
+            return None
+        try:
+            parsed = datetime.fromisoformat(text.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp())
+
+
+def _price(value: Any, field: str) -> float:
+    if value is None or value == "":
+        raise ValidationError(f"Missing {field}")
+    try:
+        number = float(value)
+    except (TypeError, ValueError) as exc:
+        raise ValidationError(f"Invalid {field}: {value!r}") from exc
+    if not math.isfinite(number):
+        raise ValidationError(f"Invalid {field}: {value!r}")
+    return number
+
+
+def _volume(value: Any) -> float:
+    if value is None or value == "":
+        return math.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError) as exc:
+        raise ValidationError(f"Invalid volume: {value!r}") from exc
+
+
+def _field(bar: Any, name: str) -> Any:
+    if isinstance(bar, dict):
+        return bar.get(name)
+    return getattr(bar, name, None)
+
+
+class Bar:
+    # Read-only view of one row, for code that still walks bars one at a time.
+    __slots__ = ("_series", "_index")
+
+    def __init__(self, series: "BarSeries", index: int) -> None:
+        self._series = series
+        self._index = index
+
+    @property
+    def ts_event(self) -> datetime:
+        return self._series.ts_event(self._index)
+
+    @property
+    def open(self) -> float:
+        return self._series.open[self._index]
+
+    @property
+    def high(self) -> float:
+        return self._series.high[self._index]
+
+    @property
+    def low(self) -> float:
+        return self._series.low[self._index]
+
+    @property
+    def close(self) -> float:
+        return self._series.close[self._index]
+
+    @property
+    def volume(self) -> Optional[float]:
+        value = self._series.volume[self._index]
+        return None if math.isnan(value) else value
+
+    @property
+    def instrument_id(self) -> Optional[str]:
+        return self._series.instrument_id
+
+    @property
+    def source_provider(self) -> Optional[str]:
+        return self._series.source_provider
+
+    @property
+    def ts_ingest(self) -> Any:
+        return self._series.ts_ingest
+
+    @property
+    def quality_flags(self) -> List[str]:
+        return []
+
+
+class BarSeries:
+    __slots__ = ("ts", "open", "high", "low", "close", "volume", "instrument_id", "source_provider", "ts_ingest")
+
+    def __init__(
+        self,
+        ts: Optional[array] = None,
+        open: Optional[array] = None,
+        high: Optional[array] = None,
+        low: Optional[array] = None,
+        close: Optional[array] = None,
+        volume: Optional[array] = None,
+        instrument_id: Optional[str] = None,
+        source_provider: Optional[str] = None,
+        ts_ingest: Any = None,
+    ) -> None:
+        # Trusts its columns (equal length, ts strictly increasing); raw data goes through from_rows().
+        self.ts = ts if ts is not None else array("q")
+        self.open = open if open is not None else array("d")
+        self.high = high if high is not None else array("d")
+        self.low = low if low is not None else array("d")
+        self.close = close if close is not None else array("d")
+        self.volume = volume if volume is not None else array("d")
+        self.instrument_id = instrument_id
+        self.source_provider = source_provider
+        self.ts_ingest = ts_ingest
+
+    @classmethod
+    def from_rows(
+        cls,
+        rows: Iterable[Row],
+        instrument_id: Optional[str] = None,
+        source_provider: Optional[str] = None,
+        ts_ingest: Any = None,
+    ) -> "BarSeries":
+        # rows are (ts_event, open, high, low, close, volume) in any order; a repeated ts keeps the
+        # row seen last. Raises ValidationError on a bad timestamp or price.
+        parsed: List[Tuple[int, float, float, float, float, float]] = []
+        for ts_event, open_, high, low, close, volume in rows:
+            ts = _epoch_seconds(ts_event)
+            if ts is None:
+                raise ValidationError(f"Invalid ts_event: {ts_event!r}")
+            parsed.append(
+                (ts, _price(open_, "open"), _price(high, "high"), _price(low, "low"), _price(close, "close"), _volume(volume))
+            )
+        if any(prev[0] >= cur[0] for prev, cur in zip(parsed, parsed[1:])):
+            parsed.sort(key=lambda row: row[0])
+            parsed = [row for row, nxt in zip(parsed, parsed[1:] + [None]) if nxt is None or nxt[0] != row[0]]
+        columns = list(zip(*parsed)) or [()] * 6
+        return cls(
+            array("q", columns[0]),
+            *(array("d", column) for column in columns[1:]),
+            instrument_id=instrument_id,
+            source_provider=source_provider,
+            ts_ingest=ts_ingest,
+        )
+
+    @classmethod
+    def coerce(cls, bars: Any) -> "BarSeries":
+        # Accepts a series as is; lists of bar objects, dicts or tuples are converted (and validated).
+        if isinstance(bars, cls):
+            return bars
+        items = list(bars or [])
+        if not items:
+            return cls()
+        if isinstance(items[0], (tuple, list)):
+            return cls.from_rows((tuple(item) + (None,))[:6] for item in items)
+        last = items[-1]
+        return cls.from_rows(
+            ((_field(bar, "ts_event"), *(_field(bar, name) for name in PRICE_COLUMNS)) for bar in items),
+            instrument_id=_field(last, "instrument_id"),
+            source_provider=_field(last, "source_provider"),
+            ts_ingest=_field(last, "ts_ingest"),
+        )
+
+    def _with(self, columns: Sequence[array], other: Optional["BarSeries"] = None) -> "BarSeries":
+        meta = other if other is not None else self
+        return BarSeries(*columns, instrument_id=meta.instrument_id, source_provider=meta.source_provider, ts_ingest=meta.ts_ingest)
+
+    def _columns(self) -> Tuple[array, ...]:
+        return (self.ts, self.open, self.high, self.low, self.close, self.volume)
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    def __iter__(self) -> Iterator[Bar]:
+        return (Bar(self, index) for index in range(len(self.ts)))
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Bar, "BarSeries"]:
+        if isinstance(index, slice):
+            return self._with([column[index] for column in self._columns()])
+        size = len(self.ts)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("bar index out of range")
+        return Bar(self, index)
+
+    def __repr__(self) -> str:
+        span = f" {self.ts_iso(0)}..{self.ts_iso(-1)}" if len(self) else ""
+        return f"<BarSeries {self.instrument_id or '?'} n={len(self)}{span}>"
+
+    @property
+    def nbytes(self) -> int:
+        return sum(column.itemsize * len(column) for column in self._columns())
+
+    def select(self, indices: Sequence[int]) -> "BarSeries":
+        return self._with([array(column.typecode, (column[i] for i in indices)) for column in self._columns()])
+
+    def concat(self, other: "BarSeries") -> "BarSeries":
+        # other must start after self ends; provenance comes from other, the newer data.
+        if not len(self):
+            return other
+        if not len(other):
+            return self
+        return self._with([mine + theirs for mine, theirs in zip(self._columns(), other._columns())], other)
+
+    def ts_event(self, index: int) -> datetime:
+        return datetime.fromtimestamp(self.ts[index], tz=timezone.utc)
+
+    def ts_iso(self, index: int) -> str:
+        return self.ts_event(index).isoformat()
+
+    def records(self) -> Iterator[Tuple[int, float, float, float, float, Optional[float]]]:
+        # (ts, open, high, low, close, volume) per row with a missing volume as None.
+        for ts, open_, high, low, close, volume in zip(*self._columns()):
+            yield ts, open_, high, low, close, None if math.isnan(volume) else volume
+
+    def to_dicts(self) -> List[dict]:
+        ts_ingest = self.ts_ingest.isoformat() if isinstance(self.ts_ingest, datetime) else self.ts_ingest
+        return [
+            {
+                "ts_event": datetime.fromtimestamp(ts, tz=timezone.utc).isoformat(),
+                "open": open_,
+                "high": high,
+                "low": low,
+                "close": close,
+                "volume": volume,
+                "instrument_id": self.instrument_id,
+                "ts_ingest": ts_ingest,
+                "source_provider": self.source_provider,
+                "quality_flags": [],
+            }
+            for ts, open_, high, low, close, volume in self.records()
+        ]
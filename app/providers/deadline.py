@@ -0,0 +1,98 @@
+# app/providers/deadline.py
+
+from __future__ import annotations
+
+import contextvars
+import functools
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional, Tuple
+
+# Request-scoped time budget carried in a contextvar. Whoever starts the work (an API route, a
+# scanner run) opens `deadline(seconds)`; every outbound HTTP call goes through
+# app.providers.http, which shrinks its connect/read timeouts to what is left and refuses to start
+# once the budget is spent. The selector stops walking its fallback chain at that point and
+# returns cached data instead. Nested budgets can only shorten the deadline, never extend it.
+#
+# Context does not follow work into thread pools on its own: submit with `in_context(fn)`.
+
+_DEADLINE: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("apollo_deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    pass
+
+
+def budget_seconds(name: str, default: float) -> Optional[float]:
+    # <NAME>_DEADLINE_SECONDS; 0 or a negative value disables the budget.
+    try:
+        value = float(os.getenv(f"{name.upper()}_DEADLINE_SECONDS", str(default)))
+    except ValueError:
+        value = default
+    return value if value > 0 else None
+
+
+@contextmanager
+def deadline(seconds: Optional[float]) -> Iterator[None]:
+    if seconds is None:
+        yield
+        return
+    candidate = time.monotonic() + max(0.0, float(seconds))
+    current = _DEADLINE.get()
+    token = _DEADLINE.set(candidate if current is None else min(current, candidate))
+    try:
+        yield
+    finally:
+        _DEADLINE.reset(token)
+
+
+def remaining() -> Optional[float]:
+    current = _DEADLINE.get()
+    if current is None:
+        return None
+    return max(0.0, current - time.monotonic())
+
+
+def expired() -> bool:
+    left = remaining()
+    return left is not None and left <= 0.0
+
+
+def check(what: str = "request") -> None:
+    if expired():
+        raise DeadlineExceeded(f"deadline exceeded before {what}")
+
+
+def clamp_timeout(connect: float, read: float, what: str = "request") -> Tuple[float, float]:
+    # requests' read timeout bounds each socket read, not the whole body, so this is best effort.
+    left = remaining()
+    if left is None:
+        return connect, read
+    if left <= 0.0:
+        raise DeadlineExceeded(f"deadline exceeded before {what}")
+    return min(connect, left), min(read, left)
+
+
+def in_context(fn: Callable[..., Any]) -> Callable[..., Any]:
+    # Binds fn to the caller's context so pool threads see the same deadline. Each call runs in
+    # its own copy, because one Context cannot be entered by two threads at once.
+    ctx = contextvars.copy_context()
+
+    def _run(*args: Any, **kwargs: Any) -> Any:
+        return ctx.copy().run(fn, *args, **kwargs)
+
+    return _run
+
+
+def with_deadline(name: str, default: float) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    # Runs the wrapped function under budget_seconds(name, default); safe on sync FastAPI routes.
+    def decorate(fn: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with deadline(budget_seconds(name, default)):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
@@ -5,12 +5,13 @@ from __future__ import annotations
 import os
 import time
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Optional
 
-import requests
 from pydantic import BaseModel, Field
 
-from app.providers.twelvedata import ProviderError, QuoteOutModel, BarModel, QuoteResult, BarsResult
+from app.providers.bar_series import BarSeries
+from app.providers.http import http_get
+from app.providers.twelvedata import ProviderError, QuoteOutModel, QuoteResult, BarsResult
 
 
 def _utc_now() -> datetime:
@@ -66,7 +67,6 @@ class FinnhubClient:
             raise ProviderError("FINNHUB_API_KEY is not set")
         self.timeout = timeout
         self.base_url = "https://finnhub.io/api/v1"
-        self.session = requests.Session()
 
     def fetch_quote(self, symbol: str) -> QuoteResult:
         symbol_u = (symbol or "").strip().upper()
@@ -74,7 +74,7 @@ class FinnhubClient:
         params = {"symbol": symbol_u, "token": self.api_key}
 
         try:
-            r = self.session.get(url, params=params, timeout=self.timeout)
+            r = http_get(url, params=params, timeout=self.timeout)
             r.raise_for_status()
             data = r.json()
         except Exception as exc:
@@ -99,7 +99,13 @@ class FinnhubClient:
         )
         return QuoteResult(provider="finnhub", quote=quote)
 
-    def fetch_bars(self, symbol: str, interval: str = "1day", outputsize: int = 500) -> BarsResult:
+    def fetch_bars(
+        self,
+        symbol: str,
+        interval: str = "1day",
+        outputsize: int = 500,
+        start: Optional[datetime] = None,
+    ) -> BarsResult:
         symbol_u = (symbol or "").strip().upper()
         resolution = _interval_to_resolution(interval)
 
@@ -123,6 +129,9 @@ class FinnhubClient:
 
         count = max(10, int(outputsize))
         frm = now - (count * step)
+        if start is not None:
+            # Delta refresh: only candles from the last stored bar onward.
+            frm = max(frm, int(start.timestamp()))
 
         url = f"{self.base_url}/stock/candle"
         params = {
@@ -134,7 +143,7 @@ class FinnhubClient:
         }
 
         try:
-            r = self.session.get(url, params=params, timeout=self.timeout)
+            r = http_get(url, params=params, timeout=self.timeout)
             if r.status_code in (401, 403):
                 if r.status_code == 403:
                     raise ProviderError("[AUTH] Finnhub 403 Forbidden: check FINNHUB_API_KEY or plan")
@@ -158,32 +167,12 @@ class FinnhubClient:
         c = data.get("c") or []
         v = data.get("v") or []
 
-        bars: List[BarModel] = []
+        # Candles are already columns (ascending t), so they go into the series as they are.
         n = min(len(t), len(o), len(h), len(l), len(c))
-        for i in range(n):
-            ts = _unix_to_utc(t[i]) or t[i]
-            vol = None
-            if i < len(v) and v[i] is not None:
-                try:
-                    vol = float(v[i])
-                except Exception:
-                    vol = None
-
-            bars.append(
-                BarModel(
-                    instrument_id=f"FINNHUB:{symbol_u}",
-                    ts_event=ts,
-                    ts_ingest=_utc_now(),
-                    open=float(o[i]),
-                    high=float(h[i]),
-                    low=float(l[i]),
-                    close=float(c[i]),
-                    volume=vol,
-                    source_provider="finnhub",
-                    quality_flags=[],
-                )
-            )
-
-        # Finnhub returns ascending time; your UI usually wants latest first or consistent.
-        # We’ll keep as-is and let callers sort if needed.
+        bars = BarSeries.from_rows(
+            ((t[i], o[i], h[i], l[i], c[i], v[i] if i < len(v) else None) for i in range(n)),
+            instrument_id=f"FINNHUB:{symbol_u}",
+            source_provider="finnhub",
+            ts_ingest=_utc_now(),
+        )
         return BarsResult(provider="finnhub", bars=bars)
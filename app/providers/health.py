@@ -0,0 +1,309 @@
+# app/providers/health.py
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from core.storage.db import get_connection
+
+logger = logging.getLogger(__name__)
+
+# One health record per "provider:kind", kept in provider_health so every API worker and the
+# poller see the same circuit state: when any process learns a provider is down (quota spent,
+# auth rejected, repeated failures), the others stop calling it on their next refresh.
+#
+# Reads go through an in-process snapshot refreshed every PROVIDER_HEALTH_REFRESH_SECONDS; writes
+# update the snapshot and the database together. If the database is unavailable the registry
+# keeps working on the snapshot alone.
+
+AUTH_COOLDOWN_SECONDS = 24 * 60 * 60
+
+_COLUMNS = (
+    "provider_key",
+    "state",
+    "reason",
+    "failures",
+    "blocked_until",
+    "last_success_at",
+    "last_failure_at",
+    "updated_at",
+)
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return max(0.0, float(os.getenv(name, str(default))))
+    except ValueError:
+        return default
+
+
+def health_key(provider: str, kind: str) -> str:
+    return f"{provider.lower()}:{kind}"
+
+
+def seconds_until_next_utc_day() -> int:
+    now_dt = datetime.now(timezone.utc)
+    next_day = datetime(
+        year=now_dt.year,
+        month=now_dt.month,
+        day=now_dt.day,
+        tzinfo=timezone.utc,
+    ) + timedelta(days=1)
+    return max(60, int((next_day - now_dt).total_seconds()))
+
+
+def is_rate_limit_error(exc: Exception) -> bool:
+    # Our own limiter's denials are not a provider signal and must not start a quota cooldown.
+    msg = str(exc or "").lower()
+    if "local rate limit reached" in msg:
+        return False
+    return (
+        "[rate_limit]" in msg
+        or "run out of api credits" in msg
+        or "too many requests" in msg
+        or "http 429" in msg
+    )
+
+
+def is_local_denial(exc: Exception) -> bool:
+    return "local rate limit reached" in str(exc or "").lower()
+
+
+def quota_cooldown_enabled(provider: str) -> bool:
+    # Only TwelveData's rate-limit errors mean its daily credits are spent; other providers' 429s
+    # are transient and go through the failure streak.
+    if provider.lower() != "twelvedata":
+        return False
+    return os.getenv("PROVIDER_TWELVEDATA_COOLDOWN_ENABLED", "true").strip().lower() in {"1", "true", "yes", "on"}
+
+
+def auth_cooldown_enabled(provider: str) -> bool:
+    return provider.lower() == "finnhub"
+
+
+def is_auth_error(exc: Exception) -> bool:
+    msg = str(exc or "").lower()
+    return (
+        "[auth]" in msg
+        or "http 401" in msg
+        or "http 403" in msg
+    )
+
+
+class _Health:
+    __slots__ = ("state", "reason", "failures", "blocked_until", "last_success_at", "last_failure_at", "updated_at")
+
+    def __init__(self) -> None:
+        self.state = "ok"
+        self.reason = ""
+        self.failures = 0
+        self.blocked_until = 0.0
+        self.last_success_at: Optional[float] = None
+        self.last_failure_at: Optional[float] = None
+        self.updated_at = 0.0
+
+    def row(self, key: str) -> tuple:
+        return (
+            key,
+            self.state,
+            self.reason,
+            self.failures,
+            self.blocked_until,
+            self.last_success_at,
+            self.last_failure_at,
+            self.updated_at,
+        )
+
+
+class ProviderHealthRegistry:
+    def __init__(self, shared: bool = True) -> None:
+        self.shared = shared
+        self._lock = threading.Lock()
+        self._health: Dict[str, _Health] = {}
+        self._loaded_at = 0.0
+        self._db_errors = 0
+
+    def _refresh(self, force: bool = False) -> None:
+        if not self.shared:
+            return
+        now = time.monotonic()
+        if not force and now - self._loaded_at < _env_float("PROVIDER_HEALTH_REFRESH_SECONDS", 2.0):
+            return
+        try:
+            with get_connection() as conn:
+                rows = conn.execute(f"SELECT {', '.join(_COLUMNS)} FROM provider_health").fetchall()
+        except Exception as exc:
+            with self._lock:
+                self._db_errors += 1
+                self._loaded_at = now
+            logger.warning("provider_health_load_failed error=%s", exc)
+            return
+        loaded: Dict[str, _Health] = {}
+        for row in rows:
+            health = _Health()
+            health.state = str(row.get("state") or "ok")
+            health.reason = str(row.get("reason") or "")
+            health.failures = int(row.get("failures") or 0)
+            health.blocked_until = float(row.get("blocked_until") or 0.0)
+            health.last_success_at = row.get("last_success_at")
+            health.last_failure_at = row.get("last_failure_at")
+            health.updated_at = float(row.get("updated_at") or 0.0)
+            loaded[str(row.get("provider_key"))] = health
+        with self._lock:
+            # Keep local records that are newer than what the database returned (write failed).
+            for key, health in self._health.items():
+                other = loaded.get(key)
+                if other is None or other.updated_at < health.updated_at:
+                    loaded[key] = health
+            self._health = loaded
+            self._loaded_at = now
+
+    def _save(self, key: str, health: _Health) -> None:
+        health.updated_at = time.time()
+        with self._lock:
+            self._health[key] = health
+        if not self.shared:
+            return
+        try:
+            with get_connection() as conn:
+                conn.upsert_many(
+                    "provider_health",
+                    _COLUMNS,
+                    [health.row(key)],
+                    conflict_columns=("provider_key",),
+                    update_columns=_COLUMNS[1:],
+                )
+        except Exception as exc:
+            with self._lock:
+                self._db_errors += 1
+            logger.warning("provider_health_save_failed key=%s error=%s", key, exc)
+
+    def _current(self, key: str) -> _Health:
+        with self._lock:
+            current = self._health.get(key)
+        health = _Health()
+        if current is not None:
+            for name in _Health.__slots__:
+                setattr(health, name, getattr(current, name))
+        return health
+
+    def is_available(self, provider: str, kind: str) -> bool:
+        self._refresh()
+        with self._lock:
+            health = self._health.get(health_key(provider, kind))
+            return health is None or health.blocked_until <= time.time()
+
+    def reason(self, provider: str, kind: str) -> str:
+        with self._lock:
+            health = self._health.get(health_key(provider, kind))
+            return (health.reason or health.state) if health is not None else "ok"
+
+    def record_success(self, provider: str, kind: str) -> None:
+        key = health_key(provider, kind)
+        health = self._current(key)
+        # Successes on a healthy provider are the hot path and never touch the database.
+        if health.state == "ok" and not health.failures:
+            return
+        health.state = "ok"
+        health.reason = ""
+        health.failures = 0
+        health.blocked_until = 0.0
+        health.last_success_at = time.time()
+        self._save(key, health)
+        logger.info("provider_health_recovered key=%s", key)
+
+    def record_failure(
+        self,
+        provider: str,
+        kind: str,
+        error: Any,
+        *,
+        base_backoff_seconds: float = 2.0,
+        max_backoff_seconds: float = 300.0,
+        circuit_failures: int = 3,
+        circuit_seconds: float = 60.0,
+    ) -> None:
+        # Exponential backoff per failure streak; the circuit opens once the streak is long enough
+        # and, after it expires, the next failure reopens it straight away (half-open probe).
+        self._refresh(force=True)
+        key = health_key(provider, kind)
+        health = self._current(key)
+        now = time.time()
+        health.failures += 1
+        health.last_failure_at = now
+        health.reason = str(error)[:500]
+        block = min(max_backoff_seconds, base_backoff_seconds * (2 ** (health.failures - 1)))
+        if health.failures >= circuit_failures:
+            block = max(block, circuit_seconds)
+            if health.state not in {"cooldown", "quota_exhausted"} or health.blocked_until <= now:
+                health.state = "circuit_open"
+        elif health.state not in {"cooldown", "quota_exhausted"} or health.blocked_until <= now:
+            health.state = "backoff"
+        health.blocked_until = max(health.blocked_until, now + block)
+        self._save(key, health)
+
+    def set_cooldown(self, provider: str, kind: str, seconds: float, reason: str, quota: bool = False) -> None:
+        key = health_key(provider, kind)
+        health = self._current(key)
+        now = time.time()
+        health.state = "quota_exhausted" if quota else "cooldown"
+        health.reason = str(reason)[:500]
+        health.failures += 1
+        health.last_failure_at = now
+        health.blocked_until = max(health.blocked_until, now + float(seconds))
+        self._save(key, health)
+        logger.warning("Provider cooldown set: %s for %ss (%s)", key, int(seconds), reason)
+
+    def record_error(self, provider: str, kind: str, exc: Exception, **backoff: Any) -> None:
+        # The one classification of provider errors, used by the API selector and the poller alike:
+        # a spent TwelveData quota waits for the next UTC day, rejected Finnhub credentials for
+        # AUTH_COOLDOWN_SECONDS, anything else goes through the failure streak. Local rate-limit
+        # denials never reached the provider and are ignored.
+        if is_local_denial(exc):
+            return
+        if is_rate_limit_error(exc) and quota_cooldown_enabled(provider):
+            self.set_cooldown(provider, kind, seconds_until_next_utc_day(), str(exc), quota=True)
+        elif is_auth_error(exc) and auth_cooldown_enabled(provider):
+            self.set_cooldown(provider, kind, AUTH_COOLDOWN_SECONDS, str(exc))
+        else:
+            self.record_failure(provider, kind, exc, **backoff)
+
+    def snapshot(self) -> Dict[str, Any]:
+        self._refresh(force=True)
+        now = time.time()
+        with self._lock:
+            providers: List[Dict[str, Any]] = []
+            for key, health in sorted(self._health.items()):
+                blocked = health.blocked_until > now
+                providers.append(
+                    {
+                        "key": key,
+                        "state": health.state if blocked or health.state == "ok" else "probing",
+                        "available": not blocked,
+                        "reason": health.reason,
+                        "failures": health.failures,
+                        "blocked_for_seconds": round(max(0.0, health.blocked_until - now), 1),
+                        "last_success_at": health.last_success_at,
+                        "last_failure_at": health.last_failure_at,
+                        "updated_at": health.updated_at,
+                    }
+                )
+            return {"shared": self.shared, "db_errors": self._db_errors, "providers": providers}
+
+
+_REGISTRY: Optional[ProviderHealthRegistry] = None
+_REGISTRY_LOCK = threading.Lock()
+
+
+def get_provider_health() -> ProviderHealthRegistry:
+    global _REGISTRY
+    with _REGISTRY_LOCK:
+        if _REGISTRY is None:
+            shared = os.getenv("PROVIDER_HEALTH_SHARED", "true").strip().lower() in {"1", "true", "yes", "on"}
+            _REGISTRY = ProviderHealthRegistry(shared=shared)
+        return _REGISTRY
@@ -0,0 +1,173 @@
+# app/providers/http.py
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.providers.deadline import clamp_timeout
+
+# One keep-alive session per upstream host, shared by every caller in the process, so repeat
+# calls to a provider reuse pooled TCP/TLS connections instead of handshaking each time.
+_SESSIONS: Dict[str, requests.Session] = {}
+_STATS: Dict[str, Dict[str, Any]] = {}
+_LOCK = threading.Lock()
+
+Timeout = Union[float, Tuple[float, float]]
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.getenv(name, str(default))))
+    except ValueError:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return max(0.1, float(os.getenv(name, str(default))))
+    except ValueError:
+        return default
+
+
+def _host_key(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme or 'https'}://{(parts.netloc or parts.path).lower()}"
+
+
+def http_timeout(read_timeout: Optional[float] = None) -> Tuple[float, float]:
+    # Connect failures should surface fast; the read budget stays whatever the caller asked for.
+    read = float(read_timeout) if read_timeout else _env_float("HTTP_READ_TIMEOUT_SECONDS", 20.0)
+    connect = min(_env_float("HTTP_CONNECT_TIMEOUT_SECONDS", 3.05), read)
+    return connect, read
+
+
+def _new_session() -> requests.Session:
+    session = requests.Session()
+    # No adapter-level retries: the selector's provider fallback already decides what to retry.
+    adapter = HTTPAdapter(
+        pool_connections=_env_int("HTTP_POOL_CONNECTIONS", 2),
+        pool_maxsize=_env_int("HTTP_POOL_MAXSIZE", 10),
+        max_retries=0,
+        pool_block=False,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session(url: str) -> requests.Session:
+    key = _host_key(url)
+    session = _SESSIONS.get(key)
+    if session is not None:
+        return session
+    with _LOCK:
+        session = _SESSIONS.get(key)
+        if session is None:
+            session = _new_session()
+            _SESSIONS[key] = session
+        return session
+
+
+def _record(key: str, duration_ms: float, status: Optional[int]) -> None:
+    with _LOCK:
+        stats = _STATS.get(key)
+        if stats is None:
+            stats = {"requests": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0, "status": {}}
+            _STATS[key] = stats
+        stats["requests"] += 1
+        stats["total_ms"] += duration_ms
+        stats["max_ms"] = max(stats["max_ms"], duration_ms)
+        if status is None:
+            stats["errors"] += 1
+        else:
+            bucket = f"{status // 100}xx"
+            stats["status"][bucket] = stats["status"].get(bucket, 0) + 1
+
+
+def http_request(
+    method: str,
+    url: str,
+    *,
+    timeout: Optional[Timeout] = None,
+    **kwargs: Any,
+) -> requests.Response:
+    if timeout is None or isinstance(timeout, (int, float)):
+        timeout = http_timeout(timeout)
+    # A request-scoped deadline (app.providers.deadline) caps both timeouts to the budget left.
+    timeout = clamp_timeout(timeout[0], timeout[1], _host_key(url))
+    session = get_session(url)
+    started = time.perf_counter()
+    status: Optional[int] = None
+    try:
+        response = session.request(method, url, timeout=timeout, **kwargs)
+        status = response.status_code
+        return response
+    finally:
+        _record(_host_key(url), (time.perf_counter() - started) * 1000.0, status)
+
+
+def http_get(
+    url: str,
+    params: Optional[Dict[str, Any]] = None,
+    headers: Optional[Dict[str, str]] = None,
+    timeout: Optional[Timeout] = None,
+) -> requests.Response:
+    return http_request("GET", url, params=params, headers=headers, timeout=timeout)
+
+
+def _pool_counters(session: requests.Session) -> Dict[str, int]:
+    # urllib3 counts connections opened per pool; requests >> connections means keep-alive works.
+    opened = 0
+    served = 0
+    for adapter in session.adapters.values():
+        manager = getattr(adapter, "poolmanager", None)
+        pools = getattr(manager, "pools", None)
+        if pools is None:
+            continue
+        for pool_key in list(pools.keys()):
+            pool = pools.get(pool_key)
+            opened += int(getattr(pool, "num_connections", 0) or 0)
+            served += int(getattr(pool, "num_requests", 0) or 0)
+    return {"connections_opened": opened, "pool_requests": served}
+
+
+def get_http_stats() -> Dict[str, Any]:
+    with _LOCK:
+        sessions = dict(_SESSIONS)
+        snapshot = {key: dict(stats, status=dict(stats["status"])) for key, stats in _STATS.items()}
+    hosts: Dict[str, Any] = {}
+    for key, stats in sorted(snapshot.items()):
+        count = stats["requests"]
+        row = {
+            **stats,
+            "total_ms": round(stats["total_ms"], 3),
+            "max_ms": round(stats["max_ms"], 3),
+            "avg_ms": round(stats["total_ms"] / count, 3) if count else 0.0,
+        }
+        session = sessions.get(key)
+        if session is not None:
+            row.update(_pool_counters(session))
+        hosts[key] = row
+    return {
+        "pool_maxsize": _env_int("HTTP_POOL_MAXSIZE", 10),
+        "connect_timeout_seconds": _env_float("HTTP_CONNECT_TIMEOUT_SECONDS", 3.05),
+        "hosts": hosts,
+    }
+
+
+def close_http_clients() -> None:
+    with _LOCK:
+        sessions = list(_SESSIONS.values())
+        _SESSIONS.clear()
+    for session in sessions:
+        try:
+            session.close()
+        except Exception:
+            pass
@@ -0,0 +1,221 @@
+# app/providers/rate_limit.py
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+
+from core.storage.db import get_connection
+
+logger = logging.getLogger(__name__)
+
+# Token buckets per "provider:kind": capacity is the per-minute limit and tokens refill continuously
+# at limit/60 per second, so a full minute's budget can burst and then drains at the steady rate.
+# Each bucket also carries a per-UTC-day call counter. Every operation is O(1). A request billed per
+# symbol takes several tokens in one acquire.
+#
+# The "db" backend keeps the buckets in provider_rate_buckets, so API workers and the poller share
+# one budget; each acquire is one conditional UPDATE, which is atomic on both SQLite and Postgres.
+# If the database is unavailable the limiter falls back to the in-process buckets.
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    raw = os.getenv(name)
+    if raw is None:
+        return default
+    return raw.strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _utc_day() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+
+class _Bucket:
+    __slots__ = ("tokens", "updated_at", "day", "day_count")
+
+    def __init__(self, capacity: float, now: float) -> None:
+        self.tokens = capacity
+        self.updated_at = now
+        self.day = ""
+        self.day_count = 0
+
+
+class RateLimiter:
+    def __init__(self, backend: str = "memory") -> None:
+        self.backend = backend if backend in {"memory", "db"} else "memory"
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, _Bucket] = {}
+        self._seeded: set = set()
+        self._counters = {"acquired": 0, "denied": 0, "waited": 0, "db_errors": 0}
+
+    def _bump(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def _try_local(
+        self, key: str, per_minute: int, per_day: int, now: float, day: str, tokens: int
+    ) -> Tuple[bool, Optional[float], int]:
+        capacity = float(max(1, per_minute))
+        rate = capacity / 60.0
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = _Bucket(capacity, now)
+                self._buckets[key] = bucket
+            bucket.tokens = min(capacity, bucket.tokens + max(0.0, now - bucket.updated_at) * rate)
+            bucket.updated_at = now
+            if bucket.day != day:
+                bucket.day = day
+                bucket.day_count = 0
+            available = min(int(bucket.tokens), per_day - bucket.day_count)
+            if bucket.day_count + tokens > per_day:
+                return False, None, max(0, available)
+            if bucket.tokens < tokens:
+                return False, (tokens - bucket.tokens) / rate, max(0, available)
+            bucket.tokens -= tokens
+            bucket.day_count += tokens
+            return True, 0.0, tokens
+
+    def _try_db(
+        self, key: str, per_minute: int, per_day: int, now: float, day: str, tokens: int
+    ) -> Tuple[bool, Optional[float], int]:
+        capacity = float(max(1, per_minute))
+        rate = capacity / 60.0
+        with get_connection() as conn:
+            least, greatest = ("LEAST", "GREATEST") if conn.backend == "postgres" else ("MIN", "MAX")
+            if key not in self._seeded:
+                conn.executemany(
+                    """
+                    INSERT INTO provider_rate_buckets (bucket_key, tokens, updated_at, day, day_count)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT (bucket_key) DO NOTHING
+                    """,
+                    [(key, capacity, now, day, 0)],
+                )
+                with self._lock:
+                    self._seeded.add(key)
+            # All or nothing: the whole request is granted by one conditional UPDATE or not at all.
+            refilled = f"{least}(?, tokens + {greatest}(0, ? - updated_at) * ?)"
+            result = conn.execute(
+                f"""
+                UPDATE provider_rate_buckets
+                SET tokens = {refilled} - ?,
+                    updated_at = {greatest}(updated_at, ?),
+                    day_count = CASE WHEN day = ? THEN day_count + ? ELSE ? END,
+                    day = ?
+                WHERE bucket_key = ?
+                  AND {refilled} >= ?
+                  AND CASE WHEN day = ? THEN day_count ELSE 0 END + ? <= ?
+                """,
+                (capacity, now, rate, tokens, now, day, tokens, tokens, day, key, capacity, now, rate, tokens, day, tokens, per_day),
+            )
+            if result.rowcount:
+                return True, 0.0, tokens
+            rows = conn.execute(
+                "SELECT tokens, updated_at, day, day_count FROM provider_rate_buckets WHERE bucket_key = ?",
+                (key,),
+            ).fetchall()
+        if not rows:
+            # The seeding transaction was lost; seed again on the next call.
+            with self._lock:
+                self._seeded.discard(key)
+            return False, 60.0 / capacity, 0
+        row = rows[0]
+        used = int(row.get("day_count") or 0) if str(row.get("day")) == day else 0
+        level = min(capacity, float(row.get("tokens") or 0.0) + max(0.0, now - float(row.get("updated_at") or now)) * rate)
+        available = max(0, min(int(level), per_day - used))
+        if used + tokens > per_day:
+            return False, None, available
+        return False, max(0.0, (tokens - level) / rate), available
+
+    def _try(self, key: str, per_minute: int, per_day: int, tokens: int = 1) -> Tuple[bool, Optional[float], int]:
+        # (acquired, seconds until enough tokens are due, whole tokens available now); a None wait
+        # means the daily budget cannot cover the request.
+        now = time.time()
+        day = _utc_day()
+        tokens = max(1, int(tokens))
+        if self.backend == "db":
+            try:
+                return self._try_db(key, per_minute, per_day, now, day, tokens)
+            except Exception as exc:
+                self._bump("db_errors")
+                logger.warning("rate_limit_db_failed key=%s error=%s; using in-process bucket", key, exc)
+        return self._try_local(key, per_minute, per_day, now, day, tokens)
+
+    def try_acquire(self, key: str, per_minute: int, per_day: int = 10000, tokens: int = 1) -> bool:
+        acquired, _, _ = self._try(key, per_minute, per_day, tokens)
+        self._bump("acquired" if acquired else "denied")
+        return acquired
+
+    def try_acquire_up_to(self, key: str, per_minute: int, per_day: int = 10000, tokens: int = 1) -> int:
+        # Grants all of `tokens` in one step when the bucket holds them; otherwise retries once with
+        # what the bucket reported as available. Returns the number granted (0 when none).
+        acquired, _, available = self._try(key, per_minute, per_day, tokens)
+        if not acquired and 0 < available < tokens:
+            tokens = available
+            acquired, _, _ = self._try(key, per_minute, per_day, tokens)
+        self._bump("acquired" if acquired else "denied")
+        return tokens if acquired else 0
+
+    def acquire(self, key: str, per_minute: int, per_day: int = 10000, timeout_seconds: float = 0.0) -> bool:
+        # Blocks until a token is available or the deadline passes; never waits on a spent daily budget.
+        deadline = time.monotonic() + max(0.0, float(timeout_seconds))
+        waited = False
+        while True:
+            acquired, wait, _ = self._try(key, per_minute, per_day)
+            if acquired:
+                self._bump("acquired")
+                if waited:
+                    self._bump("waited")
+                return True
+            remaining = deadline - time.monotonic()
+            if wait is None or remaining <= 0 or wait > remaining:
+                self._bump("denied")
+                return False
+            waited = True
+            time.sleep(max(0.01, wait))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out: Dict[str, Any] = dict(self._counters)
+            local = {
+                key: {"tokens": round(bucket.tokens, 3), "day": bucket.day, "day_count": bucket.day_count}
+                for key, bucket in sorted(self._buckets.items())
+            }
+        out["backend"] = self.backend
+        out["local_buckets"] = local
+        if self.backend == "db":
+            try:
+                with get_connection() as conn:
+                    rows = conn.execute(
+                        "SELECT bucket_key, tokens, updated_at, day, day_count FROM provider_rate_buckets ORDER BY bucket_key"
+                    ).fetchall()
+                out["shared_buckets"] = {
+                    str(row.get("bucket_key")): {
+                        "tokens": round(float(row.get("tokens") or 0.0), 3),
+                        "updated_at": row.get("updated_at"),
+                        "day": row.get("day"),
+                        "day_count": row.get("day_count"),
+                    }
+                    for row in rows
+                }
+            except Exception as exc:
+                out["shared_buckets_error"] = str(exc)
+        return out
+
+
+_LIMITER: Optional[RateLimiter] = None
+_LIMITER_LOCK = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    global _LIMITER
+    with _LIMITER_LOCK:
+        if _LIMITER is None:
+            shared = _env_bool("PROVIDER_RATE_LIMIT_SHARED", True)
+            _LIMITER = RateLimiter(backend="db" if shared else "memory")
+        return _LIMITER
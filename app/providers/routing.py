@@ -0,0 +1,184 @@
+# app/providers/routing.py
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Sequence
+
+from app.providers.health import get_provider_health, health_key
+
+# Orders a fallback chain by expected cost instead of a fixed list. Per "provider:kind" we keep
+# EWMAs of call latency, error rate and throttle rate (provider 429s and local rate-limit denials,
+# i.e. how close the provider is to its quota). Expected cost in milliseconds:
+#
+#   latency + (error_rate + throttle_rate) * failure penalty + position * order bias
+#
+# The position bias keeps the configured default order on ties and against noise. Scores decay
+# back to the prior as they age, so a provider that stopped being tried is retried eventually.
+# Providers the health registry is blocking always go last.
+#
+# PROVIDER_ROUTE_<KIND> (e.g. PROVIDER_ROUTE_QUOTE=yahoo,finnhub) pins providers to the front in
+# that order; PROVIDER_ROUTING_ADAPTIVE=false keeps the default order everywhere.
+
+_PRIOR_LATENCY_MS = 500.0
+_LATENCY_WINDOW = 50
+_MIN_QUANTILE_SAMPLES = 5
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return max(0.0, float(os.getenv(name, str(default))))
+    except ValueError:
+        return default
+
+
+def _quantile(values: Sequence[float], q: float) -> Optional[float]:
+    if len(values) < _MIN_QUANTILE_SAMPLES:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _adaptive_enabled() -> bool:
+    return os.getenv("PROVIDER_ROUTING_ADAPTIVE", "true").strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _pinned(kind: str) -> List[str]:
+    raw = os.getenv(f"PROVIDER_ROUTE_{kind.upper()}", "")
+    return [part.strip().lower() for part in raw.split(",") if part.strip()]
+
+
+class _Score:
+    __slots__ = ("latency_ms", "error_rate", "throttle_rate", "samples", "updated_at", "recent_ms")
+
+    def __init__(self) -> None:
+        self.latency_ms = _PRIOR_LATENCY_MS
+        self.error_rate = 0.0
+        self.throttle_rate = 0.0
+        self.samples = 0
+        self.updated_at = 0.0
+        # Latencies of recent successful calls, for quantiles (hedging delay).
+        self.recent_ms: deque = deque(maxlen=_LATENCY_WINDOW)
+
+
+class ProviderRouter:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._scores: Dict[str, _Score] = {}
+        self._last_order: Dict[str, List[str]] = {}
+        self._hedges: Dict[str, Dict[str, int]] = {}
+
+    def _update(self, key: str, latency_ms: Optional[float], error: float, throttled: float) -> None:
+        alpha = min(1.0, max(0.01, _env_float("PROVIDER_ROUTING_EWMA_ALPHA", 0.2)))
+        now = time.time()
+        with self._lock:
+            score = self._scores.get(key)
+            if score is None:
+                score = _Score()
+                self._scores[key] = score
+            self._decay(score, now)
+            if latency_ms is not None:
+                # The first real sample replaces the prior outright.
+                weight = alpha if score.samples else 1.0
+                score.latency_ms += weight * (float(latency_ms) - score.latency_ms)
+                score.samples += 1
+            score.error_rate += alpha * (error - score.error_rate)
+            score.throttle_rate += alpha * (throttled - score.throttle_rate)
+            score.updated_at = now
+
+    def _decay(self, score: _Score, now: float) -> None:
+        # Pulls an idle score back toward the prior (half-life PROVIDER_ROUTING_DECAY_SECONDS).
+        if not score.updated_at:
+            return
+        half_life = max(1.0, _env_float("PROVIDER_ROUTING_DECAY_SECONDS", 600.0))
+        keep = 0.5 ** (max(0.0, now - score.updated_at) / half_life)
+        score.latency_ms = _PRIOR_LATENCY_MS + (score.latency_ms - _PRIOR_LATENCY_MS) * keep
+        score.error_rate *= keep
+        score.throttle_rate *= keep
+        score.updated_at = now
+
+    def record(self, provider: str, kind: str, latency_ms: float, ok: bool, throttled: bool = False) -> None:
+        key = health_key(provider, kind)
+        self._update(key, latency_ms, 0.0 if ok else 1.0, 1.0 if throttled else 0.0)
+        if ok:
+            with self._lock:
+                self._scores[key].recent_ms.append(float(latency_ms))
+
+    def latency_quantile(self, provider: str, kind: str, q: float = 0.9) -> Optional[float]:
+        # None until enough successful calls have been seen to make the quantile meaningful.
+        with self._lock:
+            score = self._scores.get(health_key(provider, kind))
+            recent = list(score.recent_ms) if score is not None else []
+        return _quantile(recent, q)
+
+    def record_hedge(self, kind: str, event: str) -> None:
+        with self._lock:
+            counters = self._hedges.setdefault(kind, {"fired": 0, "won": 0, "budget_denied": 0})
+            counters[event] = counters.get(event, 0) + 1
+
+    def record_throttle(self, provider: str, kind: str) -> None:
+        # A local rate-limit denial: no call was made, so there is no latency sample.
+        self._update(health_key(provider, kind), None, 0.0, 1.0)
+
+    def _cost(self, key: str, position: int, now: float) -> float:
+        score = self._scores.get(key)
+        bias = position * _env_float("PROVIDER_ROUTING_ORDER_BIAS_MS", 50.0)
+        if score is None:
+            return _PRIOR_LATENCY_MS + bias
+        self._decay(score, now)
+        penalty = _env_float("PROVIDER_ROUTING_FAILURE_PENALTY_MS", 2000.0)
+        return score.latency_ms + (score.error_rate + score.throttle_rate) * penalty + bias
+
+    def order(self, kind: str, providers: Sequence[str]) -> List[str]:
+        default = [provider.lower() for provider in providers]
+        pinned = [provider for provider in _pinned(kind) if provider in default]
+        rest = [provider for provider in default if provider not in pinned]
+        if _adaptive_enabled():
+            health = get_provider_health()
+            now = time.time()
+            with self._lock:
+                costs = {provider: self._cost(health_key(provider, kind), default.index(provider), now) for provider in rest}
+            rest.sort(key=lambda provider: (not health.is_available(provider, kind), costs[provider]))
+        ordered = pinned + rest
+        with self._lock:
+            self._last_order[kind] = ordered
+        return ordered
+
+    def scores(self) -> Dict[str, Any]:
+        now = time.time()
+        with self._lock:
+            providers: Dict[str, Any] = {}
+            for key, score in sorted(self._scores.items()):
+                self._decay(score, now)
+                providers[key] = {
+                    "latency_ms": round(score.latency_ms, 1),
+                    "error_rate": round(score.error_rate, 4),
+                    "throttle_rate": round(score.throttle_rate, 4),
+                    "samples": score.samples,
+                    "cost_ms": round(self._cost(key, 0, now), 1),
+                    "p90_ms": _quantile(list(score.recent_ms), 0.9),
+                }
+            last_order = {kind: list(order) for kind, order in self._last_order.items()}
+            hedges = {kind: dict(counters) for kind, counters in self._hedges.items()}
+        return {
+            "adaptive": _adaptive_enabled(),
+            "pinned": {kind: _pinned(kind) for kind in sorted(last_order) if _pinned(kind)},
+            "last_order": last_order,
+            "hedges": hedges,
+            "providers": providers,
+        }
+
+
+_ROUTER: Optional[ProviderRouter] = None
+_ROUTER_LOCK = threading.Lock()
+
+
+def get_provider_router() -> ProviderRouter:
+    global _ROUTER
+    with _ROUTER_LOCK:
+        if _ROUTER is None:
+            _ROUTER = ProviderRouter()
+        return _ROUTER
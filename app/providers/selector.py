@@ -4,38 +4,62 @@ from __future__ import annotations
 
 import logging
 import os
-import json
+import threading
 import time
-from dataclasses import dataclass
-from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, List, Optional, Tuple
-
-import requests
-
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, as_completed, wait
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.providers.bar_delta import delta_start, load_stored_bars_many, merge_bars
+from app.providers.bar_series import BarSeries
+from app.providers.deadline import DeadlineExceeded, budget_seconds, deadline, expired, in_context, remaining
 from app.providers.finnhub import FinnhubClient
-from app.providers.twelvedata import BarModel, ProviderError, QuoteOutModel, TwelveDataClient
+from app.providers.health import get_provider_health, health_key, is_rate_limit_error
+from app.providers.http import http_get
+from app.providers.rate_limit import get_rate_limiter
+from app.providers.routing import get_provider_router
+from app.providers.twelvedata import ProviderError, QuoteOutModel, TwelveDataClient
 from app.providers.yahoo import fetch_bars as fetch_yahoo_bars
 from app.ws.twelvedata_ws import get_ws_client
-from app.validation.market_data import validate_bars, validate_quote
+from app.validation.market_data import validate_quote
+from core.repositories.instruments import canonical_instrument_id, register_instruments
+from core.repositories.latest_quotes import LatestQuotesRepository
 from core.storage.db import get_connection
+from ingestion.repository import PRICE_BAR_COLUMNS, PRICE_BAR_CONFLICT_COLUMNS
 
 
 @dataclass
 class BarsResult:
     provider: str
-    bars: List[Any]
+    bars: BarSeries
+    # Seconds past the cache TTL when served from a stale entry; 0.0 for fresh data.
+    stale_seconds: float = 0.0
 
 
 @dataclass
 class QuoteResult:
     provider: str
     quote: Any
+    stale_seconds: float = 0.0
+
+
+@dataclass
+class QuotesBatchResult:
+    quotes: Dict[str, QuoteResult]
+    errors: Dict[str, str]
+    # symbol -> where the quote came from: "memory", "twelvedata_ws", a provider name, or "stale"
+    provenance: Dict[str, str]
+    provider_requests: int = 0
 
 
 # Simple in memory TTL caches
-# Keyed by symbol or (symbol, interval, outputsize)
+# Quotes are keyed by symbol. Bars are keyed by (symbol, interval) and hold the longest series
+# fetched, oldest first, plus the outputsize it was fetched with; any shorter request is a tail slice.
 _QUOTE_CACHE: Dict[str, Tuple[float, QuoteResult]] = {}
-_BARS_CACHE: Dict[Tuple[str, str, int], Tuple[float, BarsResult]] = {}
+_BARS_CACHE: Dict[Tuple[str, str], Tuple[float, BarsResult, int]] = {}
+_BARS_CACHE_COUNTERS = {"hits": 0, "sliced_hits": 0, "misses": 0, "stale_hits": 0}
 
 # Tunable TTLs
 _QUOTE_TTL_SECONDS = 20
@@ -43,15 +67,13 @@ _BARS_TTL_SECONDS = 300
 
 # When rate limited or provider down, allow serving slightly stale data
 _STALE_GRACE_SECONDS = 10 * 60
-_PROVIDER_COOLDOWN_SECONDS_RATE_LIMIT = 12 * 60 * 60
-_PROVIDER_COOLDOWN_SECONDS_AUTH = 24 * 60 * 60
-_PROVIDER_COOLDOWN_UNTIL: Dict[str, float] = {}
-_PROVIDER_COOLDOWN_REASON: Dict[str, str] = {}
-_PROVIDER_CALLS_MINUTE: Dict[str, List[float]] = {}
-_PROVIDER_CALLS_DAY: Dict[str, Tuple[str, int]] = {}
+# Stale-while-revalidate windows past the TTL: the cached value is served at once and one
+# background refresh is started. QUOTE_SWR_GRACE_SECONDS / BARS_SWR_GRACE_SECONDS; 0 disables.
+_SWR_GRACE_DEFAULTS = {"quote": 30, "bars": 600}
 _PROVIDER_CALLS_DAY_LIMIT = 10000
 
 logger = logging.getLogger(__name__)
+_LATEST_QUOTES_REPO = LatestQuotesRepository()
 _YAHOO_HEADERS = {
     "User-Agent": "Mozilla/5.0",
 }
@@ -61,6 +83,142 @@ def _now() -> float:
     return time.monotonic()
 
 
+class _Flight:
+    __slots__ = ("done", "result", "error", "followers")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.followers = 0
+
+
+class _SingleFlight:
+    # Concurrent callers asking for the same key share one in-flight provider fetch: the first
+    # caller runs it, the rest wait and receive the same result or exception.
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._flights: Dict[Tuple[Any, ...], _Flight] = {}
+        self._counters = {"leaders": 0, "coalesced": 0, "shared_errors": 0}
+        self._by_kind: Dict[str, Dict[str, int]] = {}
+
+    def _bump(self, kind: str, name: str, amount: int = 1) -> None:
+        self._counters[name] += amount
+        bucket = self._by_kind.setdefault(kind, {"leaders": 0, "coalesced": 0, "shared_errors": 0})
+        bucket[name] += amount
+
+    def do(self, key: Tuple[Any, ...], fn: Callable[[], Any]) -> Any:
+        kind = str(key[0])
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._flights[key] = flight
+                self._bump(kind, "leaders")
+            else:
+                flight.followers += 1
+                self._bump(kind, "coalesced")
+        if not leader:
+            # A follower waits no longer than its own deadline, whatever budget the leader has.
+            if not flight.done.wait(timeout=remaining()):
+                raise DeadlineExceeded("deadline exceeded waiting for an in-flight fetch")
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = fn()
+            return flight.result
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+                if flight.error is not None and flight.followers:
+                    self._bump(kind, "shared_errors", flight.followers)
+            flight.done.set()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._counters,
+                "in_flight": len(self._flights),
+                "by_kind": {kind: dict(bucket) for kind, bucket in self._by_kind.items()},
+            }
+
+
+_SINGLE_FLIGHT = _SingleFlight()
+
+
+def get_coalescing_stats() -> Dict[str, Any]:
+    # "coalesced" is the number of provider calls saved by joining an in-flight fetch.
+    return _SINGLE_FLIGHT.stats()
+
+
+_REVALIDATE_EXECUTOR: Optional[ThreadPoolExecutor] = None
+_REVALIDATING: set = set()
+_REVALIDATE_LOCK = threading.Lock()
+_SWR_COUNTERS = {"served_stale": 0, "scheduled": 0, "deduplicated": 0, "dropped": 0, "refreshed": 0, "failed": 0}
+
+
+def _swr_grace_seconds(kind: str) -> float:
+    try:
+        return max(0.0, float(os.getenv(f"{kind.upper()}_SWR_GRACE_SECONDS", str(_SWR_GRACE_DEFAULTS[kind]))))
+    except ValueError:
+        return float(_SWR_GRACE_DEFAULTS[kind])
+
+
+def _revalidate_many(keys: List[Tuple[Any, ...]], refresh: Callable[[List[Tuple[Any, ...]]], Any]) -> None:
+    # Starts one background refresh for the keys not already being refreshed. The executor is
+    # bounded (SWR_MAX_WORKERS) and so is the backlog (SWR_MAX_PENDING keys); past that the
+    # refresh is dropped and the next request past the TTL tries again.
+    global _REVALIDATE_EXECUTOR
+    with _REVALIDATE_LOCK:
+        _SWR_COUNTERS["served_stale"] += len(keys)
+        fresh_keys = [key for key in keys if key not in _REVALIDATING]
+        _SWR_COUNTERS["deduplicated"] += len(keys) - len(fresh_keys)
+        if not fresh_keys:
+            return
+        if len(_REVALIDATING) + len(fresh_keys) > _batch_size_setting("SWR_MAX_PENDING", 256):
+            _SWR_COUNTERS["dropped"] += len(fresh_keys)
+            return
+        _REVALIDATING.update(fresh_keys)
+        _SWR_COUNTERS["scheduled"] += len(fresh_keys)
+        if _REVALIDATE_EXECUTOR is None:
+            _REVALIDATE_EXECUTOR = ThreadPoolExecutor(
+                max_workers=_batch_size_setting("SWR_MAX_WORKERS", 4),
+                thread_name_prefix="swr-refresh",
+            )
+        executor = _REVALIDATE_EXECUTOR
+
+    def _run() -> None:
+        ok = False
+        try:
+            # Background work has no caller deadline; it gets its own budget.
+            with deadline(budget_seconds("revalidate", 30.0)):
+                refresh(fresh_keys)
+            ok = True
+        except Exception as exc:
+            logger.warning("swr refresh failed for %s keys: %s", len(fresh_keys), exc)
+        finally:
+            with _REVALIDATE_LOCK:
+                _REVALIDATING.difference_update(fresh_keys)
+                _SWR_COUNTERS["refreshed" if ok else "failed"] += len(fresh_keys)
+
+    executor.submit(_run)
+
+
+def get_swr_stats() -> Dict[str, Any]:
+    with _REVALIDATE_LOCK:
+        return {
+            **_SWR_COUNTERS,
+            "in_flight": len(_REVALIDATING),
+            "grace_seconds": {kind: _swr_grace_seconds(kind) for kind in _SWR_GRACE_DEFAULTS},
+        }
+
+
 def _get_cached_quote(symbol: str) -> Optional[QuoteResult]:
     entry = _QUOTE_CACHE.get(symbol)
     if not entry:
@@ -71,14 +229,15 @@ def _get_cached_quote(symbol: str) -> Optional[QuoteResult]:
     return None
 
 
-def _get_cached_quote_allow_stale(symbol: str) -> Optional[QuoteResult]:
+def _get_cached_quote_allow_stale(symbol: str, grace_seconds: float = _STALE_GRACE_SECONDS) -> Optional[QuoteResult]:
     entry = _QUOTE_CACHE.get(symbol)
     if not entry:
         return None
     expires_at, payload = entry
     # Allow stale within grace window
-    if expires_at + _STALE_GRACE_SECONDS >= _now():
-        return payload
+    now = _now()
+    if expires_at + grace_seconds >= now:
+        return replace(payload, stale_seconds=round(max(0.0, now - expires_at), 3))
     return None
 
 
@@ -86,80 +245,132 @@ def _set_cached_quote(symbol: str, payload: QuoteResult) -> None:
     _QUOTE_CACHE[symbol] = (_now() + _QUOTE_TTL_SECONDS, payload)
 
 
-def _get_cached_bars(key: Tuple[str, str, int]) -> Optional[BarsResult]:
-    entry = _BARS_CACHE.get(key)
-    if not entry:
-        return None
-    expires_at, payload = entry
-    if expires_at >= _now():
-        return payload
-    return None
+def _remember_quote(symbol: str, payload: QuoteResult) -> None:
+    _set_cached_quote(symbol, payload)
+    get_provider_health().record_success(payload.provider, "quote")
+    quote = payload.quote
+    quote_dict = quote.model_dump(mode="json") if hasattr(quote, "model_dump") else quote
+    try:
+        _LATEST_QUOTES_REPO.upsert(symbol, payload.provider, quote_dict, deferred=True)
+    except Exception as exc:
+        logger.warning("latest_quotes upsert failed for %s: %s", symbol, exc)
 
 
-def _get_cached_bars_allow_stale(key: Tuple[str, str, int]) -> Optional[BarsResult]:
-    entry = _BARS_CACHE.get(key)
-    if not entry:
-        return None
-    expires_at, payload = entry
-    if expires_at + _STALE_GRACE_SECONDS >= _now():
-        return payload
-    return None
+def _bars_min_fetch_size() -> int:
+    # Small requests (2-bar change lookups) fetch a useful window so later 60-bar reads hit.
+    try:
+        return max(1, int(os.getenv("BARS_CACHE_MIN_OUTPUTSIZE", "60")))
+    except ValueError:
+        return 60
 
 
-def _set_cached_bars(key: Tuple[str, str, int], payload: BarsResult) -> None:
-    _BARS_CACHE[key] = (_now() + _BARS_TTL_SECONDS, payload)
+def _bars_fetch_size(size: int) -> int:
+    return max(int(size), _bars_min_fetch_size())
 
 
-def _cooldown_key(provider: str, kind: str) -> str:
-    return f"{provider.lower()}:{kind}"
+def _bars_tail(entry: Tuple[float, BarsResult, int], size: int) -> Optional[BarsResult]:
+    # An entry covers `size` when it holds that many bars, or when it was fetched with at least
+    # that outputsize and the provider simply had less history.
+    _, payload, fetched_size = entry
+    bars = payload.bars
+    if len(bars) < size and fetched_size < size:
+        return None
+    if len(bars) <= size:
+        return payload
+    return BarsResult(provider=payload.provider, bars=bars[-size:])
+
+
+def _get_cached_bars(key: Tuple[str, str, int], record: bool = True) -> Optional[BarsResult]:
+    symbol_u, interval_v, size_v = key
+    entry = _BARS_CACHE.get((symbol_u, interval_v))
+    result = _bars_tail(entry, size_v) if entry and entry[0] >= _now() else None
+    if record:
+        _BARS_CACHE_COUNTERS["hits" if result is not None else "misses"] += 1
+        if result is not None and len(entry[1].bars) > size_v:
+            _BARS_CACHE_COUNTERS["sliced_hits"] += 1
+    return result
+
+
+def _get_cached_bars_allow_stale(
+    key: Tuple[str, str, int],
+    grace_seconds: float = _STALE_GRACE_SECONDS,
+) -> Optional[BarsResult]:
+    symbol_u, interval_v, size_v = key
+    entry = _BARS_CACHE.get((symbol_u, interval_v))
+    now = _now()
+    if not entry or entry[0] + grace_seconds < now:
+        return None
+    result = _bars_tail(entry, size_v)
+    if result is None:
+        return None
+    _BARS_CACHE_COUNTERS["stale_hits"] += 1
+    return replace(result, stale_seconds=round(max(0.0, now - entry[0]), 3))
+
+
+def _set_cached_bars(key: Tuple[str, str, int], payload: BarsResult, fetched_size: Optional[int] = None) -> BarsResult:
+    # Stores the series oldest first and returns the slice the caller asked for. A live entry that
+    # already covers more bars is kept, so a concurrent short fetch never shrinks the cache.
+    symbol_u, interval_v, size_v = key
+    fetched_size = max(size_v, fetched_size or 0, len(payload.bars))
+    # Series are sorted when they are built, so the cache stores them as they come.
+    ordered = BarsResult(provider=payload.provider, bars=BarSeries.coerce(payload.bars))
+    now = _now()
+    current = _BARS_CACHE.get((symbol_u, interval_v))
+    if current and current[0] >= now and current[2] > fetched_size:
+        return _bars_tail(current, size_v) or ordered
+    entry = (now + _BARS_TTL_SECONDS, ordered, fetched_size)
+    _BARS_CACHE[(symbol_u, interval_v)] = entry
+    return _bars_tail(entry, size_v) or ordered
+
+
+def get_bars_cache_stats() -> Dict[str, Any]:
+    now = _now()
+    entries = list(_BARS_CACHE.values())
+    lookups = _BARS_CACHE_COUNTERS["hits"] + _BARS_CACHE_COUNTERS["misses"]
+    return {
+        **_BARS_CACHE_COUNTERS,
+        "hit_rate": round(_BARS_CACHE_COUNTERS["hits"] / lookups, 4) if lookups else 0.0,
+        "series": len(entries),
+        "live_series": sum(1 for entry in entries if entry[0] >= now),
+        "cached_bars": sum(len(entry[1].bars) for entry in entries),
+        "cached_bytes": sum(entry[1].bars.nbytes for entry in entries),
+        "min_fetch_outputsize": _bars_min_fetch_size(),
+    }
 
 
-def _provider_in_cooldown(provider: str, kind: str) -> bool:
-    key = _cooldown_key(provider, kind)
-    until = _PROVIDER_COOLDOWN_UNTIL.get(key, 0.0)
-    if until <= _now():
-        _PROVIDER_COOLDOWN_UNTIL.pop(key, None)
-        _PROVIDER_COOLDOWN_REASON.pop(key, None)
-        return False
-    return True
+def _cooldown_key(provider: str, kind: str) -> str:
+    return health_key(provider, kind)
 
 
-def _set_provider_cooldown(provider: str, kind: str, seconds: int, reason: str) -> None:
-    key = _cooldown_key(provider, kind)
-    _PROVIDER_COOLDOWN_UNTIL[key] = _now() + float(seconds)
-    _PROVIDER_COOLDOWN_REASON[key] = reason
-    logger.warning("Provider cooldown set: %s for %ss (%s)", key, seconds, reason)
+def _provider_in_cooldown(provider: str, kind: str) -> bool:
+    return not get_provider_health().is_available(provider, kind)
 
 
-def _seconds_until_next_utc_day() -> int:
-    now_dt = datetime.now(timezone.utc)
-    next_day = datetime(
-        year=now_dt.year,
-        month=now_dt.month,
-        day=now_dt.day,
-        tzinfo=timezone.utc,
-    ) + timedelta(days=1)
-    delta = next_day - now_dt
-    return max(60, int(delta.total_seconds()))
-
-
-def _provider_call_allowed(provider: str, kind: str, per_minute_limit: int) -> bool:
-    key = _cooldown_key(provider, kind)
-    now_ts = _now()
-    bucket = _PROVIDER_CALLS_MINUTE.get(key) or []
-    bucket = [ts for ts in bucket if ts >= (now_ts - 60.0)]
-    if len(bucket) >= max(1, int(per_minute_limit)):
-        return False
-    _PROVIDER_CALLS_MINUTE[key] = bucket
-
-    day_key = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-    day_state = _PROVIDER_CALLS_DAY.get(key)
-    day_count = 0
-    if day_state and day_state[0] == day_key:
-        day_count = int(day_state[1])
-    if day_count >= _PROVIDER_CALLS_DAY_LIMIT:
-        return False
-    return True
+def _acquire_provider_call(provider: str, kind: str, per_minute_limit: int) -> bool:
+    # Takes a token from the shared provider:kind bucket; False means the local budget is spent.
+    acquired = get_rate_limiter().try_acquire(
+        _cooldown_key(provider, kind),
+        per_minute=max(1, int(per_minute_limit)),
+        per_day=_PROVIDER_CALLS_DAY_LIMIT,
+    )
+    if not acquired:
+        get_provider_router().record_throttle(provider, kind)
+    return acquired
+
+
+def _acquire_provider_calls(provider: str, kind: str, per_minute_limit: int, count: int) -> int:
+    # Multi-symbol requests are billed per symbol (TwelveData charges a credit for each one), so a
+    # chunk takes one token per symbol in a single acquire; returns how many were granted, which is
+    # fewer than count when the bucket only covers part of the chunk.
+    granted = get_rate_limiter().try_acquire_up_to(
+        _cooldown_key(provider, kind),
+        per_minute=max(1, int(per_minute_limit)),
+        per_day=_PROVIDER_CALLS_DAY_LIMIT,
+        tokens=count,
+    )
+    if granted < count:
+        get_provider_router().record_throttle(provider, kind)
+    return granted
 
 
 def _provider_minute_limit(default_value: int) -> int:
@@ -172,42 +383,204 @@ def _provider_minute_limit(default_value: int) -> int:
         return max(1, int(default_value))
 
 
-def _record_provider_call(provider: str, kind: str) -> None:
-    key = _cooldown_key(provider, kind)
-    now_ts = _now()
-    bucket = _PROVIDER_CALLS_MINUTE.get(key) or []
-    bucket.append(now_ts)
-    _PROVIDER_CALLS_MINUTE[key] = bucket
+def _provider_cooldown_reason(provider: str, kind: str) -> str:
+    return get_provider_health().reason(provider, kind)
 
-    day_key = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-    day_state = _PROVIDER_CALLS_DAY.get(key)
-    day_count = 0
-    if day_state and day_state[0] == day_key:
-        day_count = int(day_state[1])
-    _PROVIDER_CALLS_DAY[key] = (day_key, day_count + 1)
 
+_PROVIDER_LABELS = {"twelvedata": "TwelveData", "finnhub": "Finnhub", "yahoo": "Yahoo"}
+_PROVIDER_MINUTE_DEFAULTS = {"twelvedata": 20, "finnhub": 20, "yahoo": 40}
 
-def _provider_cooldown_reason(provider: str, kind: str) -> str:
-    return _PROVIDER_COOLDOWN_REASON.get(_cooldown_key(provider, kind), "cooldown")
 
+def _provider_skip_reason(provider: str, kind: str) -> Optional[str]:
+    if provider == "twelvedata" and not _has_twelvedata_key():
+        return "TWELVEDATA_API_KEY is not set"
+    if provider == "finnhub" and not _has_finnhub_key():
+        return "FINNHUB_API_KEY is not set"
+    if _provider_in_cooldown(provider, kind):
+        return f"skipped: cooldown ({_provider_cooldown_reason(provider, kind)})"
+    return None
 
-def _is_rate_limit_error(exc: Exception) -> bool:
-    msg = str(exc or "").lower()
-    return (
-        "[rate_limit]" in msg
-        or "run out of api credits" in msg
-        or "too many requests" in msg
-        or "http 429" in msg
-    )
 
+class _ProviderSkipped(ProviderError):
+    pass
 
-def _is_auth_error(exc: Exception) -> bool:
-    msg = str(exc or "").lower()
-    return (
-        "[auth]" in msg
-        or "http 401" in msg
-        or "http 403" in msg
-    )
+
+def _check_provider_callable(provider: str, kind: str) -> None:
+    # Raises before any network call when a provider is skipped: no key, cooldown or local limit.
+    label = _PROVIDER_LABELS[provider]
+    skip = _provider_skip_reason(provider, kind)
+    if skip:
+        raise _ProviderSkipped(skip)
+    minute_limit = _provider_minute_limit(_PROVIDER_MINUTE_DEFAULTS[provider])
+    if not _acquire_provider_call(provider, kind, per_minute_limit=minute_limit):
+        raise _ProviderSkipped(f"[RATE_LIMIT] {label} {kind} local rate limit reached")
+
+
+def _routed_call(provider: str, kind: str, fn: Callable[[], Any]) -> Any:
+    # Feeds the router's latency/error EWMAs; validation failures count as errors.
+    started = time.perf_counter()
+    ok = False
+    throttled = False
+    try:
+        result = fn()
+        ok = True
+        return result
+    except Exception as exc:
+        throttled = is_rate_limit_error(exc)
+        raise
+    finally:
+        get_provider_router().record(provider, kind, (time.perf_counter() - started) * 1000.0, ok, throttled)
+
+
+def _note_provider_error(provider: str, kind: str, exc: Exception) -> None:
+    # Skips and spent deadlines never reached the provider, so they say nothing about its health.
+    if isinstance(exc, (_ProviderSkipped, DeadlineExceeded)):
+        return
+    get_provider_health().record_error(provider, kind, exc)
+
+
+def _live_quote(provider: str, symbol_u: str) -> QuoteResult:
+    _check_provider_callable(provider, "quote")
+    label = _PROVIDER_LABELS[provider]
+
+    def _fetch() -> QuoteResult:
+        if provider == "twelvedata":
+            res = TwelveDataClient().fetch_quote(symbol_u)
+        elif provider == "finnhub":
+            res = FinnhubClient().fetch_quote(symbol_u)
+        else:
+            res = _fetch_yahoo_quote(symbol_u)
+        quote = _quote_payload(res)
+        _validate_quote_or_raise(quote, symbol_u, label)
+        return QuoteResult(provider=provider, quote=quote)
+
+    payload = _routed_call(provider, "quote", _fetch)
+    _remember_quote(symbol_u, payload)
+    return payload
+
+
+def _quote_failed(provider: str, symbol_u: str, exc: Exception, errors: List[str]) -> None:
+    _note_provider_error(provider, "quote", exc)
+    msg = f"{_PROVIDER_LABELS[provider]} quote failed for {symbol_u}: {exc}"
+    errors.append(msg)
+    logger.warning(msg)
+
+
+def _fetch_quote_routed(symbol_u: str, default_order: Sequence[str]) -> Tuple[Optional[QuoteResult], List[str]]:
+    order = get_provider_router().order("quote", default_order)
+    if os.getenv("QUOTE_HEDGING_ENABLED", "false").strip().lower() in {"1", "true", "yes", "on"}:
+        return _fetch_quote_hedged(symbol_u, order)
+    errors: List[str] = []
+    for provider in order:
+        if expired():
+            errors.append(f"quote for {symbol_u}: deadline exceeded")
+            break
+        try:
+            return _live_quote(provider, symbol_u), errors
+        except Exception as exc:
+            _quote_failed(provider, symbol_u, exc, errors)
+    return None, errors
+
+
+_HEDGE_EXECUTOR: Optional[ThreadPoolExecutor] = None
+_HEDGE_EXECUTOR_LOCK = threading.Lock()
+
+
+def _hedge_executor() -> ThreadPoolExecutor:
+    global _HEDGE_EXECUTOR
+    with _HEDGE_EXECUTOR_LOCK:
+        if _HEDGE_EXECUTOR is None:
+            _HEDGE_EXECUTOR = ThreadPoolExecutor(
+                max_workers=_batch_size_setting("QUOTE_HEDGE_MAX_WORKERS", 16),
+                thread_name_prefix="quote-hedge",
+            )
+        return _HEDGE_EXECUTOR
+
+
+def _hedge_delay_seconds(provider: str) -> float:
+    # The provider's observed p90; before enough samples exist, a conservative default.
+    p90 = get_provider_router().latency_quantile(provider, "quote", 0.9)
+    if p90 is None:
+        p90 = float(_batch_size_setting("QUOTE_HEDGE_DEFAULT_DELAY_MS", 1500))
+    return max(float(_batch_size_setting("QUOTE_HEDGE_MIN_DELAY_MS", 50)), p90) / 1000.0
+
+
+def _note_abandoned_quote(provider: str, future: Future) -> None:
+    # The losing call still finishes in the background; quota and auth errors must not be lost.
+    exc = future.exception()
+    if exc is not None:
+        _note_provider_error(provider, "quote", exc)
+
+
+def _fetch_quote_hedged(symbol_u: str, order: List[str]) -> Tuple[Optional[QuoteResult], List[str]]:
+    # When the call in flight has not answered within its provider's p90, the next provider is
+    # started in parallel and the first valid quote wins. Hedges also need a token from the
+    # "hedge:quote" bucket (QUOTE_HEDGE_PER_MINUTE) on top of the provider's own limit, so a slow
+    # provider cannot double the spend.
+    router = get_provider_router()
+    errors: List[str] = []
+    remaining_providers = list(order)
+    in_flight: Dict[Future, Tuple[str, float]] = {}
+    hedges: set = set()
+    hedge_budget = True
+
+    def _launch(hedge: bool) -> bool:
+        nonlocal hedge_budget
+        while remaining_providers:
+            provider = remaining_providers[0]
+            skip = _provider_skip_reason(provider, "quote")
+            if skip:
+                remaining_providers.pop(0)
+                errors.append(f"{_PROVIDER_LABELS[provider]} quote failed for {symbol_u}: {skip}")
+                continue
+            if hedge and not get_rate_limiter().try_acquire(
+                "hedge:quote",
+                per_minute=_batch_size_setting("QUOTE_HEDGE_PER_MINUTE", 10),
+                per_day=_PROVIDER_CALLS_DAY_LIMIT,
+            ):
+                router.record_hedge("quote", "budget_denied")
+                hedge_budget = False
+                return False
+            remaining_providers.pop(0)
+            future = _hedge_executor().submit(in_context(_live_quote), provider, symbol_u)
+            in_flight[future] = (provider, time.monotonic())
+            if hedge:
+                hedges.add(future)
+                router.record_hedge("quote", "fired")
+            return True
+        return False
+
+    _launch(hedge=False)
+    while in_flight:
+        timeout = remaining()
+        if remaining_providers and hedge_budget:
+            newest, started = list(in_flight.values())[-1]
+            hedge_at = max(0.0, started + _hedge_delay_seconds(newest) - time.monotonic())
+            timeout = hedge_at if timeout is None else min(timeout, hedge_at)
+        done, _ = wait(list(in_flight), timeout=timeout, return_when=FIRST_COMPLETED)
+        if not done:
+            if expired():
+                errors.append(f"quote for {symbol_u}: deadline exceeded")
+                break
+            _launch(hedge=True)
+            continue
+        for future in done:
+            provider, _ = in_flight.pop(future)
+            try:
+                payload = future.result()
+            except Exception as exc:
+                _quote_failed(provider, symbol_u, exc, errors)
+                continue
+            if future in hedges:
+                router.record_hedge("quote", "won")
+            for other, (other_provider, _) in in_flight.items():
+                other.add_done_callback(partial(_note_abandoned_quote, other_provider))
+            return payload, errors
+        if not in_flight and not expired():
+            _launch(hedge=False)
+    for other, (other_provider, _) in in_flight.items():
+        other.add_done_callback(partial(_note_abandoned_quote, other_provider))
+    return None, errors
 
 
 def _has_twelvedata_key() -> bool:
@@ -259,15 +632,10 @@ def _quote_payload(res: Any) -> Any:
     return res.quote if hasattr(res, "quote") else res
 
 
-def _bars_payload(res: Any) -> List[Any]:
+def _bars_payload(res: Any) -> BarSeries:
     if res is None:
-        return []
-    bars = res.bars if hasattr(res, "bars") else res
-    if bars is None:
-        return []
-    if isinstance(bars, list):
-        return bars
-    return list(bars)
+        return BarSeries()
+    return BarSeries.coerce(res.bars if hasattr(res, "bars") else res)
 
 
 def _quote_last(quote: Any) -> Any:
@@ -278,12 +646,6 @@ def _quote_last(quote: Any) -> Any:
     return getattr(quote, "last", None)
 
 
-def _bar_required_value(bar: Any, field: str) -> Any:
-    if isinstance(bar, dict):
-        return bar.get(field)
-    return getattr(bar, field, None)
-
-
 def _validate_quote_or_raise(quote: Any, symbol: str, provider: str) -> None:
     if quote is None:
         raise ProviderError(f"{provider} quote empty for {symbol}")
@@ -292,14 +654,10 @@ def _validate_quote_or_raise(quote: Any, symbol: str, provider: str) -> None:
         raise ProviderError(f"{provider} quote missing last for {symbol}")
 
 
-def _validate_bars_or_raise(bars: List[Any], symbol: str, provider: str) -> None:
-    if not bars:
+def _validate_bars_or_raise(bars: BarSeries, symbol: str, provider: str) -> None:
+    # Prices and timestamps were validated when the provider built the series.
+    if not len(bars):
         raise ProviderError(f"{provider} bars empty for {symbol}")
-    validate_bars(bars)
-    for bar in bars:
-        for field in ("open", "high", "low", "close"):
-            if _bar_required_value(bar, field) in (None, ""):
-                raise ProviderError(f"{provider} bars missing {field} for {symbol}")
 
 
 def _yahoo_interval(interval: str) -> str:
@@ -354,7 +712,7 @@ def _fetch_yahoo_quote(symbol: str, timeout: int = 20) -> QuoteResult:
     url = f"https://query1.finance.yahoo.com/v8/finance/chart/{symbol_u}"
     params = {"interval": "1d", "range": "5d"}
     try:
-        response = requests.get(url, params=params, headers=_YAHOO_HEADERS, timeout=timeout)
+        response = http_get(url, params=params, headers=_YAHOO_HEADERS, timeout=timeout)
         response.raise_for_status()
         payload = response.json()
     except Exception as exc:
@@ -363,7 +721,10 @@ def _fetch_yahoo_quote(symbol: str, timeout: int = 20) -> QuoteResult:
     result = ((payload or {}).get("chart") or {}).get("result") or []
     if not result:
         raise ProviderError(f"Yahoo quote empty for {symbol_u}")
-    data = result[0] or {}
+    return QuoteResult(provider="yahoo", quote=_yahoo_quote_from_chart(symbol_u, result[0] or {}))
+
+
+def _yahoo_quote_from_chart(symbol_u: str, data: Dict[str, Any]) -> QuoteOutModel:
     meta = data.get("meta") or {}
     indicators = data.get("indicators") or {}
     quote_rows = indicators.get("quote") or []
@@ -387,7 +748,7 @@ def _fetch_yahoo_quote(symbol: str, timeout: int = 20) -> QuoteResult:
         except Exception:
             ts_event = None
 
-    quote = QuoteOutModel(
+    return QuoteOutModel(
         instrument_id=f"YAHOO:{symbol_u}",
         ts_event=ts_event,
         ts_ingest=_utc_now(),
@@ -397,82 +758,123 @@ def _fetch_yahoo_quote(symbol: str, timeout: int = 20) -> QuoteResult:
         source_provider="yahoo",
         quality_flags=[],
     )
-    return QuoteResult(provider="yahoo", quote=quote)
+
+
+def _fetch_yahoo_quotes(symbols: List[str], timeout: int = 20) -> Dict[str, QuoteResult]:
+    # The spark endpoint returns a small chart per symbol for up to 20 symbols in one call.
+    url = "https://query1.finance.yahoo.com/v7/finance/spark"
+    params = {"symbols": ",".join(symbols), "range": "1d", "interval": "5m"}
+    try:
+        response = http_get(url, params=params, headers=_YAHOO_HEADERS, timeout=timeout)
+        response.raise_for_status()
+        payload = response.json()
+    except Exception as exc:
+        raise ProviderError(f"Yahoo batch quote request failed: {exc}") from exc
+
+    charts: Dict[str, Dict[str, Any]] = {}
+    spark = (payload or {}).get("spark") if isinstance(payload, dict) else None
+    if isinstance(spark, dict):
+        for item in spark.get("result") or []:
+            responses = (item or {}).get("response") or []
+            if item.get("symbol") and responses:
+                charts[str(item["symbol"]).upper()] = responses[0] or {}
+    elif isinstance(payload, dict):
+        # Newer flat shape: {"AAPL": {"timestamp": [...], "close": [...]}}
+        for symbol, item in payload.items():
+            if isinstance(item, dict):
+                charts[str(symbol).upper()] = {
+                    "meta": {"regularMarketPrice": item.get("regularMarketPrice")},
+                    "timestamp": item.get("timestamp") or [],
+                    "indicators": {"quote": [{"close": item.get("close") or []}]},
+                }
+
+    out: Dict[str, QuoteResult] = {}
+    for symbol_u in symbols:
+        data = charts.get(symbol_u)
+        if not data:
+            continue
+        try:
+            out[symbol_u] = QuoteResult(provider="yahoo", quote=_yahoo_quote_from_chart(symbol_u, data))
+        except (ProviderError, TypeError, ValueError):
+            continue
+    return out
 
 
 def _db_latest_quote(symbol: str, max_age_seconds: int) -> Optional[QuoteResult]:
     symbol_u = (symbol or "").strip().upper()
     if not symbol_u:
         return None
-    now_dt = datetime.now(timezone.utc)
-    with get_connection() as conn:
-        rows = conn.execute(
-            """
-            SELECT payload, source, created_at
-            FROM events
-            WHERE event_type = ?
-            ORDER BY id DESC
-            LIMIT 2000
-            """,
-            ("worker.quote",),
-        ).fetchall()
+    row = _LATEST_QUOTES_REPO.get(symbol_u, max_age_seconds=max_age_seconds)
+    if row is None:
+        return None
+    quote = QuoteOutModel(**row["quote"])
+    return QuoteResult(provider=str(row.get("provider") or "cache"), quote=quote)
 
-    for row in rows:
-        payload = row.get("payload")
-        if isinstance(payload, str):
-            try:
-                payload = json.loads(payload)
-            except Exception:
-                payload = {}
-        if not isinstance(payload, dict):
-            continue
-        sym = str(payload.get("symbol", "")).strip().upper()
-        if sym != symbol_u:
-            continue
-        quote_payload = payload.get("quote")
-        if not isinstance(quote_payload, dict):
-            continue
-        created_raw = row.get("created_at") or quote_payload.get("ts_ingest")
-        created_dt = None
-        if isinstance(created_raw, datetime):
-            created_dt = created_raw.astimezone(timezone.utc) if created_raw.tzinfo else created_raw.replace(tzinfo=timezone.utc)
-        elif isinstance(created_raw, str) and created_raw.strip():
-            try:
-                created_dt = datetime.fromisoformat(created_raw.replace("Z", "+00:00"))
-                if created_dt.tzinfo is None:
-                    created_dt = created_dt.replace(tzinfo=timezone.utc)
-                else:
-                    created_dt = created_dt.astimezone(timezone.utc)
-            except Exception:
-                created_dt = None
-        if created_dt and (now_dt - created_dt).total_seconds() > max(1, int(max_age_seconds)):
-            continue
-        quote = QuoteOutModel(**quote_payload)
-        return QuoteResult(provider=str(payload.get("provider") or row.get("source") or "cache"), quote=quote)
-    return None
+
+_DB_BAR_COLUMNS = "instrument_id, timeframe, ts_event, ts_ingest, open, high, low, close, volume, source_provider"
 
 
 def _db_recent_bars(symbol: str, interval: str, outputsize: int, max_age_seconds: int) -> Optional[BarsResult]:
     symbol_u = (symbol or "").strip().upper()
     if not symbol_u:
         return None
-    now_dt = datetime.now(timezone.utc)
     with get_connection() as conn:
         rows = conn.execute(
-            """
-            SELECT instrument_id, timeframe, ts_event, ts_ingest, open, high, low, close, volume, source_provider
+            f"""
+            SELECT {_DB_BAR_COLUMNS}
             FROM canonical_price_bars
-            WHERE timeframe = ? AND instrument_id LIKE ?
+            WHERE instrument_id = ? AND timeframe = ?
             ORDER BY ts_event DESC
             LIMIT ?
             """,
-            (interval, f"%:{symbol_u}", max(10, int(outputsize))),
+            (canonical_instrument_id(symbol_u), interval, max(10, int(outputsize))),
+        ).fetchall()
+    return _db_rows_to_bars(rows, max_age_seconds)
+
+
+def _db_recent_bars_many(
+    symbols: List[str],
+    interval: str,
+    outputsize: int,
+    max_age_seconds: int,
+) -> Dict[str, BarsResult]:
+    # One windowed query for the whole universe instead of one LIMIT query per symbol.
+    by_instrument = {canonical_instrument_id(s): s for s in symbols if s}
+    if not by_instrument:
+        return {}
+    placeholders = ", ".join(["?"] * len(by_instrument))
+    with get_connection() as conn:
+        rows = conn.execute(
+            f"""
+            SELECT {_DB_BAR_COLUMNS}
+            FROM (
+                SELECT {_DB_BAR_COLUMNS},
+                    ROW_NUMBER() OVER (PARTITION BY instrument_id ORDER BY ts_event DESC) AS rn
+                FROM canonical_price_bars
+                WHERE timeframe = ? AND instrument_id IN ({placeholders})
+            ) ranked
+            WHERE rn <= ?
+            ORDER BY instrument_id, ts_event DESC
+            """,
+            (interval, *by_instrument.keys(), max(10, int(outputsize))),
         ).fetchall()
+    grouped: Dict[str, List[Dict[str, Any]]] = {}
+    for row in rows:
+        grouped.setdefault(str(row.get("instrument_id")), []).append(row)
+    out: Dict[str, BarsResult] = {}
+    for instrument_id, instrument_rows in grouped.items():
+        result = _db_rows_to_bars(instrument_rows, max_age_seconds)
+        if result is not None:
+            out[by_instrument[instrument_id]] = result
+    return out
 
+
+def _db_rows_to_bars(rows: List[Dict[str, Any]], max_age_seconds: int) -> Optional[BarsResult]:
+    # rows arrive newest first; the result is oldest first and None when the newest ingest is stale.
     if not rows:
         return None
+    now_dt = datetime.now(timezone.utc)
     latest_ingest = None
-    bars: List[BarModel] = []
     for row in rows:
         ts_ingest = row.get("ts_ingest")
         parsed_ingest = None
@@ -487,23 +889,17 @@ def _db_recent_bars(symbol: str, interval: str, outputsize: int, max_age_seconds
                 parsed_ingest = None
         if parsed_ingest and (latest_ingest is None or parsed_ingest > latest_ingest):
             latest_ingest = parsed_ingest
-        bars.append(
-            BarModel(
-                ts_event=row.get("ts_event"),
-                open=float(row.get("open")),
-                high=float(row.get("high")),
-                low=float(row.get("low")),
-                close=float(row.get("close")),
-                volume=float(row.get("volume")) if row.get("volume") is not None else None,
-                instrument_id=row.get("instrument_id"),
-                ts_ingest=row.get("ts_ingest"),
-                source_provider=row.get("source_provider"),
-                quality_flags=[],
-            )
-        )
     if latest_ingest and (now_dt - latest_ingest).total_seconds() > max(1, int(max_age_seconds)):
         return None
-    bars.reverse()
+    bars = BarSeries.from_rows(
+        (
+            (row.get("ts_event"), row.get("open"), row.get("high"), row.get("low"), row.get("close"), row.get("volume"))
+            for row in rows
+        ),
+        instrument_id=rows[0].get("instrument_id"),
+        source_provider=rows[0].get("source_provider"),
+        ts_ingest=latest_ingest,
+    )
     return BarsResult(provider="cache", bars=bars)
 
 
@@ -537,120 +933,54 @@ def get_quote_cached_first(
     symbol_u = (symbol or "").strip().upper()
     ws_hit = _ws_quote(symbol_u, max_age_seconds=15)
     if ws_hit:
-        _set_cached_quote(symbol_u, ws_hit)
+        _remember_quote(symbol_u, ws_hit)
         return ws_hit
-    errors: List[str] = []
-    try:
-        if not _provider_call_allowed("yahoo", "quote", per_minute_limit=_provider_minute_limit(40)):
-            raise ProviderError("[RATE_LIMIT] Yahoo quote local rate limit reached")
-        _record_provider_call("yahoo", "quote")
-        payload = _fetch_yahoo_quote(symbol_u)
-        _set_cached_quote(symbol_u, payload)
+    # Cheapest providers first by default; the router may reorder them by observed cost.
+    payload, errors = _fetch_quote_routed(symbol_u, ("yahoo", "finnhub", "twelvedata"))
+    if payload is not None:
         return payload
-    except Exception as exc:
-        errors.append(f"yahoo:{exc}")
-
-    try:
-        if _has_finnhub_key():
-            if not _provider_call_allowed("finnhub", "quote", per_minute_limit=_provider_minute_limit(20)):
-                raise ProviderError("[RATE_LIMIT] Finnhub quote local rate limit reached")
-            _record_provider_call("finnhub", "quote")
-            fh = FinnhubClient()
-            res = fh.fetch_quote(symbol_u)
-            quote = _quote_payload(res)
-            _validate_quote_or_raise(quote, symbol_u, "Finnhub")
-            payload = QuoteResult(provider="finnhub", quote=quote)
-            _set_cached_quote(symbol_u, payload)
-            return payload
-    except Exception as exc:
-        errors.append(f"finnhub:{exc}")
-
-    try:
-        if _has_twelvedata_key() and not _provider_in_cooldown("twelvedata", "quote"):
-            if not _provider_call_allowed("twelvedata", "quote", per_minute_limit=_provider_minute_limit(20)):
-                raise ProviderError("[RATE_LIMIT] Twelvedata quote local rate limit reached")
-            _record_provider_call("twelvedata", "quote")
-            td = TwelveDataClient()
-            res = td.fetch_quote(symbol_u)
-            quote = _quote_payload(res)
-            _validate_quote_or_raise(quote, symbol_u, "TwelveData")
-            payload = QuoteResult(provider="twelvedata", quote=quote)
-            _set_cached_quote(symbol_u, payload)
-            return payload
-    except Exception as exc:
-        if _is_rate_limit_error(exc):
-            _set_provider_cooldown("twelvedata", "quote", _seconds_until_next_utc_day(), str(exc))
-        errors.append(f"twelvedata:{exc}")
-
     raise ProviderError("All providers failed for symbol %s: %s" % (symbol_u, "; ".join(errors)))
 
 
-def get_quote_with_fallback(symbol: str, freshness_seconds: int = 60) -> QuoteResult:
+def get_quote_with_fallback(symbol: str, freshness_seconds: int = 60, swr: bool = True) -> QuoteResult:
     symbol_u = (symbol or "").strip().upper()
     if not symbol_u:
         raise ProviderError("Missing symbol")
 
+    cached = _get_cached_quote(symbol_u)
+    if cached:
+        return cached
+    if swr and _swr_grace_seconds("quote") > 0:
+        stale = _get_cached_quote_allow_stale(symbol_u, _swr_grace_seconds("quote"))
+        if stale:
+            _revalidate_many(
+                [("quote", symbol_u)],
+                lambda _: _SINGLE_FLIGHT.do(("quote", symbol_u), lambda: _fetch_quote_live(symbol_u)),
+            )
+            return stale
+    try:
+        return _SINGLE_FLIGHT.do(("quote", symbol_u), lambda: _fetch_quote_live(symbol_u))
+    except DeadlineExceeded as exc:
+        stale = _get_cached_quote_allow_stale(symbol_u)
+        if stale:
+            return stale
+        raise ProviderError(f"Quote for {symbol_u} unavailable: {exc}") from exc
+
+
+def _fetch_quote_live(symbol_u: str) -> QuoteResult:
+    # A caller that waited behind another fetch may find the cache already filled.
     cached = _get_cached_quote(symbol_u)
     if cached:
         return cached
 
     ws_hit = _ws_quote(symbol_u, max_age_seconds=15)
     if ws_hit:
-        _set_cached_quote(symbol_u, ws_hit)
+        _remember_quote(symbol_u, ws_hit)
         return ws_hit
 
-    errors: List[str] = []
-
-    try:
-        if _has_twelvedata_key():
-            if not _provider_call_allowed("twelvedata", "quote", per_minute_limit=_provider_minute_limit(20)):
-                raise ProviderError("[RATE_LIMIT] Twelvedata quote local rate limit reached")
-            _record_provider_call("twelvedata", "quote")
-            td = TwelveDataClient()
-            res = td.fetch_quote(symbol_u)
-            quote = _quote_payload(res)
-            _validate_quote_or_raise(quote, symbol_u, "TwelveData")
-            payload = QuoteResult(provider="twelvedata", quote=quote)
-            _set_cached_quote(symbol_u, payload)
-            return payload
-        raise ProviderError("TWELVEDATA_API_KEY is not set")
-    except Exception as exc:
-        msg = f"TwelveData quote failed for {symbol_u}: {exc}"
-        errors.append(msg)
-        logger.warning(msg)
-
-    try:
-        if _has_finnhub_key():
-            if not _provider_call_allowed("finnhub", "quote", per_minute_limit=_provider_minute_limit(20)):
-                raise ProviderError("[RATE_LIMIT] Finnhub quote local rate limit reached")
-            _record_provider_call("finnhub", "quote")
-            fh = FinnhubClient()
-            res = fh.fetch_quote(symbol_u)
-            quote = _quote_payload(res)
-            _validate_quote_or_raise(quote, symbol_u, "Finnhub")
-            payload = QuoteResult(provider="finnhub", quote=quote)
-            _set_cached_quote(symbol_u, payload)
-            return payload
-        raise ProviderError("FINNHUB_API_KEY is not set")
-    except Exception as exc:
-        msg = f"Finnhub quote failed for {symbol_u}: {exc}"
-        errors.append(msg)
-        logger.warning(msg)
-
-    try:
-        if not _provider_call_allowed("yahoo", "quote", per_minute_limit=_provider_minute_limit(40)):
-            raise ProviderError("[RATE_LIMIT] Yahoo quote local rate limit reached")
-        _record_provider_call("yahoo", "quote")
-        res = _fetch_yahoo_quote(symbol_u)
-        quote = _quote_payload(res)
-        _validate_quote_or_raise(quote, symbol_u, "Yahoo")
-        payload = QuoteResult(provider="yahoo", quote=quote)
-        _set_cached_quote(symbol_u, payload)
+    payload, _ = _fetch_quote_routed(symbol_u, ("twelvedata", "finnhub", "yahoo"))
+    if payload is not None:
         return payload
-    except Exception as exc:
-        msg = f"Yahoo quote failed for {symbol_u}: {exc}"
-        errors.append(msg)
-        logger.warning(msg)
 
     stale = _get_cached_quote_allow_stale(symbol_u)
     if stale:
@@ -659,7 +989,133 @@ def get_quote_with_fallback(symbol: str, freshness_seconds: int = 60) -> QuoteRe
     raise ProviderError(f"All providers failed for symbol {symbol_u}")
 
 
-def get_bars_with_fallback(symbol: str, interval: str = "1day", outputsize: int = 500) -> BarsResult:
+def _batch_size_setting(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.getenv(name, str(default))))
+    except ValueError:
+        return default
+
+
+def _chunks(items: List[str], size: int) -> List[List[str]]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def get_quotes_with_fallback(symbols: List[str], freshness_seconds: int = 60, swr: bool = True) -> QuotesBatchResult:
+    # Batched counterpart of get_quote_with_fallback. Each stage only sees the symbols the previous
+    # stages could not serve: memory cache -> websocket -> TwelveData multi-symbol /quote -> Yahoo
+    # spark (both batched, so Yahoo runs ahead of Finnhub here) -> Finnhub per symbol -> stale cache.
+    wanted: List[str] = []
+    for raw in symbols or []:
+        symbol_u = (raw or "").strip().upper()
+        if symbol_u and symbol_u not in wanted:
+            wanted.append(symbol_u)
+    out = QuotesBatchResult(quotes={}, errors={}, provenance={})
+
+    def _accept(symbol_u: str, payload: QuoteResult, origin: str) -> None:
+        out.quotes[symbol_u] = payload
+        out.provenance[symbol_u] = origin
+        out.errors.pop(symbol_u, None)
+
+    pending: List[str] = []
+    revalidate: List[str] = []
+    swr_grace = _swr_grace_seconds("quote") if swr else 0.0
+    for symbol_u in wanted:
+        cached = _get_cached_quote(symbol_u)
+        if cached:
+            _accept(symbol_u, cached, "memory")
+            continue
+        ws_hit = _ws_quote(symbol_u, max_age_seconds=15)
+        if ws_hit:
+            _remember_quote(symbol_u, ws_hit)
+            _accept(symbol_u, ws_hit, "twelvedata_ws")
+            continue
+        stale = _get_cached_quote_allow_stale(symbol_u, swr_grace) if swr_grace > 0 else None
+        if stale:
+            _accept(symbol_u, stale, "stale")
+            revalidate.append(symbol_u)
+            continue
+        pending.append(symbol_u)
+    if revalidate:
+        _revalidate_many(
+            [("quote", symbol_u) for symbol_u in revalidate],
+            lambda keys: get_quotes_with_fallback([key[1] for key in keys], freshness_seconds, swr=False),
+        )
+
+    def _run_batches(
+        provider: str,
+        fetch: Callable[[List[str]], Dict[str, Any]],
+        batch_size: int,
+        minute_limit: int,
+        per_symbol: bool = False,
+    ) -> None:
+        nonlocal pending
+        for chunk in _chunks(list(pending), batch_size):
+            if expired():
+                break
+            cost = len(chunk) if per_symbol else 1
+            granted = _acquire_provider_calls(provider, "quote", _provider_minute_limit(minute_limit), cost)
+            drained = granted < cost
+            if drained:
+                for symbol_u in chunk[granted:] if per_symbol else chunk:
+                    out.errors[symbol_u] = f"{provider}: local rate limit reached"
+                if not per_symbol or not granted:
+                    break
+                # Send what the budget covers; the rest of the pending list waits for the next stage.
+                chunk = chunk[:granted]
+            out.provider_requests += 1
+            try:
+                fetched = fetch(chunk)
+            except Exception as exc:
+                logger.warning("%s batch quote failed for %s symbols: %s", provider, len(chunk), exc)
+                for symbol_u in chunk:
+                    out.errors[symbol_u] = f"{provider}: {exc}"
+                _note_provider_error(provider, "quote", exc)
+                if is_rate_limit_error(exc):
+                    break
+                continue
+            for symbol_u in chunk:
+                quote = _quote_payload(fetched.get(symbol_u))
+                if quote is None:
+                    out.errors.setdefault(symbol_u, f"{provider}: no quote returned")
+                    continue
+                try:
+                    _validate_quote_or_raise(quote, symbol_u, provider)
+                except Exception as exc:
+                    out.errors[symbol_u] = f"{provider}: {exc}"
+                    continue
+                payload = QuoteResult(provider=provider, quote=quote)
+                _remember_quote(symbol_u, payload)
+                _accept(symbol_u, payload, provider)
+            if drained:
+                break
+        pending = [symbol_u for symbol_u in pending if symbol_u not in out.quotes]
+
+    if pending and _has_twelvedata_key() and not _provider_in_cooldown("twelvedata", "quote"):
+        td = TwelveDataClient()
+        _run_batches(
+            "twelvedata", td.fetch_quotes, _batch_size_setting("TWELVEDATA_QUOTE_BATCH_SIZE", 50), 20, per_symbol=True
+        )
+    if pending and not _provider_in_cooldown("yahoo", "quote"):
+        _run_batches("yahoo", _fetch_yahoo_quotes, _batch_size_setting("YAHOO_QUOTE_BATCH_SIZE", 20), 40)
+    if pending and _has_finnhub_key() and not _provider_in_cooldown("finnhub", "quote"):
+        fh = FinnhubClient()
+        _run_batches("finnhub", lambda chunk: {chunk[0]: fh.fetch_quote(chunk[0])}, 1, 20)
+
+    for symbol_u in pending:
+        stale = _get_cached_quote_allow_stale(symbol_u)
+        if stale:
+            _accept(symbol_u, stale, "stale")
+        else:
+            out.errors.setdefault(symbol_u, f"All providers failed for symbol {symbol_u}")
+    return out
+
+
+def get_bars_with_fallback(
+    symbol: str,
+    interval: str = "1day",
+    outputsize: int = 500,
+    swr: bool = True,
+) -> BarsResult:
     symbol_u = (symbol or "").strip().upper()
     interval_v = (interval or "1day").strip()
     size_v = int(outputsize)
@@ -673,84 +1129,111 @@ def get_bars_with_fallback(symbol: str, interval: str = "1day", outputsize: int
     cached = _get_cached_bars(key)
     if cached:
         return cached
-
-    errors: List[str] = []
-
+    if swr and _swr_grace_seconds("bars") > 0:
+        stale = _get_cached_bars_allow_stale(key, _swr_grace_seconds("bars"))
+        if stale:
+            # Refresh the whole cached series, not just the slice asked for.
+            entry = _BARS_CACHE.get((symbol_u, interval_v))
+            refresh_key = (symbol_u, interval_v, max(size_v, entry[2] if entry else 0))
+            _revalidate_many(
+                [("bars", symbol_u, interval_v)],
+                lambda _: _SINGLE_FLIGHT.do(("bars", *refresh_key), lambda: _fetch_bars_live(refresh_key)),
+            )
+            return stale
     try:
-        if not _provider_call_allowed("yahoo", "bars", per_minute_limit=_provider_minute_limit(40)):
-            raise ProviderError("[RATE_LIMIT] Yahoo bars local rate limit reached")
-        _record_provider_call("yahoo", "bars")
-        res = fetch_yahoo_bars(symbol_u, interval=interval_v, outputsize=size_v)
-        bars = _bars_payload(res)
-        _validate_bars_or_raise(bars, symbol_u, "Yahoo")
-        payload = BarsResult(provider="yahoo", bars=bars)
-        _set_cached_bars(key, payload)
-        return payload
-    except Exception as exc:
-        msg = f"Yahoo bars failed for {symbol_u}: {exc}"
-        errors.append(msg)
-        logger.warning(msg)
-
-    if _provider_in_cooldown("twelvedata", "bars"):
-        reason = _provider_cooldown_reason("twelvedata", "bars")
-        msg = f"TwelveData bars skipped for {symbol_u}: cooldown ({reason})"
-        errors.append(msg)
-        logger.warning(msg)
-    else:
+        return _SINGLE_FLIGHT.do(("bars", *key), lambda: _fetch_bars_live(key))
+    except DeadlineExceeded as exc:
+        stale = _get_cached_bars_allow_stale(key)
+        if stale:
+            return stale
+        raise ProviderError(f"Bars for {symbol_u} unavailable: {exc}") from exc
+
+
+def _stored_bars_for_delta_many(symbols: List[str], interval_v: str, size: int) -> Dict[str, BarSeries]:
+    # History a delta fetch can build on: the memory series at any age (everything before its last
+    # bar is final), else canonical_price_bars.
+    out: Dict[str, BarSeries] = {}
+    need_db: List[str] = []
+    for symbol_u in symbols:
+        entry = _BARS_CACHE.get((symbol_u, interval_v))
+        if entry and len(entry[1].bars) >= size:
+            out[symbol_u] = entry[1].bars
+        else:
+            need_db.append(symbol_u)
+    if need_db:
         try:
-            if _has_twelvedata_key():
-                if not _provider_call_allowed("twelvedata", "bars", per_minute_limit=_provider_minute_limit(20)):
-                    raise ProviderError("[RATE_LIMIT] TwelveData bars local rate limit reached")
-                _record_provider_call("twelvedata", "bars")
-                td = TwelveDataClient()
-                res = td.fetch_bars(symbol_u, interval=interval_v, outputsize=size_v)
-                bars = _bars_payload(res)
-                _validate_bars_or_raise(bars, symbol_u, "TwelveData")
-                payload = BarsResult(provider="twelvedata", bars=bars)
-                _set_cached_bars(key, payload)
-                return payload
-            raise ProviderError("TWELVEDATA_API_KEY is not set")
+            out.update(load_stored_bars_many(need_db, interval_v, size))
         except Exception as exc:
-            if _is_rate_limit_error(exc):
-                if os.getenv("PROVIDER_TWELVEDATA_COOLDOWN_ENABLED", "true").strip().lower() in {"1", "true", "yes", "on"}:
-                    _set_provider_cooldown(
-                        "twelvedata",
-                        "bars",
-                        _seconds_until_next_utc_day(),
-                        str(exc),
-                    )
-            msg = f"TwelveData bars failed for {symbol_u}: {exc}"
-            errors.append(msg)
-            logger.warning(msg)
+            logger.warning("stored bars lookup failed for %s symbols: %s", len(need_db), exc)
+    return out
+
+
+def _complete_bars_fetch(
+    key: Tuple[str, str, int],
+    provider: str,
+    label: str,
+    res: Any,
+    stored: BarSeries,
+    start: Optional[datetime],
+    fetch_v: int,
+    persist: bool = True,
+) -> BarsResult:
+    # A delta may legitimately be empty (no new bar yet); a full fetch may not.
+    symbol_u, interval_v, _ = key
+    fresh = _bars_payload(res)
+    if start is None or fresh:
+        _validate_bars_or_raise(fresh, symbol_u, label)
+    get_provider_health().record_success(provider, "bars")
+    bars = merge_bars(stored, fresh, interval_v) if start is not None else fresh
+    if persist and fresh:
+        try:
+            _persist_fetched_bars(interval_v, {symbol_u: BarsResult(provider=provider, bars=fresh)})
+        except Exception as exc:
+            logger.warning("bars persist failed for %s: %s", symbol_u, exc)
+    return _set_cached_bars(key, BarsResult(provider=provider, bars=bars), fetch_v)
 
-    if _provider_in_cooldown("finnhub", "bars"):
-        reason = _provider_cooldown_reason("finnhub", "bars")
-        msg = f"Finnhub bars skipped for {symbol_u}: cooldown ({reason})"
-        errors.append(msg)
-        logger.warning(msg)
-    else:
+
+def _live_bars(
+    provider: str,
+    key: Tuple[str, str, int],
+    stored: BarSeries,
+    start: Optional[datetime],
+    fetch_v: int,
+) -> BarsResult:
+    _check_provider_callable(provider, "bars")
+    symbol_u, interval_v, _ = key
+
+    def _fetch() -> BarsResult:
+        if provider == "twelvedata":
+            res = TwelveDataClient().fetch_bars(symbol_u, interval=interval_v, outputsize=fetch_v, start=start)
+        elif provider == "finnhub":
+            res = FinnhubClient().fetch_bars(symbol_u, interval=interval_v, outputsize=fetch_v, start=start)
+        else:
+            res = fetch_yahoo_bars(symbol_u, interval=interval_v, outputsize=fetch_v, start=start)
+        return _complete_bars_fetch(key, provider, _PROVIDER_LABELS[provider], res, stored, start, fetch_v)
+
+    return _routed_call(provider, "bars", _fetch)
+
+
+def _fetch_bars_live(key: Tuple[str, str, int]) -> BarsResult:
+    cached = _get_cached_bars(key, record=False)
+    if cached:
+        return cached
+    symbol_u, interval_v, size_v = key
+    fetch_v = _bars_fetch_size(size_v)
+    stored = _stored_bars_for_delta_many([symbol_u], interval_v, fetch_v).get(symbol_u, BarSeries())
+    start = delta_start(stored, interval_v, fetch_v)
+
+    errors: List[str] = []
+    for provider in get_provider_router().order("bars", ("yahoo", "twelvedata", "finnhub")):
+        if expired():
+            errors.append(f"bars for {symbol_u}: deadline exceeded")
+            break
         try:
-            if _has_finnhub_key():
-                if not _provider_call_allowed("finnhub", "bars", per_minute_limit=_provider_minute_limit(20)):
-                    raise ProviderError("[RATE_LIMIT] Finnhub bars local rate limit reached")
-                _record_provider_call("finnhub", "bars")
-                fh = FinnhubClient()
-                res = fh.fetch_bars(symbol_u, interval=interval_v, outputsize=size_v)
-                bars = _bars_payload(res)
-                _validate_bars_or_raise(bars, symbol_u, "Finnhub")
-                payload = BarsResult(provider="finnhub", bars=bars)
-                _set_cached_bars(key, payload)
-                return payload
-            raise ProviderError("FINNHUB_API_KEY is not set")
+            return _live_bars(provider, key, stored, start, fetch_v)
         except Exception as exc:
-            if _is_auth_error(exc):
-                _set_provider_cooldown(
-                    "finnhub",
-                    "bars",
-                    _PROVIDER_COOLDOWN_SECONDS_AUTH,
-                    str(exc),
-                )
-            msg = f"Finnhub bars failed for {symbol_u}: {exc}"
+            _note_provider_error(provider, "bars", exc)
+            msg = f"{_PROVIDER_LABELS[provider]} bars failed for {symbol_u}: {exc}"
             errors.append(msg)
             logger.warning(msg)
 
@@ -759,3 +1242,283 @@ def get_bars_with_fallback(symbol: str, interval: str = "1day", outputsize: int
         return stale
 
     raise ProviderError(f"All providers failed for symbol {symbol_u}: {'; '.join(errors)}")
+
+
+@dataclass
+class BarsBatchResult:
+    bars: Dict[str, BarsResult]
+    errors: Dict[str, str]
+    # symbol -> "memory", "cache" (DB), a provider name, or "stale"
+    provenance: Dict[str, str]
+    provider_requests: int = 0
+
+
+def _bar_iso(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def _persist_fetched_bars(interval: str, fetched: Dict[str, BarsResult]) -> int:
+    # One bulk upsert for everything fetched live, so the DB-first readers see it on the next call.
+    # The columnar archive is left to the poller: short windows appended here would leave gaps.
+    rows: List[Tuple[Any, ...]] = []
+    instruments: List[Tuple[str, str]] = []
+    for symbol_u, result in fetched.items():
+        bars = _bars_payload(result)
+        if not len(bars):
+            continue
+        provider_id = str(bars.instrument_id or symbol_u)
+        source = str(bars.source_provider or result.provider)
+        instrument_id = canonical_instrument_id(provider_id)
+        ts_ingest = _bar_iso(bars.ts_ingest) or _utc_now().isoformat()
+        instruments.append((provider_id, source))
+        for ts, open_, high, low, close, volume in bars.records():
+            rows.append(
+                (
+                    instrument_id,
+                    interval,
+                    datetime.fromtimestamp(ts, tz=timezone.utc).isoformat(),
+                    ts_ingest,
+                    open_,
+                    high,
+                    low,
+                    close,
+                    volume or 0.0,
+                    source,
+                    "[]",
+                )
+            )
+    if not rows:
+        return 0
+    with get_connection() as conn:
+        register_instruments(conn, instruments)
+        return conn.bulk_upsert(
+            "canonical_price_bars",
+            PRICE_BAR_COLUMNS,
+            rows,
+            conflict_columns=PRICE_BAR_CONFLICT_COLUMNS,
+        )
+
+
+def get_bars_batch_with_fallback(
+    symbols: List[str],
+    interval: str = "1day",
+    outputsize: int = 500,
+    persist: bool = True,
+    swr: bool = True,
+) -> BarsBatchResult:
+    # Batched counterpart of get_bars_with_fallback, same provider order: Yahoo (no multi-symbol
+    # chart endpoint, so bounded parallel fetches over the pooled session) -> TwelveData multi-symbol
+    # time_series -> Finnhub (parallel) -> stale cache. Each stage only sees what is still missing.
+    interval_v = (interval or "1day").strip()
+    size_v = int(outputsize)
+    if size_v <= 0:
+        raise ProviderError("outputsize must be > 0")
+    fetch_v = _bars_fetch_size(size_v)
+    wanted: List[str] = []
+    for raw in symbols or []:
+        symbol_u = (raw or "").strip().upper()
+        if symbol_u and symbol_u not in wanted:
+            wanted.append(symbol_u)
+    out = BarsBatchResult(bars={}, errors={}, provenance={})
+    fetched: Dict[str, BarsResult] = {}
+
+    pending: List[str] = []
+    revalidate: List[str] = []
+    swr_grace = _swr_grace_seconds("bars") if swr else 0.0
+    for symbol_u in wanted:
+        cached = _get_cached_bars((symbol_u, interval_v, size_v))
+        stale = None
+        if cached is None and swr_grace > 0:
+            stale = _get_cached_bars_allow_stale((symbol_u, interval_v, size_v), swr_grace)
+        if cached:
+            out.bars[symbol_u] = cached
+            out.provenance[symbol_u] = "memory"
+        elif stale:
+            out.bars[symbol_u] = stale
+            out.provenance[symbol_u] = "stale"
+            revalidate.append(symbol_u)
+        else:
+            pending.append(symbol_u)
+    if revalidate:
+        _revalidate_many(
+            [("bars", symbol_u, interval_v) for symbol_u in revalidate],
+            lambda keys: get_bars_batch_with_fallback(
+                [key[1] for key in keys], interval_v, size_v, persist=persist, swr=False
+            ),
+        )
+
+    # Symbols with usable stored history are refreshed from their last stored bar only.
+    stored = _stored_bars_for_delta_many(pending, interval_v, fetch_v) if pending else {}
+    starts: Dict[str, datetime] = {}
+    for symbol_u, history in stored.items():
+        start = delta_start(history, interval_v, fetch_v)
+        if start is not None:
+            starts[symbol_u] = start
+
+    def _accept(symbol_u: str, provider: str, res: Any) -> None:
+        out.bars[symbol_u] = _complete_bars_fetch(
+            (symbol_u, interval_v, size_v),
+            provider,
+            provider,
+            res,
+            stored.get(symbol_u, BarSeries()),
+            starts.get(symbol_u),
+            fetch_v,
+            persist=False,
+        )
+        out.provenance[symbol_u] = provider
+        out.errors.pop(symbol_u, None)
+        fresh = _bars_payload(res)
+        if fresh:
+            fetched[symbol_u] = BarsResult(provider=provider, bars=fresh)
+
+    def _run_parallel(provider: str, fetch_one: Callable[[str], Any], minute_limit: int) -> None:
+        nonlocal pending
+        if expired():
+            return
+        allowed: List[str] = []
+        for symbol_u in pending:
+            if not _acquire_provider_call(provider, "bars", per_minute_limit=_provider_minute_limit(minute_limit)):
+                out.errors[symbol_u] = f"{provider}: local rate limit reached"
+                continue
+            allowed.append(symbol_u)
+        out.provider_requests += len(allowed)
+        workers = min(len(allowed), _batch_size_setting("BARS_BATCH_MAX_WORKERS", 4))
+        if workers:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                # Each call feeds the router's EWMAs, like the single-symbol path.
+                futures = {
+                    pool.submit(in_context(_routed_call), provider, "bars", partial(fetch_one, symbol_u)): symbol_u
+                    for symbol_u in allowed
+                }
+                for future in as_completed(futures):
+                    symbol_u = futures[future]
+                    try:
+                        _accept(symbol_u, provider, future.result())
+                    except Exception as exc:
+                        out.errors[symbol_u] = f"{provider}: {exc}"
+                        _note_provider_error(provider, "bars", exc)
+        pending = [symbol_u for symbol_u in pending if symbol_u not in out.bars]
+
+    if pending and not _provider_in_cooldown("yahoo", "bars"):
+        _run_parallel(
+            "yahoo",
+            lambda s: fetch_yahoo_bars(s, interval=interval_v, outputsize=fetch_v, start=starts.get(s)),
+            40,
+        )
+
+    if pending and _has_twelvedata_key() and not _provider_in_cooldown("twelvedata", "bars"):
+        td = TwelveDataClient()
+        # start_date is per request, so delta and full symbols go in separate chunks; a delta chunk
+        # starts at its earliest symbol and the merge drops whatever overlaps.
+        batch_size = _batch_size_setting("TWELVEDATA_BARS_BATCH_SIZE", 8)
+        chunks = _chunks([s for s in pending if s in starts], batch_size) + _chunks(
+            [s for s in pending if s not in starts], batch_size
+        )
+        for chunk in chunks:
+            if expired():
+                break
+            # time_series is billed per symbol, like /quote.
+            granted = _acquire_provider_calls("twelvedata", "bars", _provider_minute_limit(20), len(chunk))
+            drained = granted < len(chunk)
+            for symbol_u in chunk[granted:]:
+                out.errors[symbol_u] = "twelvedata: local rate limit reached"
+            if not granted:
+                break
+            chunk = chunk[:granted]
+            out.provider_requests += 1
+            try:
+                chunk_start = min(starts[s] for s in chunk) if chunk[0] in starts else None
+                results = td.fetch_bars_many(chunk, interval=interval_v, outputsize=fetch_v, start=chunk_start)
+            except Exception as exc:
+                for symbol_u in chunk:
+                    out.errors[symbol_u] = f"twelvedata: {exc}"
+                _note_provider_error("twelvedata", "bars", exc)
+                if is_rate_limit_error(exc):
+                    break
+                continue
+            for symbol_u in chunk:
+                try:
+                    if symbol_u not in results:
+                        raise ProviderError(f"TwelveData bars empty for {symbol_u}")
+                    _accept(symbol_u, "twelvedata", results[symbol_u])
+                except Exception as exc:
+                    out.errors[symbol_u] = f"twelvedata: {exc}"
+            if drained:
+                break
+        pending = [symbol_u for symbol_u in pending if symbol_u not in out.bars]
+
+    if pending and _has_finnhub_key() and not _provider_in_cooldown("finnhub", "bars"):
+        fh = FinnhubClient()
+        _run_parallel(
+            "finnhub",
+            lambda s: fh.fetch_bars(s, interval=interval_v, outputsize=fetch_v, start=starts.get(s)),
+            20,
+        )
+
+    for symbol_u in pending:
+        stale = _get_cached_bars_allow_stale((symbol_u, interval_v, size_v))
+        if stale:
+            out.bars[symbol_u] = stale
+            out.provenance[symbol_u] = "stale"
+        else:
+            out.errors.setdefault(symbol_u, f"All providers failed for symbol {symbol_u}")
+
+    if persist and fetched:
+        try:
+            _persist_fetched_bars(interval_v, fetched)
+        except Exception as exc:
+            logger.warning("bars batch persist failed for %s symbols: %s", len(fetched), exc)
+    return out
+
+
+def get_bars_batch_cached_first(
+    symbols: List[str],
+    interval: str = "1day",
+    outputsize: int = 500,
+    max_age_seconds: int = 21600,
+    allow_live: bool = False,
+) -> BarsBatchResult:
+    wanted = list(dict.fromkeys((s or "").strip().upper() for s in symbols or [] if (s or "").strip()))
+    cached = _db_recent_bars_many(wanted, interval, outputsize, max_age_seconds)
+    missing = [s for s in wanted if s not in cached]
+    if missing and allow_live:
+        out = get_bars_batch_with_fallback(missing, interval=interval, outputsize=outputsize)
+    else:
+        out = BarsBatchResult(
+            bars={},
+            errors={s: "No recent cached bars" for s in missing},
+            provenance={},
+        )
+    for symbol_u, result in cached.items():
+        out.bars[symbol_u] = result
+        out.provenance[symbol_u] = "cache"
+    return out
+
+
+def get_quotes_cached_first(
+    symbols: List[str],
+    max_age_seconds: int = 900,
+    allow_live: bool = False,
+    freshness_seconds: int = 60,
+) -> QuotesBatchResult:
+    wanted = list(dict.fromkeys((s or "").strip().upper() for s in symbols or [] if (s or "").strip()))
+    cached: Dict[str, QuoteResult] = {}
+    for symbol_u, row in _LATEST_QUOTES_REPO.get_many(wanted, max_age_seconds=max_age_seconds).items():
+        try:
+            cached[symbol_u] = QuoteResult(provider=str(row.get("provider") or "cache"), quote=QuoteOutModel(**row["quote"]))
+        except Exception:
+            continue
+    missing = [s for s in wanted if s not in cached]
+    if missing and allow_live:
+        out = get_quotes_with_fallback(missing, freshness_seconds=freshness_seconds)
+    else:
+        out = QuotesBatchResult(quotes={}, errors={s: "No recent cached quote" for s in missing}, provenance={})
+    for symbol_u, result in cached.items():
+        out.quotes[symbol_u] = result
+        out.provenance[symbol_u] = "cache"
+    return out
@@ -3,12 +3,16 @@
 from __future__ import annotations
 
 import os
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
 
-import requests
 from pydantic import BaseModel, Field
 
+from app.providers.bar_series import BarSeries
+from app.providers.http import http_get
+from app.validation.market_data import ValidationError
+
 
 class ProviderError(Exception):
     pass
@@ -40,6 +44,13 @@ def _parse_twelvedata_date(s: Any) -> Optional[datetime]:
         return None
 
 
+def _twelvedata_start_date(start: datetime, interval: str) -> str:
+    # Daily and longer series are dated; intraday start_date takes a full timestamp.
+    if (interval or "").strip().lower() in ("1day", "1week", "1month"):
+        return start.strftime("%Y-%m-%d")
+    return start.strftime("%Y-%m-%d %H:%M:%S")
+
+
 class QuoteOutModel(BaseModel):
     instrument_id: str
     ts_event: Optional[datetime] = None
@@ -51,27 +62,15 @@ class QuoteOutModel(BaseModel):
     quality_flags: List[str] = Field(default_factory=list)
 
 
-class BarModel(BaseModel):
-    ts_event: Any
-    open: float
-    high: float
-    low: float
-    close: float
-    volume: Optional[float] = None
-    instrument_id: Optional[str] = None
-    ts_ingest: Optional[Any] = None
-    source_provider: Optional[str] = None
-    quality_flags: Optional[List[str]] = None
-
-
 class QuoteResult(BaseModel):
     provider: str
     quote: QuoteOutModel
 
 
-class BarsResult(BaseModel):
+@dataclass
+class BarsResult:
     provider: str
-    bars: List[BarModel]
+    bars: BarSeries
 
 
 class TwelveDataClient:
@@ -81,7 +80,6 @@ class TwelveDataClient:
             raise ProviderError("TWELVEDATA_API_KEY is not set")
         self.timeout = timeout
         self.base_url = "https://api.twelvedata.com"
-        self.session = requests.Session()
 
     def _get(self, path: str, params: Dict[str, Any]) -> Dict[str, Any]:
         url = f"{self.base_url}{path}"
@@ -89,7 +87,7 @@ class TwelveDataClient:
         params["apikey"] = self.api_key
 
         try:
-            r = self.session.get(url, params=params, timeout=self.timeout)
+            r = http_get(url, params=params, timeout=self.timeout)
             data = r.json()
         except Exception as exc:
             raise ProviderError(f"TwelveData request failed: {exc}") from exc
@@ -114,7 +112,30 @@ class TwelveDataClient:
     def fetch_quote(self, symbol: str) -> QuoteResult:
         symbol_u = (symbol or "").strip().upper()
         data = self._get("/quote", {"symbol": symbol_u})
+        return QuoteResult(provider="twelvedata", quote=self._quote_from_payload(symbol_u, data))
+
+    def fetch_quotes(self, symbols: List[str]) -> Dict[str, QuoteResult]:
+        # /quote accepts comma-separated symbols: one object per symbol keyed by symbol, or the bare
+        # quote object when only one was asked for. Symbols that fail are simply absent from the result.
+        wanted = [s.strip().upper() for s in symbols if s and s.strip()]
+        if not wanted:
+            return {}
+        data = self._get("/quote", {"symbol": ",".join(wanted)})
+        if len(wanted) == 1:
+            data = {wanted[0]: data}
+        out: Dict[str, QuoteResult] = {}
+        for symbol_u in wanted:
+            item = data.get(symbol_u) if isinstance(data, dict) else None
+            if not isinstance(item, dict) or item.get("status") == "error":
+                continue
+            try:
+                out[symbol_u] = QuoteResult(provider="twelvedata", quote=self._quote_from_payload(symbol_u, item))
+            except (ProviderError, TypeError, ValueError):
+                continue
+        return out
 
+    @staticmethod
+    def _quote_from_payload(symbol_u: str, data: Dict[str, Any]) -> QuoteOutModel:
         # TwelveData: "close" is effectively last for daily
         last = data.get("close") or data.get("price") or data.get("last")
         if last is None:
@@ -123,7 +144,7 @@ class TwelveDataClient:
         ts_event = _parse_twelvedata_date(data.get("datetime"))
         # If we only have date, set typical US close time is unknown; we keep date in UTC midnight.
         # That’s fine for our current use.
-        quote = QuoteOutModel(
+        return QuoteOutModel(
             instrument_id=f"TWELVEDATA:{symbol_u}",
             ts_event=ts_event,
             ts_ingest=_utc_now(),
@@ -133,42 +154,75 @@ class TwelveDataClient:
             source_provider="twelvedata",
             quality_flags=[],
         )
-        return QuoteResult(provider="twelvedata", quote=quote)
 
-    def fetch_bars(self, symbol: str, interval: str = "1day", outputsize: int = 500) -> BarsResult:
+    def fetch_bars(
+        self,
+        symbol: str,
+        interval: str = "1day",
+        outputsize: int = 500,
+        start: Optional[datetime] = None,
+    ) -> BarsResult:
         symbol_u = (symbol or "").strip().upper()
 
         # TwelveData uses: time_series?symbol=...&interval=1day&outputsize=...&order=DESC
-        data = self._get(
-            "/time_series",
-            {"symbol": symbol_u, "interval": interval, "outputsize": int(outputsize), "order": "DESC"},
-        )
+        params: Dict[str, Any] = {"symbol": symbol_u, "interval": interval, "outputsize": int(outputsize), "order": "DESC"}
+        if start is not None:
+            params["start_date"] = _twelvedata_start_date(start, interval)
+        data = self._get("/time_series", params)
+        return BarsResult(provider="twelvedata", bars=self._bars_from_payload(symbol_u, data))
+
+    def fetch_bars_many(
+        self,
+        symbols: List[str],
+        interval: str = "1day",
+        outputsize: int = 500,
+        start: Optional[datetime] = None,
+    ) -> Dict[str, BarsResult]:
+        # Same shape rules as fetch_quotes: keyed by symbol for several symbols, bare for one.
+        wanted = [s.strip().upper() for s in symbols if s and s.strip()]
+        if not wanted:
+            return {}
+        params: Dict[str, Any] = {"symbol": ",".join(wanted), "interval": interval, "outputsize": int(outputsize), "order": "DESC"}
+        if start is not None:
+            params["start_date"] = _twelvedata_start_date(start, interval)
+        data = self._get("/time_series", params)
+        if len(wanted) == 1:
+            data = {wanted[0]: data}
+        out: Dict[str, BarsResult] = {}
+        for symbol_u in wanted:
+            item = data.get(symbol_u) if isinstance(data, dict) else None
+            if not isinstance(item, dict) or item.get("status") == "error":
+                continue
+            try:
+                out[symbol_u] = BarsResult(provider="twelvedata", bars=self._bars_from_payload(symbol_u, item))
+            except (ProviderError, ValidationError):
+                continue
+        return out
 
+    @staticmethod
+    def _bars_from_payload(symbol_u: str, data: Dict[str, Any]) -> BarSeries:
         values = data.get("values") if isinstance(data, dict) else None
         if not isinstance(values, list):
             raise ProviderError(f"TwelveData bars missing values for {symbol_u}")
 
-        bars: List[BarModel] = []
-        for v in values:
-            if not isinstance(v, dict):
-                continue
-            ts = _parse_twelvedata_date(v.get("datetime")) or v.get("datetime")
-            bars.append(
-                BarModel(
-                    instrument_id=f"TWELVEDATA:{symbol_u}",
-                    ts_event=ts if ts is not None else v.get("datetime"),
-                    ts_ingest=_utc_now(),
-                    open=float(v.get("open")) if v.get("open") is not None else 0.0,
-                    high=float(v.get("high")) if v.get("high") is not None else 0.0,
-                    low=float(v.get("low")) if v.get("low") is not None else 0.0,
-                    close=float(v.get("close")) if v.get("close") is not None else 0.0,
-                    volume=float(v.get("volume")) if v.get("volume") not in (None, "") else None,
-                    source_provider="twelvedata",
-                    quality_flags=[],
+        # values arrive newest first (order=DESC); the series sorts them once.
+        return BarSeries.from_rows(
+            (
+                (
+                    _parse_twelvedata_date(v.get("datetime")) or v.get("datetime"),
+                    v.get("open"),
+                    v.get("high"),
+                    v.get("low"),
+                    v.get("close"),
+                    v.get("volume"),
                 )
-            )
-
-        return BarsResult(provider="twelvedata", bars=bars)
+                for v in values
+                if isinstance(v, dict)
+            ),
+            instrument_id=f"TWELVEDATA:{symbol_u}",
+            source_provider="twelvedata",
+            ts_ingest=_utc_now(),
+        )
 
     def search_symbols(self, q: str) -> List[Dict[str, Any]]:
         # TwelveData: /symbol_search?symbol=xxx
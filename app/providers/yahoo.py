@@ -1,11 +1,11 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
-from typing import Any, List
+from typing import Optional
 
-import requests
-
-from app.providers.twelvedata import BarModel, BarsResult, ProviderError
+from app.providers.bar_series import BarSeries
+from app.providers.http import http_get
+from app.providers.twelvedata import BarsResult, ProviderError
 
 _YAHOO_HEADERS = {
     "User-Agent": "Mozilla/5.0",
@@ -63,15 +63,28 @@ def _yahoo_range(interval: str, outputsize: int) -> str:
     return "10y"
 
 
-def fetch_bars(symbol: str, interval: str = "1day", outputsize: int = 500, timeout: int = 20) -> BarsResult:
+def fetch_bars(
+    symbol: str,
+    interval: str = "1day",
+    outputsize: int = 500,
+    timeout: int = 20,
+    start: Optional[datetime] = None,
+) -> BarsResult:
     symbol_u = symbol.strip().upper()
     y_interval = _yahoo_interval(interval)
-    y_range = _yahoo_range(interval, outputsize)
     url = f"https://query1.finance.yahoo.com/v8/finance/chart/{symbol_u}"
-    params = {"interval": y_interval, "range": y_range}
+    if start is not None:
+        # Delta refresh: only bars from `start` onward instead of a whole range.
+        params = {
+            "interval": y_interval,
+            "period1": int(start.timestamp()),
+            "period2": int(_utc_now().timestamp()) + 86400,
+        }
+    else:
+        params = {"interval": y_interval, "range": _yahoo_range(interval, outputsize)}
 
     try:
-        response = requests.get(url, params=params, headers=_YAHOO_HEADERS, timeout=timeout)
+        response = http_get(url, params=params, headers=_YAHOO_HEADERS, timeout=timeout)
         response.raise_for_status()
         payload = response.json()
     except Exception as exc:
@@ -92,37 +105,18 @@ def fetch_bars(symbol: str, interval: str = "1day", outputsize: int = 500, timeo
     closes = quote_row.get("close") or []
     volumes = quote_row.get("volume") or []
 
-    bars: List[Any] = []
+    # Yahoo leaves null gaps for sessions without trades; those rows are skipped.
     n = min(len(timestamps), len(opens), len(highs), len(lows), len(closes))
-    ts_ingest = _utc_now()
-    for i in range(n):
-        o = opens[i]
-        h = highs[i]
-        l = lows[i]
-        c = closes[i]
-        if o in (None, "") or h in (None, "") or l in (None, "") or c in (None, ""):
-            continue
-        try:
-            ts_event = datetime.fromtimestamp(int(timestamps[i]), tz=timezone.utc)
-            vol = None
-            if i < len(volumes) and volumes[i] not in (None, ""):
-                vol = float(volumes[i])
-            bars.append(
-                BarModel(
-                    instrument_id=f"YAHOO:{symbol_u}",
-                    ts_event=ts_event,
-                    ts_ingest=ts_ingest,
-                    open=float(o),
-                    high=float(h),
-                    low=float(l),
-                    close=float(c),
-                    volume=vol,
-                    source_provider="yahoo",
-                    quality_flags=[],
-                )
-            )
-        except Exception:
-            continue
+    bars = BarSeries.from_rows(
+        (
+            (timestamps[i], opens[i], highs[i], lows[i], closes[i], volumes[i] if i < len(volumes) else None)
+            for i in range(n)
+            if None not in (timestamps[i], opens[i], highs[i], lows[i], closes[i])
+        ),
+        instrument_id=f"YAHOO:{symbol_u}",
+        source_provider="yahoo",
+        ts_ingest=_utc_now(),
+    )
 
     if outputsize > 0:
         bars = bars[-int(outputsize):]
@@ -1,13 +1,23 @@
 from statistics import mean
 from datetime import datetime, timezone
 
+from app.providers.bar_series import BarSeries
+
 def compute_basic_signal(bars):
-    ordered_bars = sorted(bars, key=_ts_sort_key)
-    bars_count = len(ordered_bars)
-    first_ts = ordered_bars[0].get("ts_event") if ordered_bars else None
-    last_ts = ordered_bars[-1].get("ts_event") if ordered_bars else None
-    first_close = ordered_bars[0].get("close") if ordered_bars else None
-    last_close = ordered_bars[-1].get("close") if ordered_bars else None
+    if isinstance(bars, BarSeries):
+        # A series is already sorted and its closes validated; read the column as is.
+        closes_raw = list(bars.close)
+        bars_count = len(bars)
+        first_ts = bars.ts_iso(0) if bars_count else None
+        last_ts = bars.ts_iso(-1) if bars_count else None
+    else:
+        ordered_bars = sorted(bars, key=_ts_sort_key)
+        closes_raw = [bar.get("close") for bar in ordered_bars]
+        bars_count = len(ordered_bars)
+        first_ts = ordered_bars[0].get("ts_event") if ordered_bars else None
+        last_ts = ordered_bars[-1].get("ts_event") if ordered_bars else None
+    first_close = closes_raw[0] if closes_raw else None
+    last_close = closes_raw[-1] if closes_raw else None
 
     if bars_count < 20:
         return {
@@ -30,8 +40,7 @@ def compute_basic_signal(bars):
         }
 
     closes = []
-    for bar in ordered_bars:
-        close = bar.get("close")
+    for close in closes_raw:
         if close is None:
             return {
                 "score": 0,
@@ -1,13 +1,21 @@
 from __future__ import annotations
 
+import time
+from array import array
 from typing import Any, Dict, List, Optional
 
+from app.providers.bar_series import BarSeries
 from app.providers.selector import (
+    get_bars_batch_cached_first,
     get_bars_cached_first,
     get_quote_cached_first,
+    get_quotes_cached_first,
 )
+from app.providers.twelvedata import ProviderError
 from app.services.basic_signal import compute_basic_signal
 from app.services.trade_signal import compute_trade_signal
+from core.repositories.instruments import canonical_instrument_id
+from core.storage.bar_archive import PRICE_COLUMNS, archive_enabled, get_bar_archive
 
 
 def _num_or_none(value: Any) -> Optional[float]:
@@ -22,17 +30,26 @@ def _num_or_none(value: Any) -> Optional[float]:
     return num
 
 
-def _bars_to_dicts(bars: List[Any]) -> List[Dict[str, Any]]:
-    out: List[Dict[str, Any]] = []
-    for bar in bars or []:
-        if hasattr(bar, "model_dump"):
-            dumped = bar.model_dump(mode="json")
-            if isinstance(dumped, dict):
-                out.append(dumped)
-        elif isinstance(bar, dict):
-            out.append(bar)
-    out.sort(key=lambda x: str(x.get("ts_event") or ""))
-    return out
+def _archive_bars(symbol: str, interval: str, count: int, max_age_seconds: int) -> BarSeries:
+    # The columnar archive is only trusted when it holds a full window that was appended recently.
+    # Its columns are copied straight into a series; they are already sorted and unique by ts.
+    if not archive_enabled():
+        return BarSeries()
+    instrument_id = canonical_instrument_id(symbol)
+    try:
+        with get_bar_archive().open_slice(instrument_id, interval, limit=count) as window:
+            if len(window) < count or window.updated_at is None:
+                return BarSeries()
+            if time.time() - window.updated_at > max(1, int(max_age_seconds)):
+                return BarSeries()
+            return BarSeries(
+                array("q", window.ts),
+                *(array("d", getattr(window, name)) for name in PRICE_COLUMNS),
+                instrument_id=instrument_id,
+                source_provider="archive",
+            )
+    except Exception:
+        return BarSeries()
 
 
 def _near_entry_tag(price: Any, entry_low: Any, entry_high: Any) -> bool:
@@ -70,6 +87,57 @@ def rank_buy_opportunity(row: Dict[str, Any]) -> float:
     return score
 
 
+def warm_scanner_universe(
+    symbols: List[str],
+    interval: str = "1day",
+    bars: int = 60,
+    allow_live: bool = False,
+    bars_ttl_seconds: int = 21600,
+    quote_ttl_seconds: int = 900,
+) -> Dict[str, Dict[str, Any]]:
+    # Fetches quotes and bars for a whole scan in a few batched calls; pass each symbol's entry to
+    # build_scanner_row(prefetched=...) so the per-row work never goes back to the providers.
+    wanted = list(dict.fromkeys((s or "").strip().upper() for s in symbols or [] if (s or "").strip()))
+    prefetched: Dict[str, Dict[str, Any]] = {symbol_u: {} for symbol_u in wanted}
+    if not wanted:
+        return prefetched
+
+    need_bars: List[str] = []
+    for symbol_u in wanted:
+        archived = _archive_bars(symbol_u, interval, int(bars), int(bars_ttl_seconds))
+        if archived:
+            prefetched[symbol_u]["bars"] = archived
+            prefetched[symbol_u]["bars_provider"] = "archive"
+        else:
+            need_bars.append(symbol_u)
+
+    quotes = get_quotes_cached_first(
+        wanted,
+        max_age_seconds=int(quote_ttl_seconds),
+        allow_live=allow_live,
+        freshness_seconds=60,
+    )
+    for symbol_u, quote_res in quotes.quotes.items():
+        prefetched.setdefault(symbol_u, {})["quote"] = quote_res
+    for symbol_u, error in quotes.errors.items():
+        prefetched.setdefault(symbol_u, {})["quote_error"] = error
+
+    if need_bars:
+        batch = get_bars_batch_cached_first(
+            need_bars,
+            interval=interval,
+            outputsize=int(bars),
+            max_age_seconds=int(bars_ttl_seconds),
+            allow_live=allow_live,
+        )
+        for symbol_u, bars_res in batch.bars.items():
+            prefetched.setdefault(symbol_u, {})["bars"] = bars_res.bars
+            prefetched[symbol_u]["bars_provider"] = bars_res.provider
+        for symbol_u, error in batch.errors.items():
+            prefetched.setdefault(symbol_u, {})["bars_error"] = error
+    return prefetched
+
+
 def build_scanner_row(
     symbol: str,
     interval: str = "1day",
@@ -77,33 +145,49 @@ def build_scanner_row(
     allow_live: bool = False,
     bars_ttl_seconds: int = 21600,
     quote_ttl_seconds: int = 900,
+    prefetched: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
     symbol_u = (symbol or "").strip().upper()
     if not symbol_u:
         raise ValueError("Missing symbol")
 
-    quote_res = get_quote_cached_first(
-        symbol=symbol_u,
-        max_age_seconds=int(quote_ttl_seconds),
-        allow_live=allow_live,
-        freshness_seconds=60,
-    )
-    bars_res = get_bars_cached_first(
-        symbol=symbol_u,
-        interval=interval,
-        outputsize=int(bars),
-        max_age_seconds=int(bars_ttl_seconds),
-        allow_live=allow_live,
-    )
-    bars_dicts = _bars_to_dicts(bars_res.bars if hasattr(bars_res, "bars") else [])
-    if not bars_dicts:
+    if prefetched is not None:
+        # Already resolved by warm_scanner_universe; a miss there is final for this scan.
+        quote_res = prefetched.get("quote")
+        if quote_res is None:
+            raise ProviderError(prefetched.get("quote_error") or f"No quote for {symbol_u}")
+        bar_series = prefetched.get("bars") or BarSeries()
+        bars_provider = prefetched.get("bars_provider") or "cache"
+        if not bar_series and prefetched.get("bars_error"):
+            raise ProviderError(prefetched["bars_error"])
+    else:
+        quote_res = get_quote_cached_first(
+            symbol=symbol_u,
+            max_age_seconds=int(quote_ttl_seconds),
+            allow_live=allow_live,
+            freshness_seconds=60,
+        )
+        bar_series = _archive_bars(symbol_u, interval, int(bars), int(bars_ttl_seconds))
+        if bar_series:
+            bars_provider = "archive"
+        else:
+            bars_res = get_bars_cached_first(
+                symbol=symbol_u,
+                interval=interval,
+                outputsize=int(bars),
+                max_age_seconds=int(bars_ttl_seconds),
+                allow_live=allow_live,
+            )
+            bars_provider = bars_res.provider
+            bar_series = BarSeries.coerce(bars_res.bars if hasattr(bars_res, "bars") else None)
+    if not bar_series:
         raise ValueError(f"No bars for {symbol_u}")
 
-    basic = compute_basic_signal(bars_dicts)
+    basic = compute_basic_signal(bar_series)
     trade = compute_trade_signal(
-        bars_dicts,
+        bar_series,
         symbol=symbol_u,
-        provider_used=bars_res.provider,
+        provider_used=bars_provider,
         timeframe=interval,
     )
 
@@ -115,7 +199,7 @@ def build_scanner_row(
 
     quote_last = _num_or_none(getattr(quote_res.quote, "last", None))
     trade_last = _num_or_none(trade.get("last_close"))
-    bar_last = _num_or_none(bars_dicts[-1].get("close")) if bars_dicts else None
+    bar_last = _num_or_none(bar_series.close[-1]) if bar_series else None
 
     last_price = None
     price_source = None
@@ -143,9 +227,9 @@ def build_scanner_row(
         "symbol": symbol_u,
         "price": last_price,
         "price_source": price_source,
-        "provider": bars_res.provider,
+        "provider": bars_provider,
         "provider_used": quote_res.provider,
-        "trade_provider_used": bars_res.provider,
+        "trade_provider_used": bars_provider,
         "timeframe": interval,
         "recommendation": action,
         "action": action,
@@ -165,7 +249,7 @@ def build_scanner_row(
         "score": basic.get("score"),
         "trend": basic.get("trend"),
         "momentum": basic.get("momentum"),
-        "snapshot": f"{action} setup from {bars_res.provider} bars",
+        "snapshot": f"{action} setup from {bars_provider} bars",
     }
     row["buy_opportunity"] = rank_buy_opportunity(row)
     return row
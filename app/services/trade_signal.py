@@ -3,7 +3,9 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence
+
+from app.providers.bar_series import BarSeries
 
 
 def _safe_float(x: Any) -> Optional[float]:
@@ -48,16 +50,21 @@ def _rsi(values: List[float], period: int = 14) -> Optional[float]:
     return 100.0 - (100.0 / (1.0 + rs))
 
 
-def _atr(bars: List[Dict[str, Any]], period: int = 14) -> Optional[float]:
-    if len(bars) < period + 1:
+def _atr(
+    highs: Sequence[Optional[float]],
+    lows: Sequence[Optional[float]],
+    closes: Sequence[float],
+    period: int = 14,
+) -> Optional[float]:
+    if len(closes) < period + 1:
         return None
 
     trs: List[float] = []
-    for i in range(1, len(bars)):
-        high = _safe_float(bars[i].get("high"))
-        low = _safe_float(bars[i].get("low"))
-        prev_close = _safe_float(bars[i - 1].get("close"))
-        if high is None or low is None or prev_close is None:
+    for i in range(1, len(closes)):
+        high = highs[i]
+        low = lows[i]
+        prev_close = closes[i - 1]
+        if high is None or low is None:
             continue
         tr = max(high - low, abs(high - prev_close), abs(low - prev_close))
         trs.append(tr)
@@ -76,7 +83,7 @@ def _round2(x: Optional[float]) -> Optional[float]:
 
 
 def compute_trade_signal(
-    bars: List[Dict[str, Any]],
+    bars: Any,
     symbol: str,
     provider_used: str,
     timeframe: str = "1day",
@@ -89,20 +96,28 @@ def compute_trade_signal(
     - Risk: ATR14
     Output includes target sell + stops + entry zone + reasons.
 
-    bars: list of dicts with at least ts_event, open, high, low, close, volume(optional)
+    bars: a BarSeries, or a list of dicts with at least ts_event, open, high, low, close, volume(optional)
     """
 
-    # Clean closes
     closes: List[float] = []
-    cleaned: List[Dict[str, Any]] = []
-    for b in bars:
-        if not isinstance(b, dict):
-            continue
-        c = _safe_float(b.get("close"))
-        if c is None:
-            continue
-        cleaned.append(b)
-        closes.append(c)
+    highs: List[Optional[float]] = []
+    lows: List[Optional[float]] = []
+    if isinstance(bars, BarSeries):
+        # Columns are sorted and validated already.
+        closes = list(bars.close)
+        highs = list(bars.high)
+        lows = list(bars.low)
+    else:
+        # Clean closes
+        for b in bars:
+            if not isinstance(b, dict):
+                continue
+            c = _safe_float(b.get("close"))
+            if c is None:
+                continue
+            closes.append(c)
+            highs.append(_safe_float(b.get("high")))
+            lows.append(_safe_float(b.get("low")))
 
     if len(closes) < 20:
         fallback_target_why = (
@@ -148,7 +163,7 @@ def compute_trade_signal(
     sma20 = _sma(closes, 20)
     sma50 = _sma(closes, 50)
     rsi14 = _rsi(closes, 14)
-    atr14 = _atr(cleaned, 14)
+    atr14 = _atr(highs, lows, closes, 14)
 
     # Entry zone: ATR half band around last close (simple, predictable)
     entry_low = None
@@ -4,27 +4,49 @@ from typing import Any, Dict, List, Optional
 from core.storage.db import get_connection
 
 
+def _payload_symbol(payload: Dict[str, Any]) -> Optional[str]:
+    symbol = payload.get("symbol") if isinstance(payload, dict) else None
+    if isinstance(symbol, str) and symbol.strip():
+        return symbol.strip().upper()
+    return None
+
+
 class EventsRepository:
     def create(self, event_type: str, payload: Dict[str, Any], source: Optional[str] = None) -> int:
         with get_connection() as conn:
             cursor = conn.execute(
                 """
-                INSERT INTO events (event_type, source, payload)
-                VALUES (?, ?, ?)
+                INSERT INTO events (event_type, source, payload, symbol)
+                VALUES (?, ?, ?, ?)
                 """,
-                (event_type, source, json.dumps(payload)),
+                (event_type, source, json.dumps(payload), _payload_symbol(payload)),
             )
             return int(cursor.lastrowid)
 
-    def list_recent(self, limit: int = 100) -> List[Dict[str, Any]]:
+    def list_recent(
+        self,
+        limit: int = 100,
+        event_type: Optional[str] = None,
+        symbol: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        clauses: List[str] = []
+        params: List[Any] = []
+        if event_type:
+            clauses.append("event_type = ?")
+            params.append(event_type)
+        if symbol:
+            clauses.append("symbol = ?")
+            params.append(symbol.strip().upper())
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
         with get_connection() as conn:
             rows = conn.execute(
-                """
+                f"""
                 SELECT id, event_type, source, payload, created_at
                 FROM events
+                {where}
                 ORDER BY id DESC
                 LIMIT ?
                 """,
-                (limit,),
+                (*params, limit),
             ).fetchall()
             return [dict(row) for row in rows]
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from core.storage.db import DBConnection
+
+CANONICAL_PREFIX = "A67."
+
+_ALIAS_COLUMNS = ("provider_instrument_id", "instrument_id", "source_provider")
+_MASTER_COLUMNS = (
+    "instrument_id",
+    "symbol",
+    "venue",
+    "asset_type",
+    "currency",
+    "is_tradable",
+    "effective_from",
+    "source_provider",
+)
+
+
+def canonical_instrument_id(raw: Optional[str]) -> str:
+    # Provider IDs look like "TWELVEDATA:AAPL"; every provider maps to one "A67.AAPL" instrument.
+    text = (raw or "").strip()
+    if text.upper().startswith(CANONICAL_PREFIX):
+        return CANONICAL_PREFIX + text[len(CANONICAL_PREFIX):].upper()
+    _, sep, symbol = text.partition(":")
+    return f"{CANONICAL_PREFIX}{(symbol if sep else text).strip().upper()}"
+
+
+def symbol_for_instrument(instrument_id: str) -> str:
+    canonical = canonical_instrument_id(instrument_id)
+    return canonical[len(CANONICAL_PREFIX):]
+
+
+def register_instruments(
+    conn: DBConnection,
+    provider_ids: Iterable[Tuple[str, str]],
+) -> Dict[str, str]:
+    mapping: Dict[str, str] = {}
+    providers: Dict[str, str] = {}
+    for provider_instrument_id, source_provider in provider_ids:
+        raw = (provider_instrument_id or "").strip()
+        if not raw or raw in mapping:
+            continue
+        mapping[raw] = canonical_instrument_id(raw)
+        providers[raw] = source_provider or "unknown"
+    if not mapping:
+        return mapping
+
+    now_iso = datetime.now(timezone.utc).isoformat()
+    tradable: Any = True if conn.backend == "postgres" else 1
+    masters = {}
+    for raw, canonical in mapping.items():
+        masters.setdefault(
+            canonical,
+            (canonical, symbol_for_instrument(canonical), "UNKNOWN", "equity", "USD", tradable, now_iso, providers[raw]),
+        )
+    # Existing master rows (e.g. from the ingestion service) keep their reference data.
+    conn.upsert_many(
+        "canonical_instruments",
+        _MASTER_COLUMNS,
+        list(masters.values()),
+        conflict_columns=("instrument_id",),
+        update_columns=(),
+    )
+    conn.upsert_many(
+        "canonical_instrument_aliases",
+        _ALIAS_COLUMNS,
+        [(raw, canonical, providers[raw]) for raw, canonical in mapping.items() if raw != canonical],
+        conflict_columns=("provider_instrument_id",),
+        update_columns=(),
+    )
+    return mapping
+
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from core.storage.db import get_connection
+from core.storage.write_behind import get_write_behind
+
+_COLUMNS = ("symbol", "provider", "last", "payload", "updated_at")
+
+
+def _utc_now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _as_utc(raw: Any) -> Optional[datetime]:
+    if isinstance(raw, datetime):
+        return raw.astimezone(timezone.utc) if raw.tzinfo else raw.replace(tzinfo=timezone.utc)
+    text = str(raw or "").strip()
+    if not text:
+        return None
+    try:
+        parsed = datetime.fromisoformat(text.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return parsed.astimezone(timezone.utc) if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _last_or_none(quote: Dict[str, Any]) -> Optional[float]:
+    try:
+        return float(quote.get("last"))
+    except (TypeError, ValueError):
+        return None
+
+
+class LatestQuotesRepository:
+    def upsert(self, symbol: str, provider: str, quote: Dict[str, Any], deferred: bool = False) -> None:
+        if deferred:
+            row = self._row(symbol, provider, quote, _utc_now_iso())
+            if row is not None:
+                get_write_behind().submit_upsert("latest_quotes", _COLUMNS, row, conflict_columns=("symbol",))
+            return
+        self.upsert_many([(symbol, provider, quote)])
+
+    @staticmethod
+    def _row(symbol: str, provider: str, quote: Dict[str, Any], now_iso: str) -> Optional[Tuple[Any, ...]]:
+        symbol_u = (symbol or "").strip().upper()
+        if not symbol_u or not isinstance(quote, dict):
+            return None
+        return (symbol_u, provider or "cache", _last_or_none(quote), json.dumps(quote), now_iso)
+
+    def upsert_many(self, rows: Iterable[Tuple[str, str, Dict[str, Any]]]) -> int:
+        now_iso = _utc_now_iso()
+        values = []
+        for symbol, provider, quote in rows:
+            row = self._row(symbol, provider, quote, now_iso)
+            if row is not None:
+                values.append(row)
+        if not values:
+            return 0
+        with get_connection() as conn:
+            return conn.upsert_many("latest_quotes", _COLUMNS, values, conflict_columns=("symbol",))
+
+    def get(self, symbol: str, max_age_seconds: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        found = self.get_many([symbol], max_age_seconds=max_age_seconds)
+        return found.get((symbol or "").strip().upper())
+
+    def get_many(self, symbols: List[str], max_age_seconds: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+        wanted = sorted({(s or "").strip().upper() for s in symbols if (s or "").strip()})
+        if not wanted:
+            return {}
+        placeholders = ", ".join(["?"] * len(wanted))
+        with get_connection() as conn:
+            rows = conn.execute(
+                f"""
+                SELECT symbol, provider, payload, updated_at
+                FROM latest_quotes
+                WHERE symbol IN ({placeholders})
+                """,
+                tuple(wanted),
+            ).fetchall()
+
+        now_dt = datetime.now(timezone.utc)
+        output: Dict[str, Dict[str, Any]] = {}
+        for row in rows:
+            updated_at = _as_utc(row.get("updated_at"))
+            if max_age_seconds is not None and updated_at is not None:
+                if (now_dt - updated_at).total_seconds() > max(1, int(max_age_seconds)):
+                    continue
+            payload = row.get("payload")
+            if isinstance(payload, str):
+                try:
+                    payload = json.loads(payload)
+                except json.JSONDecodeError:
+                    continue
+            if not isinstance(payload, dict):
+                continue
+            symbol = str(row.get("symbol"))
+            output[symbol] = {
+                "symbol": symbol,
+                "provider": row.get("provider"),
+                "quote": payload,
+                "updated_at": updated_at.isoformat() if updated_at else row.get("updated_at"),
+            }
+        return output
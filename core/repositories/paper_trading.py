@@ -11,6 +11,13 @@ def _utc_now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
+def _float_or_none(value: Any) -> Optional[float]:
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
 class PaperTradingRepository:
     def create_order(
         self,
@@ -25,40 +32,61 @@ class PaperTradingRepository:
         opened_at = _utc_now_iso()
         meta_obj = meta if isinstance(meta, dict) else {}
         meta_json = json.dumps(meta_obj)
+        tactic_id = meta_obj.get("tactic_id") or meta_obj.get("strategy_key")
+        params = (
+            symbol,
+            side,
+            float(qty),
+            float(notional),
+            float(price),
+            status,
+            opened_at,
+            meta_json,
+            str(tactic_id) if tactic_id else None,
+            _float_or_none(meta_obj.get("scanner_score")),
+        )
         with get_connection() as conn:
             if conn.backend == "postgres":
                 res = conn.execute(
                     """
-                    INSERT INTO paper_orders(symbol, side, qty, notional, price, status, opened_at, meta)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?::jsonb)
+                    INSERT INTO paper_orders(symbol, side, qty, notional, price, status, opened_at, meta, tactic_id, scanner_score)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?::jsonb, ?, ?)
                     """,
-                    (symbol, side, float(qty), float(notional), float(price), status, opened_at, meta_json),
+                    params,
                 )
             else:
                 res = conn.execute(
                     """
-                    INSERT INTO paper_orders(symbol, side, qty, notional, price, status, opened_at, meta)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    INSERT INTO paper_orders(symbol, side, qty, notional, price, status, opened_at, meta, tactic_id, scanner_score)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                     """,
-                    (symbol, side, float(qty), float(notional), float(price), status, opened_at, meta_json),
+                    params,
                 )
             row_id = res.lastrowid
             rows = conn.execute("SELECT * FROM paper_orders WHERE id = ? LIMIT 1", (row_id,)).fetchall()
         return rows[0] if rows else {}
 
-    def list_orders(self, status: Optional[str] = None, limit: int = 200) -> List[Dict[str, Any]]:
+    def list_orders(
+        self,
+        status: Optional[str] = None,
+        limit: int = 200,
+        tactic_id: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
         safe_limit = max(1, min(int(limit), 1000))
+        clauses: List[str] = []
+        params: List[Any] = []
+        if status:
+            clauses.append("status = ?")
+            params.append(status.upper())
+        if tactic_id:
+            clauses.append("tactic_id = ?")
+            params.append(tactic_id)
+        where = f"WHERE {' AND '.join(clauses)} " if clauses else ""
         with get_connection() as conn:
-            if status:
-                rows = conn.execute(
-                    "SELECT * FROM paper_orders WHERE status = ? ORDER BY id DESC LIMIT ?",
-                    (status.upper(), safe_limit),
-                ).fetchall()
-            else:
-                rows = conn.execute(
-                    "SELECT * FROM paper_orders ORDER BY id DESC LIMIT ?",
-                    (safe_limit,),
-                ).fetchall()
+            rows = conn.execute(
+                f"SELECT * FROM paper_orders {where}ORDER BY id DESC LIMIT ?",
+                (*params, safe_limit),
+            ).fetchall()
         return rows
 
     def get_order(self, order_id: int) -> Optional[Dict[str, Any]]:
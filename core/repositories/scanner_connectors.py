@@ -31,25 +31,13 @@ class ScannerConnectorsRepository:
             )
 
         with get_connection() as conn:
-            for connector in connectors:
-                if conn.backend == "postgres":
-                    conn.execute(
-                        """
-                        INSERT INTO scanner_connectors(id, enabled, updated_at)
-                        VALUES (?, ?, ?)
-                        ON CONFLICT (id) DO NOTHING
-                        """,
-                        (connector["id"], connector["enabled"], now),
-                    )
-                else:
-                    conn.execute(
-                        """
-                        INSERT INTO scanner_connectors(id, enabled, updated_at)
-                        VALUES (?, ?, ?)
-                        ON CONFLICT(id) DO NOTHING
-                        """,
-                        (connector["id"], connector["enabled"], now),
-                    )
+            conn.upsert_many(
+                "scanner_connectors",
+                ("id", "enabled", "updated_at"),
+                [(connector["id"], connector["enabled"], now) for connector in connectors],
+                conflict_columns=("id",),
+                update_columns=(),
+            )
 
     def get_all_enabled_map(self) -> Dict[str, bool]:
         with get_connection() as conn:
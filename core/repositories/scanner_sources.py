@@ -1,34 +1,64 @@
 import json
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from core.storage.db import get_connection
+from core.storage.write_behind import get_write_behind
+
+_INSERT_BREAKDOWN_SQL = """
+INSERT INTO scanner_source_breakdowns (symbol, scanner_type, payload, created_at, action, score)
+VALUES (?, ?, ?, ?, ?, ?)
+"""
+_INSERT_BREAKDOWN_SQL_PG = """
+INSERT INTO scanner_source_breakdowns (symbol, scanner_type, payload, created_at, action, score)
+VALUES (?, ?, ?::jsonb, ?, ?, ?)
+"""
 
 
 def _utc_now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
+def _float_or_none(value: Any) -> Optional[float]:
+    if isinstance(value, bool):
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if number == number else None
+
+
+def _promoted_fields(payload: Dict[str, Any]) -> Tuple[Optional[str], Optional[float]]:
+    # Mirrors the v12 backfill: action/score from the scanner row, score falling back to source totals.
+    scanner_row = payload.get("scanner_row") if isinstance(payload.get("scanner_row"), dict) else {}
+    totals = payload.get("totals") if isinstance(payload.get("totals"), dict) else {}
+    action = scanner_row.get("action")
+    action_value = str(action).strip().upper() if isinstance(action, str) and action.strip() else None
+    score = _float_or_none(scanner_row.get("score"))
+    if score is None:
+        score = _float_or_none(totals.get("avg_score"))
+    return action_value, score
+
+
 class ScannerSourceBreakdownsRepository:
-    def insert_breakdown(self, symbol: str, scanner_type: str, payload: Dict[str, Any]) -> None:
+    def insert_breakdown(
+        self,
+        symbol: str,
+        scanner_type: str,
+        payload: Dict[str, Any],
+        deferred: bool = False,
+    ) -> None:
         payload_json = json.dumps(payload)
+        params = (symbol, scanner_type, payload_json, _utc_now_iso(), *_promoted_fields(payload))
+        if deferred:
+            get_write_behind().submit_insert(_INSERT_BREAKDOWN_SQL, params, postgres_sql=_INSERT_BREAKDOWN_SQL_PG)
+            return
         with get_connection() as conn:
             if conn.backend == "postgres":
-                conn.execute(
-                    """
-                    INSERT INTO scanner_source_breakdowns (symbol, scanner_type, payload, created_at)
-                    VALUES (?, ?, ?::jsonb, ?)
-                    """,
-                    (symbol, scanner_type, payload_json, _utc_now_iso()),
-                )
+                conn.execute(_INSERT_BREAKDOWN_SQL_PG, params)
             else:
-                conn.execute(
-                    """
-                    INSERT INTO scanner_source_breakdowns (symbol, scanner_type, payload, created_at)
-                    VALUES (?, ?, ?, ?)
-                    """,
-                    (symbol, scanner_type, payload_json, _utc_now_iso()),
-                )
+                conn.execute(_INSERT_BREAKDOWN_SQL, params)
 
     def get_latest_breakdown(self, symbol: str, scanner_type: str) -> Optional[Dict[str, Any]]:
         with get_connection() as conn:
@@ -95,6 +125,51 @@ class ScannerSourceBreakdownsRepository:
             )
         return output
 
+    def list_latest_breakdown_per_symbol(
+        self,
+        scanner_type: str,
+        limit: int = 50,
+        action: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        # Newest snapshot per symbol, ranked by the promoted score column; only the returned rows
+        # have their payload decoded.
+        safe_limit = max(1, min(int(limit), 2000))
+        action_clause = ""
+        params: List[Any] = [scanner_type]
+        if action:
+            action_clause = "AND b.action = ?"
+            params.append(str(action).strip().upper())
+        params.append(safe_limit)
+        with get_connection() as conn:
+            rows = conn.execute(
+                f"""
+                SELECT b.id, b.symbol, b.payload, b.created_at, b.action, b.score
+                FROM scanner_source_breakdowns b
+                WHERE b.id IN (
+                    SELECT MAX(id)
+                    FROM scanner_source_breakdowns
+                    WHERE scanner_type = ?
+                    GROUP BY symbol
+                )
+                {action_clause}
+                ORDER BY COALESCE(b.score, 0) DESC, b.id DESC
+                LIMIT ?
+                """,
+                tuple(params),
+            ).fetchall()
+        return [
+            {
+                "id": row.get("id"),
+                "symbol": str(row.get("symbol") or "").strip().upper(),
+                "scanner_type": scanner_type,
+                "action": row.get("action"),
+                "score": row.get("score"),
+                "payload": self._decode_payload(row.get("payload")),
+                "created_at": row.get("created_at"),
+            }
+            for row in rows
+        ]
+
     @staticmethod
     def _decode_payload(raw: Any) -> Dict[str, Any]:
         if isinstance(raw, dict):
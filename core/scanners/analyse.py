@@ -2,9 +2,10 @@ from __future__ import annotations
 
 import json
 import os
-import urllib.request
 from typing import Any, Dict, List
 
+from app.providers.http import http_request
+
 _POS = {
     "beat", "beats", "bull", "bullish", "upgrade", "surge", "growth", "strong", "outperform", "buy", "rally", "profit", "positive", "breakout",
 }
@@ -131,17 +132,18 @@ def _openai_classify(items: List[Dict[str, Any]]) -> Dict[str, Any]:
         ],
     }
 
-    req = urllib.request.Request(
+    response = http_request(
+        "POST",
         "https://api.openai.com/v1/chat/completions",
         data=json.dumps(payload).encode("utf-8"),
         headers={
             "Content-Type": "application/json",
             "Authorization": f"Bearer {api_key}",
         },
-        method="POST",
+        timeout=20,
     )
-    with urllib.request.urlopen(req, timeout=20) as resp:
-        raw = json.loads(resp.read().decode("utf-8", errors="ignore"))
+    response.raise_for_status()
+    raw = json.loads(response.content.decode("utf-8", errors="ignore"))
 
     content = (
         raw.get("choices", [{}])[0]
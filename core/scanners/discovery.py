@@ -5,7 +5,7 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
-from app.providers.selector import get_bars_cached_first, get_quote_with_fallback
+from app.providers.selector import get_bars_batch_cached_first, get_quotes_with_fallback
 
 _BASE_DIR = Path(__file__).resolve().parents[2]
 _DATA_DIR = _BASE_DIR / "app" / "data"
@@ -63,26 +63,18 @@ def _sample_symbols(symbols: List[str], sample_size: int) -> List[str]:
     return out
 
 
-def _resolve_change_pct(symbol: str, last: float) -> Optional[float]:
-    try:
-        bars_result = get_bars_cached_first(
-            symbol=symbol,
-            interval="1day",
-            outputsize=2,
-            max_age_seconds=12 * 60 * 60,
-            allow_live=True,
-        )
-    except Exception:
+def _resolve_change_pct(bars_result: Any, last: float) -> Optional[float]:
+    if bars_result is None:
         return None
 
-    bars = bars_result.bars if hasattr(bars_result, "bars") else []
-    if not isinstance(bars, list) or len(bars) < 2:
+    # bars is a BarSeries: read the close column rather than materialising rows.
+    closes = getattr(getattr(bars_result, "bars", None), "close", None)
+    if closes is None or len(closes) < 2:
         return None
 
     prev_close = None
     try:
-        prev = bars[-2]
-        prev_close = float(prev.close if hasattr(prev, "close") else prev.get("close"))
+        prev_close = float(closes[-2])
     except Exception:
         prev_close = None
 
@@ -101,14 +93,28 @@ def _discover_segment(market: str, segment: str, filename: str, limit: int = 80,
     symbols = _load_symbols(filename)
     sampled = _sample_symbols(symbols, sample_size=min(len(symbols), max(60, safe_limit * 3)))
 
+    quotes = get_quotes_with_fallback(sampled, freshness_seconds=300).quotes
+    # Previous closes for the whole sample in one DB read plus batched live fetches for the misses.
+    try:
+        prev_bars = get_bars_batch_cached_first(
+            list(quotes),
+            interval="1day",
+            outputsize=2,
+            max_age_seconds=12 * 60 * 60,
+            allow_live=True,
+        ).bars
+    except Exception:
+        prev_bars = {}
     rows: List[Dict[str, Any]] = []
     for symbol in sampled:
         try:
-            quote_result = get_quote_with_fallback(symbol=symbol, freshness_seconds=300)
+            quote_result = quotes.get(symbol.strip().upper())
+            if quote_result is None:
+                continue
             last = float(quote_result.quote.last)
             if last <= 0:
                 continue
-            change_pct = _resolve_change_pct(symbol, last)
+            change_pct = _resolve_change_pct(prev_bars.get(symbol.strip().upper()), last)
             rows.append(
                 {
                     "symbol": symbol,
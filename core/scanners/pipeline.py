@@ -2,11 +2,11 @@ from __future__ import annotations
 
 import json
 import urllib.parse
-import urllib.request
 import xml.etree.ElementTree as ET
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional, Tuple
 
+from app.providers.http import http_get
 from core.scanners.connectors.registry import ConnectorSpec, get_default_connector_registry
 
 
@@ -15,16 +15,16 @@ def _now_iso() -> str:
 
 
 def _http_get(url: str, timeout: int = 10) -> str:
-    req = urllib.request.Request(
+    response = http_get(
         url,
         headers={
             "User-Agent": "Apollo67/1.0 scanner-pipeline",
             "Accept": "application/json, application/rss+xml, application/xml, text/xml, */*",
         },
-        method="GET",
+        timeout=timeout,
     )
-    with urllib.request.urlopen(req, timeout=timeout) as response:
-        return response.read().decode("utf-8", errors="ignore")
+    response.raise_for_status()
+    return response.content.decode("utf-8", errors="ignore")
 
 
 def _parse_rss(xml_text: str, limit: int = 20) -> List[Dict[str, Any]]:
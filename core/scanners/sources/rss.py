@@ -1,22 +1,23 @@
 from __future__ import annotations
 
 import urllib.parse
-import urllib.request
 import xml.etree.ElementTree as ET
 from typing import Dict, List
 
+from app.providers.http import http_get
+
 
 def _http_get(url: str, timeout: int = 12) -> str:
-    req = urllib.request.Request(
+    response = http_get(
         url,
         headers={
             "User-Agent": "Apollo67/1.0 (+https://localhost) RSS",
             "Accept": "application/rss+xml, application/xml, text/xml, */*",
         },
-        method="GET",
+        timeout=timeout,
     )
-    with urllib.request.urlopen(req, timeout=timeout) as resp:
-        return resp.read().decode("utf-8", errors="ignore")
+    response.raise_for_status()
+    return response.content.decode("utf-8", errors="ignore")
 
 
 def parse_rss(xml_text: str, limit: int = 25) -> List[Dict[str, str]]:
@@ -6,7 +6,7 @@ from typing import Any, Dict, List
 
 from core.scanners.sources.connectors.google_news_rss import fetch_symbol as fetch_google_news_symbol
 from core.scanners.sources.connectors.reddit_rss import fetch_symbol as fetch_reddit_symbol
-from core.storage.db import get_connection
+from core.storage.db import get_connection, init_db
 
 
 _SOCIAL_SOURCES = ["Reddit"]
@@ -21,52 +21,6 @@ def _ttl_minutes() -> int:
         return 30
 
 
-def _ensure_source_snapshots_table() -> None:
-    with get_connection() as conn:
-        if conn.backend == "postgres":
-            conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS source_snapshots (
-                    id BIGSERIAL PRIMARY KEY,
-                    symbol TEXT NOT NULL,
-                    agent TEXT NOT NULL,
-                    source TEXT NOT NULL,
-                    posts INTEGER NOT NULL,
-                    positive INTEGER NOT NULL,
-                    negative INTEGER NOT NULL,
-                    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
-                )
-                """
-            )
-            conn.execute(
-                """
-                CREATE INDEX IF NOT EXISTS idx_source_snapshots_symbol_agent_created
-                ON source_snapshots(symbol, agent, created_at DESC)
-                """
-            )
-        else:
-            conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS source_snapshots (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    symbol TEXT NOT NULL,
-                    agent TEXT NOT NULL,
-                    source TEXT NOT NULL,
-                    posts INTEGER NOT NULL,
-                    positive INTEGER NOT NULL,
-                    negative INTEGER NOT NULL,
-                    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
-                )
-                """
-            )
-            conn.execute(
-                """
-                CREATE INDEX IF NOT EXISTS idx_source_snapshots_symbol_agent_created
-                ON source_snapshots(symbol, agent, created_at)
-                """
-            )
-
-
 def _parse_created_at(raw: Any) -> datetime:
     text = str(raw or "").strip()
     if not text:
@@ -87,7 +41,7 @@ def _parse_created_at(raw: Any) -> datetime:
 
 
 def _cache_rows(symbol: str, agent: str) -> List[Dict[str, Any]]:
-    _ensure_source_snapshots_table()
+    init_db()
     with get_connection() as conn:
         if conn.backend == "postgres":
             rows = conn.execute(
@@ -145,7 +99,7 @@ def _latest_by_source_within_ttl(symbol: str, agent: str) -> List[Dict[str, Any]
 
 
 def _insert_snapshot(symbol: str, agent: str, source: str, posts: int, positive: int, negative: int) -> None:
-    _ensure_source_snapshots_table()
+    init_db()
     with get_connection() as conn:
         conn.execute(
             """
@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+import bisect
+import logging
+import mmap
+import os
+import re
+import threading
+import time
+from array import array
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# One directory per (instrument, timeframe); one native-endian file per column.
+# ts is int64 epoch seconds (UTC), the OHLCV columns are float64. Files are append-only (apart from
+# the prices of the last row, rewritten while that bar is in progress) and ts is strictly
+# increasing, so a time range is a bisect plus a zero-copy memoryview slice.
+TS_COLUMN = "ts"
+PRICE_COLUMNS = ("open", "high", "low", "close", "volume")
+_COLUMN_TYPECODES = {TS_COLUMN: "q", **{name: "d" for name in PRICE_COLUMNS}}
+_ITEM_SIZE = 8
+_SAFE_NAME = re.compile(r"[^A-Za-z0-9._-]+")
+
+_ARCHIVES: Dict[str, "BarArchive"] = {}
+_ARCHIVES_LOCK = threading.Lock()
+
+
+def _archive_root() -> str:
+    return os.getenv("BAR_ARCHIVE_DIR", "./data/bar_archive").strip() or "./data/bar_archive"
+
+
+def archive_enabled() -> bool:
+    return os.getenv("BAR_ARCHIVE_ENABLED", "true").strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _epoch_seconds(value: Any) -> Optional[int]:
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        text = str(value or "").strip()
+        if not text:
+            return None
+        try:
+            parsed = datetime.fromisoformat(text.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp())
+
+
+def _field(bar: Any, name: str) -> Any:
+    if isinstance(bar, dict):
+        return bar.get(name)
+    return getattr(bar, name, None)
+
+
+# Column attributes (ts, open, ..., volume) are memoryviews over the mapped files, so they are only
+# valid until release(); ``close`` is the close-price column, hence the non-standard method name.
+class BarSlice:
+    def __init__(self, maps: Dict[str, Optional[mmap.mmap]], start: int, stop: int, mtime: Optional[float]) -> None:
+        self._maps = maps
+        self._views: List[memoryview] = []
+        self.updated_at = mtime
+        for name in (TS_COLUMN, *PRICE_COLUMNS):
+            mapped = maps.get(name)
+            if mapped is None:
+                view = memoryview(array(_COLUMN_TYPECODES[name]))
+            else:
+                view = memoryview(mapped).cast(_COLUMN_TYPECODES[name])[start:stop]
+            self._views.append(view)
+            setattr(self, name, view)
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    def release(self) -> None:
+        for view in self._views:
+            view.release()
+        self._views = []
+        for mapped in self._maps.values():
+            if mapped is not None:
+                mapped.close()
+        self._maps = {}
+
+    def __enter__(self) -> "BarSlice":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.release()
+
+    def ts_iso(self, index: int) -> str:
+        return datetime.fromtimestamp(self.ts[index], tz=timezone.utc).isoformat()
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "ts_event": self.ts_iso(i),
+                "open": self.open[i],
+                "high": self.high[i],
+                "low": self.low[i],
+                "close": self.close[i],
+                "volume": self.volume[i],
+            }
+            for i in range(len(self))
+        ]
+
+
+class BarArchive:
+    def __init__(self, root: str) -> None:
+        self.root = Path(root)
+        self._lock = threading.Lock()
+
+    def _series_dir(self, instrument_id: str, timeframe: str) -> Path:
+        return self.root / _SAFE_NAME.sub("_", instrument_id.strip().upper()) / _SAFE_NAME.sub("_", timeframe.strip())
+
+    @staticmethod
+    def _row_count(series_dir: Path) -> int:
+        # A crash mid-append can leave trailing columns short; the shortest column is authoritative.
+        sizes = []
+        for name in (TS_COLUMN, *PRICE_COLUMNS):
+            try:
+                sizes.append((series_dir / name).stat().st_size // _ITEM_SIZE)
+            except FileNotFoundError:
+                return 0
+        return min(sizes)
+
+    def _read_last_ts(self, series_dir: Path, count: int) -> Optional[int]:
+        if count <= 0:
+            return None
+        with open(series_dir / TS_COLUMN, "rb") as handle:
+            handle.seek((count - 1) * _ITEM_SIZE)
+            last = array("q")
+            last.frombytes(handle.read(_ITEM_SIZE))
+        return int(last[0])
+
+    def append(self, instrument_id: str, timeframe: str, bars: Iterable[Any]) -> int:
+        series_dir = self._series_dir(instrument_id, timeframe)
+        with self._lock:
+            series_dir.mkdir(parents=True, exist_ok=True)
+            count = self._row_count(series_dir)
+            for name in (TS_COLUMN, *PRICE_COLUMNS):
+                path = series_dir / name
+                if path.exists() and path.stat().st_size != count * _ITEM_SIZE:
+                    with open(path, "r+b") as handle:
+                        handle.truncate(count * _ITEM_SIZE)
+            last_ts = self._read_last_ts(series_dir, count)
+            stored_last_ts = last_ts
+
+            columns = {name: array(code) for name, code in _COLUMN_TYPECODES.items()}
+            rows = []
+            for bar in bars:
+                ts = _epoch_seconds(_field(bar, "ts_event"))
+                if ts is None:
+                    continue
+                rows.append((ts, bar))
+            rows.sort(key=lambda item: item[0])
+            rewrite: Optional[List[float]] = None
+            for ts, bar in rows:
+                if last_ts is not None and ts <= last_ts and ts != stored_last_ts:
+                    continue
+                try:
+                    values = [float(_field(bar, name) or 0.0) for name in PRICE_COLUMNS]
+                except (TypeError, ValueError):
+                    continue
+                if ts == stored_last_ts:
+                    # The stored last bar may have been in progress; take the newer prices.
+                    rewrite = values
+                    continue
+                columns[TS_COLUMN].append(ts)
+                for name, value in zip(PRICE_COLUMNS, values):
+                    columns[name].append(value)
+                last_ts = ts
+            if rewrite is not None:
+                for name, value in zip(PRICE_COLUMNS, rewrite):
+                    with open(series_dir / name, "r+b") as handle:
+                        handle.seek((count - 1) * _ITEM_SIZE)
+                        handle.write(array("d", [value]).tobytes())
+            appended = len(columns[TS_COLUMN])
+            if not appended:
+                return 0
+            # ts is written last so readers never see a timestamp without its prices.
+            for name in (*PRICE_COLUMNS, TS_COLUMN):
+                with open(series_dir / name, "ab") as handle:
+                    columns[name].tofile(handle)
+        return appended
+
+    def open_slice(
+        self,
+        instrument_id: str,
+        timeframe: str,
+        start: Any = None,
+        end: Any = None,
+        limit: Optional[int] = None,
+    ) -> BarSlice:
+        series_dir = self._series_dir(instrument_id, timeframe)
+        count = self._row_count(series_dir)
+        maps: Dict[str, Optional[mmap.mmap]] = {name: None for name in _COLUMN_TYPECODES}
+        if count <= 0:
+            return BarSlice(maps, 0, 0, None)
+        for name in _COLUMN_TYPECODES:
+            with open(series_dir / name, "rb") as handle:
+                maps[name] = mmap.mmap(handle.fileno(), count * _ITEM_SIZE, access=mmap.ACCESS_READ)
+
+        ts_view = memoryview(maps[TS_COLUMN]).cast("q")
+        try:
+            start_ts = _epoch_seconds(start) if start is not None else None
+            end_ts = _epoch_seconds(end) if end is not None else None
+            lo = bisect.bisect_left(ts_view, start_ts) if start_ts is not None else 0
+            hi = bisect.bisect_right(ts_view, end_ts) if end_ts is not None else count
+        finally:
+            ts_view.release()
+        if limit is not None and limit > 0:
+            lo = max(lo, hi - int(limit))
+        mtime = (series_dir / TS_COLUMN).stat().st_mtime
+        return BarSlice(maps, lo, hi, mtime)
+
+    def tail_dicts(
+        self,
+        instrument_id: str,
+        timeframe: str,
+        limit: int,
+        max_age_seconds: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        with self.open_slice(instrument_id, timeframe, limit=limit) as bars:
+            if not len(bars):
+                return []
+            if max_age_seconds is not None and bars.updated_at is not None:
+                if time.time() - bars.updated_at > max(1, int(max_age_seconds)):
+                    return []
+            return bars.to_dicts()
+
+
+def get_bar_archive(root: Optional[str] = None) -> BarArchive:
+    resolved = os.path.abspath(root or _archive_root())
+    with _ARCHIVES_LOCK:
+        archive = _ARCHIVES.get(resolved)
+        if archive is None:
+            archive = BarArchive(resolved)
+            _ARCHIVES[resolved] = archive
+        return archive
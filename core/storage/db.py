@@ -1,9 +1,18 @@
+import itertools
+import logging
 import os
 import sqlite3
+import threading
+import time
 from contextlib import contextmanager
-from typing import Any, Generator, Iterable, List, Optional, Sequence, Tuple
+from dataclasses import dataclass
+from typing import Any, Dict, Generator, Iterable, List, Optional, Sequence, Tuple
 from urllib.parse import urlparse
 
+from core.storage.query_stats import QUERY_STATS
+
+logger = logging.getLogger(__name__)
+
 DEFAULT_DATABASE_URL = "sqlite:///./apollo67.db"
 
 DB_DRIVER_MARKER = "psycopg3"
@@ -648,25 +657,115 @@ class QueryResult:
         self,
         rows: Optional[List[dict]] = None,
         lastrowid: Optional[int] = None,
+        rowcount: int = -1,
     ) -> None:
         self._rows = rows or []
         self.lastrowid = lastrowid
+        self.rowcount = rowcount
 
     def fetchall(self) -> List[dict]:
         return self._rows
 
 
+_SERVER_CURSOR_IDS = itertools.count(1)
+
+
+class RowIterator:
+    """Lazily fetches rows from an open cursor in ``batch_size`` chunks.
+
+    Yields dicts by default, or plain tuples when ``as_tuples`` is set.
+    Closing the iterator (or leaving ``get_connection``) releases the cursor.
+    """
+
+    def __init__(self, cursor: Any, batch_size: int, as_tuples: bool) -> None:
+        self._cursor = cursor
+        self._batch_size = max(1, int(batch_size))
+        self._as_tuples = as_tuples
+        self._columns = [desc[0] for desc in cursor.description] if cursor.description else []
+        self._batch: List[Any] = []
+        self._pos = 0
+        self._closed = not self._columns
+        if self._closed:
+            self._close_cursor()
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self._columns)
+
+    def __iter__(self) -> "RowIterator":
+        return self
+
+    def __next__(self) -> Any:
+        if self._pos >= len(self._batch):
+            if self._closed:
+                raise StopIteration
+            self._batch = self._cursor.fetchmany(self._batch_size)
+            self._pos = 0
+            if not self._batch:
+                self.close()
+                raise StopIteration
+        row = self._batch[self._pos]
+        self._pos += 1
+        if self._as_tuples:
+            return tuple(row)
+        return dict(zip(self._columns, row))
+
+    def __enter__(self) -> "RowIterator":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._batch = []
+        self._close_cursor()
+
+    def _close_cursor(self) -> None:
+        try:
+            self._cursor.close()
+        except Exception:
+            pass
+
+
 class DBConnection:
     def __init__(self, backend: str, raw_connection: Any) -> None:
         self.backend = backend
         self.raw_connection = raw_connection
+        self._open_iterators: List[RowIterator] = []
 
     def execute(self, sql: str, params: Optional[Sequence[Any]] = None) -> QueryResult:
         params = tuple(params or ())
+        if not QUERY_STATS.enabled:
+            return self._execute(sql, params)
+        started = time.perf_counter()
+        result = self._execute(sql, params)
+        QUERY_STATS.record(
+            sql,
+            (time.perf_counter() - started) * 1000.0,
+            len(result.fetchall()),
+            explain=lambda: self.explain(sql, params),
+        )
+        return result
+
+    def explain(self, sql: str, params: Optional[Sequence[Any]] = None) -> List[str]:
+        params = tuple(params or ())
+        if self.backend == "sqlite":
+            rows = self.raw_connection.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+            return [str(row[-1]) for row in rows]
+        # Nested transaction = savepoint, so a failing EXPLAIN cannot abort the caller's transaction.
+        with self.raw_connection.transaction():
+            with self.raw_connection.cursor() as cursor:
+                cursor.execute(f"EXPLAIN {_convert_placeholders(sql)}", params)
+                return [str(row[0]) for row in cursor.fetchall()]
+
+    def _execute(self, sql: str, params: Tuple[Any, ...]) -> QueryResult:
         if self.backend == "sqlite":
             cursor = self.raw_connection.execute(sql, params)
             rows = [dict(row) for row in cursor.fetchall()] if cursor.description else []
-            return QueryResult(rows=rows, lastrowid=cursor.lastrowid)
+            return QueryResult(rows=rows, lastrowid=cursor.lastrowid, rowcount=cursor.rowcount)
 
         pg_sql = _convert_placeholders(sql)
         stripped = pg_sql.lstrip().upper()
@@ -690,7 +789,112 @@ class DBConnection:
                 elif rows and len(rows[0]) == 1:
                     lastrowid = int(next(iter(rows[0].values())))
 
-            return QueryResult(rows=rows, lastrowid=lastrowid)
+            return QueryResult(rows=rows, lastrowid=lastrowid, rowcount=cursor.rowcount)
+
+    def iter_rows(
+        self,
+        sql: str,
+        params: Optional[Sequence[Any]] = None,
+        *,
+        batch_size: int = 200,
+        as_tuples: bool = False,
+    ) -> RowIterator:
+        params = tuple(params or ())
+        if self.backend == "sqlite":
+            cursor = self.raw_connection.cursor()
+            # Plain tuples skip sqlite3.Row construction entirely.
+            cursor.row_factory = None
+            cursor.execute(sql, params)
+        else:
+            cursor = self.raw_connection.cursor(name=f"apollo_iter_{next(_SERVER_CURSOR_IDS)}")
+            cursor.itersize = max(1, int(batch_size))
+            cursor.execute(_convert_placeholders(sql), params)
+        iterator = RowIterator(cursor, batch_size=batch_size, as_tuples=as_tuples)
+        self._open_iterators.append(iterator)
+        return iterator
+
+    def close_iterators(self) -> None:
+        iterators, self._open_iterators = self._open_iterators, []
+        for iterator in iterators:
+            iterator.close()
+
+    def executemany(self, sql: str, seq_of_params: Iterable[Sequence[Any]]) -> int:
+        rows = [tuple(params) for params in seq_of_params]
+        if not rows:
+            return 0
+        if not QUERY_STATS.enabled:
+            return self._executemany(sql, rows)
+        started = time.perf_counter()
+        count = self._executemany(sql, rows)
+        QUERY_STATS.record(sql, (time.perf_counter() - started) * 1000.0, count)
+        return count
+
+    def _executemany(self, sql: str, rows: List[Tuple[Any, ...]]) -> int:
+        if self.backend == "sqlite":
+            self.raw_connection.executemany(sql, rows)
+            return len(rows)
+
+        pg_sql = _convert_placeholders(sql)
+        parts = _split_values_clause(pg_sql)
+        with self.raw_connection.cursor() as cursor:
+            if parts is None:
+                cursor.executemany(pg_sql, rows)
+                return len(rows)
+            head, row_template, tail = parts
+            width = max(1, len(rows[0]))
+            chunk_size = max(1, min(_PG_MULTIROW_MAX_ROWS, _PG_MAX_BIND_PARAMS // width))
+            for start in range(0, len(rows), chunk_size):
+                chunk = rows[start:start + chunk_size]
+                statement = f"{head}{', '.join([row_template] * len(chunk))}{tail}"
+                cursor.execute(statement, [value for row in chunk for value in row])
+        return len(rows)
+
+    def upsert_many(
+        self,
+        table: str,
+        columns: Sequence[str],
+        rows: Iterable[Sequence[Any]],
+        conflict_columns: Sequence[str],
+        update_columns: Optional[Sequence[str]] = None,
+    ) -> int:
+        sql = _build_upsert_sql(table, columns, conflict_columns, update_columns)
+        return self.executemany(sql, _dedupe_by_key(columns, rows, conflict_columns))
+
+    def bulk_upsert(
+        self,
+        table: str,
+        columns: Sequence[str],
+        rows: Iterable[Sequence[Any]],
+        conflict_columns: Sequence[str],
+        update_columns: Optional[Sequence[str]] = None,
+    ) -> int:
+        # Postgres: COPY into a temp staging table, then one INSERT ... SELECT ... ON CONFLICT merge.
+        # SQLite has no COPY; executemany inside the caller's single transaction is its fast path.
+        deduped = _dedupe_by_key(columns, rows, conflict_columns)
+        if not deduped:
+            return 0
+        if self.backend == "sqlite":
+            return self.executemany(_build_upsert_sql(table, columns, conflict_columns, update_columns), deduped)
+
+        started = time.perf_counter()
+        stage = f"apollo_stage_{next(_SERVER_CURSOR_IDS)}"
+        column_list = ", ".join(columns)
+        with self.raw_connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TEMP TABLE {stage} AS SELECT {column_list} FROM {table} WITH NO DATA"
+            )
+            with cursor.copy(f"COPY {stage} ({column_list}) FROM STDIN") as copy:
+                for row in deduped:
+                    copy.write_row(row)
+            merge_sql = (
+                f"INSERT INTO {table} ({column_list}) SELECT {column_list} FROM {stage} "
+                f"{_build_conflict_clause(columns, conflict_columns, update_columns)}"
+            )
+            cursor.execute(merge_sql)
+            cursor.execute(f"DROP TABLE {stage}")
+        if QUERY_STATS.enabled:
+            QUERY_STATS.record(merge_sql, (time.perf_counter() - started) * 1000.0, len(deduped))
+        return len(deduped)
 
     def executescript(self, sql_script: str) -> None:
         if self.backend == "sqlite":
@@ -702,12 +906,15 @@ class DBConnection:
                 cursor.execute(statement)
 
     def commit(self) -> None:
+        self.close_iterators()
         self.raw_connection.commit()
 
     def rollback(self) -> None:
+        self.close_iterators()
         self.raw_connection.rollback()
 
     def close(self) -> None:
+        self.close_iterators()
         self.raw_connection.close()
 
 
@@ -761,6 +968,72 @@ def _convert_placeholders(sql: str) -> str:
     return sql.replace("?", "%s")
 
 
+_PG_MAX_BIND_PARAMS = 65535
+_PG_MULTIROW_MAX_ROWS = 1000
+
+
+def _split_values_clause(sql: str) -> Optional[Tuple[str, str, str]]:
+    """Split ``INSERT ... VALUES (...) <tail>`` into head, row template and tail."""
+    upper = sql.upper()
+    idx = upper.find(" VALUES")
+    if idx < 0 or not upper.lstrip().startswith("INSERT"):
+        return None
+    open_idx = sql.find("(", idx)
+    if open_idx < 0 or sql[idx + len(" VALUES"):open_idx].strip():
+        return None
+    depth = 0
+    for pos in range(open_idx, len(sql)):
+        char = sql[pos]
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+            if depth == 0:
+                return sql[:open_idx], sql[open_idx:pos + 1], sql[pos + 1:]
+    return None
+
+
+def _build_upsert_sql(
+    table: str,
+    columns: Sequence[str],
+    conflict_columns: Sequence[str],
+    update_columns: Optional[Sequence[str]] = None,
+) -> str:
+    placeholders = ", ".join(["?"] * len(columns))
+    return (
+        f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders}) "
+        f"{_build_conflict_clause(columns, conflict_columns, update_columns)}"
+    )
+
+
+def _build_conflict_clause(
+    columns: Sequence[str],
+    conflict_columns: Sequence[str],
+    update_columns: Optional[Sequence[str]] = None,
+) -> str:
+    if update_columns is None:
+        update_columns = [col for col in columns if col not in conflict_columns]
+    clause = f"ON CONFLICT ({', '.join(conflict_columns)}) "
+    if not update_columns:
+        return clause + "DO NOTHING"
+    assignments = ", ".join(f"{col} = EXCLUDED.{col}" for col in update_columns)
+    return clause + f"DO UPDATE SET {assignments}"
+
+
+def _dedupe_by_key(
+    columns: Sequence[str],
+    rows: Iterable[Sequence[Any]],
+    conflict_columns: Sequence[str],
+) -> List[Tuple[Any, ...]]:
+    # Postgres rejects a multi-row upsert that touches the same key twice, so keep the last row per key.
+    key_positions = [list(columns).index(col) for col in conflict_columns]
+    deduped: Dict[Tuple[Any, ...], Tuple[Any, ...]] = {}
+    for row in rows:
+        row_t = tuple(row)
+        deduped[tuple(row_t[pos] for pos in key_positions)] = row_t
+    return list(deduped.values())
+
+
 def _split_sql_statements(sql_script: str) -> Iterable[str]:
     for part in sql_script.split(";"):
         statement = part.strip()
@@ -795,136 +1068,779 @@ def _connect(database_url: str) -> DBConnection:
     return DBConnection(backend="postgres", raw_connection=conn)
 
 
+def _pool_int_setting(name: str, default: int) -> int:
+    raw = os.getenv(name)
+    if raw is None or not raw.strip():
+        return default
+    try:
+        return int(raw.strip())
+    except ValueError:
+        return default
+
+
+def _pool_enabled() -> bool:
+    raw = os.getenv("DB_POOL_ENABLED")
+    if raw is None:
+        return True
+    return raw.strip().lower() in {"1", "true", "yes", "on"}
+
+
+class _ConnectionPool:
+    """Bounded pool of DBConnections for one DATABASE_URL.
+
+    Used for SQLite, and for Postgres when psycopg_pool is not installed.
+    Connections idle longer than ``idle_timeout`` are closed; connections idle
+    longer than ``check_interval`` are pinged before being handed out.
+    """
+
+    def __init__(
+        self,
+        database_url: str,
+        *,
+        max_size: int,
+        idle_timeout: int,
+        check_interval: int,
+        acquire_timeout: int,
+    ) -> None:
+        self.database_url = database_url
+        self.backend = _parse_backend(database_url)
+        self.max_size = max(1, max_size)
+        self.idle_timeout = max(1, idle_timeout)
+        self.check_interval = max(0, check_interval)
+        self.acquire_timeout = max(1, acquire_timeout)
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.max_size)
+        self._idle: List[Tuple[float, DBConnection]] = []
+        self._in_use = 0
+        self._counters: Dict[str, int] = {
+            "connections_created": 0,
+            "connections_reused": 0,
+            "connections_discarded": 0,
+            "health_check_failures": 0,
+            "acquire_timeouts": 0,
+        }
+
+    def acquire(self) -> DBConnection:
+        if not self._slots.acquire(timeout=self.acquire_timeout):
+            with self._lock:
+                self._counters["acquire_timeouts"] += 1
+            raise RuntimeError(
+                f"Timed out after {self.acquire_timeout}s waiting for a {self.backend} connection "
+                f"(DB_POOL_MAX_SIZE={self.max_size})."
+            )
+        try:
+            conn = self._checkout_idle()
+            if conn is None:
+                conn = _connect(self.database_url)
+                with self._lock:
+                    self._counters["connections_created"] += 1
+            with self._lock:
+                self._in_use += 1
+            return conn
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, conn: DBConnection, *, discard: bool = False) -> None:
+        try:
+            if not discard:
+                discard = not _reset_connection(conn)
+            if discard:
+                self._discard(conn)
+            else:
+                with self._lock:
+                    self._idle.append((time.monotonic(), conn))
+        finally:
+            with self._lock:
+                self._in_use = max(0, self._in_use - 1)
+            self._slots.release()
+
+    def close(self) -> None:
+        with self._lock:
+            idle = [conn for _, conn in self._idle]
+            self._idle = []
+        for conn in idle:
+            self._discard(conn)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "backend": self.backend,
+                "implementation": "builtin",
+                "max_size": self.max_size,
+                "idle_timeout_seconds": self.idle_timeout,
+                "check_interval_seconds": self.check_interval,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                **self._counters,
+            }
+
+    def _checkout_idle(self) -> Optional[DBConnection]:
+        while True:
+            with self._lock:
+                if not self._idle:
+                    return None
+                # LIFO keeps the warmest connections in use and lets the rest age out.
+                idle_since, conn = self._idle.pop()
+            idle_for = time.monotonic() - idle_since
+            if idle_for > self.idle_timeout:
+                self._discard(conn)
+                continue
+            if idle_for > self.check_interval and not _ping_connection(conn):
+                with self._lock:
+                    self._counters["health_check_failures"] += 1
+                self._discard(conn)
+                continue
+            with self._lock:
+                self._counters["connections_reused"] += 1
+            return conn
+
+    def _discard(self, conn: DBConnection) -> None:
+        with self._lock:
+            self._counters["connections_discarded"] += 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+class _PsycopgPool:
+    """Adapter exposing psycopg_pool.ConnectionPool through the _ConnectionPool interface."""
+
+    def __init__(
+        self,
+        database_url: str,
+        *,
+        max_size: int,
+        idle_timeout: int,
+        acquire_timeout: int,
+    ) -> None:
+        from psycopg_pool import ConnectionPool  # type: ignore
+
+        self.backend = "postgres"
+        self.max_size = max(1, max_size)
+        self.idle_timeout = max(1, idle_timeout)
+        self.acquire_timeout = max(1, acquire_timeout)
+        self._pool = ConnectionPool(
+            database_url,
+            min_size=1,
+            max_size=self.max_size,
+            max_idle=float(self.idle_timeout),
+            timeout=float(self.acquire_timeout),
+            check=ConnectionPool.check_connection,
+            open=True,
+        )
+
+    def acquire(self) -> DBConnection:
+        try:
+            raw = self._pool.getconn()
+        except Exception as exc:
+            raise RuntimeError(f"Could not acquire a postgres connection from the pool: {exc}") from exc
+        return DBConnection(backend="postgres", raw_connection=raw)
+
+    def release(self, conn: DBConnection, *, discard: bool = False) -> None:
+        if discard:
+            try:
+                conn.raw_connection.close()
+            except Exception:
+                pass
+        # putconn() rolls back any open transaction and drops closed connections.
+        self._pool.putconn(conn.raw_connection)
+
+    def close(self) -> None:
+        self._pool.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.backend,
+            "implementation": "psycopg_pool",
+            "max_size": self.max_size,
+            "idle_timeout_seconds": self.idle_timeout,
+            **self._pool.get_stats(),
+        }
+
+
+def _ping_connection(conn: DBConnection) -> bool:
+    try:
+        if conn.backend == "sqlite":
+            conn.raw_connection.execute("SELECT 1;").fetchone()
+        else:
+            with conn.raw_connection.cursor() as cursor:
+                cursor.execute("SELECT 1;")
+            conn.raw_connection.rollback()
+        return True
+    except Exception:
+        return False
+
+
+def _reset_connection(conn: DBConnection) -> bool:
+    try:
+        if conn.backend == "sqlite":
+            if conn.raw_connection.in_transaction:
+                conn.raw_connection.rollback()
+        else:
+            if getattr(conn.raw_connection, "closed", False):
+                return False
+            conn.raw_connection.rollback()
+        return True
+    except Exception:
+        return False
+
+
+_POOLS: Dict[str, Any] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def _build_pool(database_url: str) -> Any:
+    max_size = _pool_int_setting("DB_POOL_MAX_SIZE", 10)
+    idle_timeout = _pool_int_setting("DB_POOL_IDLE_TIMEOUT_SECONDS", 300)
+    check_interval = _pool_int_setting("DB_POOL_CHECK_INTERVAL_SECONDS", 30)
+    acquire_timeout = _pool_int_setting("DB_POOL_TIMEOUT_SECONDS", 30)
+
+    if _parse_backend(database_url) == "postgres":
+        try:
+            return _PsycopgPool(
+                database_url,
+                max_size=max_size,
+                idle_timeout=idle_timeout,
+                acquire_timeout=acquire_timeout,
+            )
+        except ModuleNotFoundError:
+            logger.warning("psycopg_pool is not installed; using the builtin connection pool for Postgres")
+
+    return _ConnectionPool(
+        database_url,
+        max_size=max_size,
+        idle_timeout=idle_timeout,
+        check_interval=check_interval,
+        acquire_timeout=acquire_timeout,
+    )
+
+
+def _get_pool(database_url: str) -> Any:
+    pool = _POOLS.get(database_url)
+    if pool is not None:
+        return pool
+    with _POOLS_LOCK:
+        pool = _POOLS.get(database_url)
+        if pool is None:
+            pool = _build_pool(database_url)
+            _POOLS[database_url] = pool
+        return pool
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    with _POOLS_LOCK:
+        pools = list(_POOLS.items())
+    return {
+        "enabled": _pool_enabled(),
+        "pools": [{"database": _redact_database_url(url), **pool.stats()} for url, pool in pools],
+    }
+
+
+def close_pools() -> None:
+    with _POOLS_LOCK:
+        pools = list(_POOLS.values())
+        _POOLS.clear()
+    for pool in pools:
+        try:
+            pool.close()
+        except Exception as exc:
+            logger.warning("db pool close failed: %s", exc)
+
+
+def _redact_database_url(database_url: str) -> str:
+    parsed = urlparse(database_url)
+    if parsed.scheme == "sqlite" or not parsed.password:
+        return database_url
+    return database_url.replace(f":{parsed.password}@", ":***@", 1)
+
+
 @contextmanager
 def get_connection() -> Generator[DBConnection, None, None]:
     database_url = _resolve_database_url()
-    conn = _connect(database_url)
+    if not _pool_enabled():
+        conn = _connect(database_url)
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+        return
+
+    pool = _get_pool(database_url)
+    conn = pool.acquire()
+    broken = False
     try:
         yield conn
         conn.commit()
     except Exception:
-        conn.rollback()
+        try:
+            conn.rollback()
+        except Exception:
+            broken = True
         raise
     finally:
-        conn.close()
+        pool.release(conn, discard=broken)
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: str
+    sqlite_sql: str
+    postgres_sql: str
+
+    def sql_for(self, backend: str) -> str:
+        return self.postgres_sql if backend == "postgres" else self.sqlite_sql
+
+
+# v1..v9 were shipped as one idempotent schema script; any missing baseline
+# version re-applies that script once and records all nine markers.
+_BASELINE_VERSIONS = (
+    "v1_initial",
+    "v2_ingestion_zones",
+    "v3_admin_sentiment_tactics",
+    "v4_monitor_positions",
+    "v5_scanner_sources_overlay",
+    "v6_strategies_monitor_dashboard",
+    "v7_source_snapshots_rss",
+    "v8_scanner_connectors_registry",
+    "v9_paper_trading_v1",
+)
+
+_V10_LATEST_QUOTES_SQLITE = """
+CREATE TABLE IF NOT EXISTS latest_quotes (
+    symbol TEXT PRIMARY KEY,
+    provider TEXT NOT NULL,
+    last REAL,
+    payload TEXT NOT NULL,
+    updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_latest_quotes_updated_at ON latest_quotes(updated_at);
+
+INSERT OR IGNORE INTO latest_quotes (symbol, provider, last, payload, updated_at)
+SELECT
+    UPPER(json_extract(payload, '$.symbol')),
+    COALESCE(json_extract(payload, '$.provider'), source, 'cache'),
+    json_extract(payload, '$.quote.last'),
+    json_extract(payload, '$.quote'),
+    created_at
+FROM events
+WHERE event_type = 'worker.quote'
+  AND json_valid(payload)
+  AND json_extract(payload, '$.symbol') IS NOT NULL
+  AND json_type(payload, '$.quote') = 'object'
+ORDER BY id DESC;
+"""
+
+_V10_LATEST_QUOTES_POSTGRES = """
+CREATE TABLE IF NOT EXISTS latest_quotes (
+    symbol TEXT PRIMARY KEY,
+    provider TEXT NOT NULL,
+    last DOUBLE PRECISION,
+    payload JSONB NOT NULL,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_latest_quotes_updated_at ON latest_quotes(updated_at);
+
+INSERT INTO latest_quotes (symbol, provider, last, payload, updated_at)
+SELECT DISTINCT ON (UPPER(payload->>'symbol'))
+    UPPER(payload->>'symbol'),
+    COALESCE(payload->>'provider', source, 'cache'),
+    (payload->'quote'->>'last')::DOUBLE PRECISION,
+    payload->'quote',
+    created_at
+FROM events
+WHERE event_type = 'worker.quote'
+  AND payload->>'symbol' IS NOT NULL
+  AND jsonb_typeof(payload->'quote') = 'object'
+ORDER BY UPPER(payload->>'symbol'), id DESC
+ON CONFLICT (symbol) DO NOTHING;
+"""
+
+# Bars used to be stored once per provider ("TWELVEDATA:AAPL", "YAHOO:AAPL", ...). v11 maps every
+# provider ID onto one canonical "A67.<SYMBOL>" instrument, keeps the most recently ingested bar per
+# (instrument, timeframe, ts_event), and rewrites the survivors to the canonical ID so lookups are
+# plain equality seeks on the (instrument_id, timeframe, ts_event) unique index.
+_V11_INSTRUMENT_MASTER_SQLITE = """
+CREATE TABLE IF NOT EXISTS canonical_instrument_aliases (
+    provider_instrument_id TEXT PRIMARY KEY,
+    instrument_id TEXT NOT NULL,
+    source_provider TEXT NOT NULL,
+    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_canonical_instrument_aliases_instrument
+    ON canonical_instrument_aliases(instrument_id);
+
+INSERT OR IGNORE INTO canonical_instrument_aliases (provider_instrument_id, instrument_id, source_provider)
+SELECT
+    instrument_id,
+    'A67.' || UPPER(TRIM(SUBSTR(instrument_id, INSTR(instrument_id, ':') + 1))),
+    MIN(source_provider)
+FROM canonical_price_bars
+WHERE INSTR(instrument_id, ':') > 0
+GROUP BY instrument_id;
+
+INSERT OR IGNORE INTO canonical_instruments (
+    instrument_id, symbol, venue, asset_type, currency, is_tradable, effective_from, source_provider
+)
+SELECT
+    instrument_id,
+    SUBSTR(instrument_id, 5),
+    'UNKNOWN',
+    'equity',
+    'USD',
+    1,
+    MIN(created_at),
+    MIN(source_provider)
+FROM canonical_instrument_aliases
+GROUP BY instrument_id;
+
+DELETE FROM canonical_price_bars
+WHERE id IN (
+    SELECT id FROM (
+        SELECT
+            b.id,
+            ROW_NUMBER() OVER (
+                PARTITION BY COALESCE(a.instrument_id, b.instrument_id), b.timeframe, b.ts_event
+                ORDER BY b.ts_ingest DESC, b.id DESC
+            ) AS rn
+        FROM canonical_price_bars b
+        LEFT JOIN canonical_instrument_aliases a ON a.provider_instrument_id = b.instrument_id
+    )
+    WHERE rn > 1
+);
+
+UPDATE canonical_price_bars
+SET instrument_id = (
+    SELECT a.instrument_id
+    FROM canonical_instrument_aliases a
+    WHERE a.provider_instrument_id = canonical_price_bars.instrument_id
+)
+WHERE instrument_id IN (SELECT provider_instrument_id FROM canonical_instrument_aliases);
+"""
+
+_V11_INSTRUMENT_MASTER_POSTGRES = """
+CREATE TABLE IF NOT EXISTS canonical_instrument_aliases (
+    provider_instrument_id TEXT PRIMARY KEY,
+    instrument_id TEXT NOT NULL,
+    source_provider TEXT NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_canonical_instrument_aliases_instrument
+    ON canonical_instrument_aliases(instrument_id);
+
+INSERT INTO canonical_instrument_aliases (provider_instrument_id, instrument_id, source_provider)
+SELECT
+    instrument_id,
+    'A67.' || UPPER(TRIM(SUBSTR(instrument_id, STRPOS(instrument_id, ':') + 1))),
+    MIN(source_provider)
+FROM canonical_price_bars
+WHERE STRPOS(instrument_id, ':') > 0
+GROUP BY instrument_id
+ON CONFLICT (provider_instrument_id) DO NOTHING;
+
+INSERT INTO canonical_instruments (
+    instrument_id, symbol, venue, asset_type, currency, is_tradable, effective_from, source_provider
+)
+SELECT
+    instrument_id,
+    SUBSTR(instrument_id, 5),
+    'UNKNOWN',
+    'equity',
+    'USD',
+    TRUE,
+    MIN(created_at),
+    MIN(source_provider)
+FROM canonical_instrument_aliases
+GROUP BY instrument_id
+ON CONFLICT (instrument_id) DO NOTHING;
+
+DELETE FROM canonical_price_bars
+WHERE id IN (
+    SELECT id FROM (
+        SELECT
+            b.id,
+            ROW_NUMBER() OVER (
+                PARTITION BY COALESCE(a.instrument_id, b.instrument_id), b.timeframe, b.ts_event
+                ORDER BY b.ts_ingest DESC, b.id DESC
+            ) AS rn
+        FROM canonical_price_bars b
+        LEFT JOIN canonical_instrument_aliases a ON a.provider_instrument_id = b.instrument_id
+    ) ranked
+    WHERE rn > 1
+);
+
+UPDATE canonical_price_bars b
+SET instrument_id = a.instrument_id
+FROM canonical_instrument_aliases a
+WHERE a.provider_instrument_id = b.instrument_id;
+"""
+
+# Hot payload fields promoted to typed columns. Writers fill them explicitly (see the repositories);
+# the UPDATEs below backfill existing rows once. ADD COLUMN is plain (not generated) on both backends
+# so the same INSERT statements work everywhere and malformed legacy payloads cannot break writes.
+_V12_PROMOTED_COLUMNS_SQLITE = """
+ALTER TABLE events ADD COLUMN symbol TEXT;
+ALTER TABLE scanner_source_breakdowns ADD COLUMN action TEXT;
+ALTER TABLE scanner_source_breakdowns ADD COLUMN score REAL;
+ALTER TABLE paper_orders ADD COLUMN tactic_id TEXT;
+ALTER TABLE paper_orders ADD COLUMN scanner_score REAL;
+
+UPDATE events
+SET symbol = UPPER(json_extract(payload, '$.symbol'))
+WHERE json_valid(payload) AND json_type(payload, '$.symbol') = 'text';
+
+UPDATE scanner_source_breakdowns
+SET
+    action = UPPER(json_extract(payload, '$.scanner_row.action')),
+    score = COALESCE(
+        CAST(json_extract(payload, '$.scanner_row.score') AS REAL),
+        CAST(json_extract(payload, '$.totals.avg_score') AS REAL)
+    )
+WHERE json_valid(payload);
+
+UPDATE paper_orders
+SET
+    tactic_id = COALESCE(json_extract(meta, '$.tactic_id'), json_extract(meta, '$.strategy_key')),
+    scanner_score = CAST(json_extract(meta, '$.scanner_score') AS REAL)
+WHERE meta IS NOT NULL AND json_valid(meta);
+
+CREATE INDEX IF NOT EXISTS idx_events_type_symbol_id ON events(event_type, symbol, id);
+CREATE INDEX IF NOT EXISTS idx_scanner_source_breakdowns_type_symbol_id
+    ON scanner_source_breakdowns(scanner_type, symbol, id);
+CREATE INDEX IF NOT EXISTS idx_scanner_source_breakdowns_type_action_score
+    ON scanner_source_breakdowns(scanner_type, action, score);
+CREATE INDEX IF NOT EXISTS idx_paper_orders_tactic_status ON paper_orders(tactic_id, status);
+"""
+
+_V12_PROMOTED_COLUMNS_POSTGRES = """
+ALTER TABLE events ADD COLUMN IF NOT EXISTS symbol TEXT;
+ALTER TABLE scanner_source_breakdowns ADD COLUMN IF NOT EXISTS action TEXT;
+ALTER TABLE scanner_source_breakdowns ADD COLUMN IF NOT EXISTS score DOUBLE PRECISION;
+ALTER TABLE paper_orders ADD COLUMN IF NOT EXISTS tactic_id TEXT;
+ALTER TABLE paper_orders ADD COLUMN IF NOT EXISTS scanner_score DOUBLE PRECISION;
+
+UPDATE events
+SET symbol = UPPER(payload->>'symbol')
+WHERE jsonb_typeof(payload->'symbol') = 'string';
+
+UPDATE scanner_source_breakdowns
+SET
+    action = UPPER(payload->'scanner_row'->>'action'),
+    score = COALESCE(
+        CASE WHEN jsonb_typeof(payload->'scanner_row'->'score') = 'number'
+            THEN (payload->'scanner_row'->>'score')::DOUBLE PRECISION END,
+        CASE WHEN jsonb_typeof(payload->'totals'->'avg_score') = 'number'
+            THEN (payload->'totals'->>'avg_score')::DOUBLE PRECISION END
+    );
+
+UPDATE paper_orders
+SET
+    tactic_id = COALESCE(meta->>'tactic_id', meta->>'strategy_key'),
+    scanner_score = CASE WHEN jsonb_typeof(meta->'scanner_score') = 'number'
+        THEN (meta->>'scanner_score')::DOUBLE PRECISION END
+WHERE meta IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_events_type_symbol_id ON events(event_type, symbol, id);
+CREATE INDEX IF NOT EXISTS idx_scanner_source_breakdowns_type_symbol_id
+    ON scanner_source_breakdowns(scanner_type, symbol, id);
+CREATE INDEX IF NOT EXISTS idx_scanner_source_breakdowns_type_action_score
+    ON scanner_source_breakdowns(scanner_type, action, score);
+CREATE INDEX IF NOT EXISTS idx_paper_orders_tactic_status ON paper_orders(tactic_id, status);
+"""
+
+# Daily rollups written by core.storage.maintenance before intraday rows age out, plus
+# timestamp indexes so retention deletes range-scan instead of walking whole tables.
+_V13_RETENTION_ROLLUPS_SQLITE = """
+CREATE TABLE IF NOT EXISTS signal_daily_rollups (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    symbol TEXT NOT NULL,
+    timeframe TEXT NOT NULL DEFAULT '',
+    day TEXT NOT NULL,
+    samples INTEGER NOT NULL,
+    score_sum REAL NOT NULL,
+    score_min REAL,
+    score_max REAL,
+    UNIQUE(symbol, timeframe, day)
+);
+
+CREATE TABLE IF NOT EXISTS quote_daily_rollups (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    symbol TEXT NOT NULL,
+    day TEXT NOT NULL,
+    samples INTEGER NOT NULL,
+    open REAL,
+    high REAL,
+    low REAL,
+    close REAL,
+    UNIQUE(symbol, day)
+);
+
+CREATE INDEX IF NOT EXISTS idx_raw_payloads_received_at ON raw_payloads(received_at);
+CREATE INDEX IF NOT EXISTS idx_source_snapshots_created_at ON source_snapshots(created_at);
+CREATE INDEX IF NOT EXISTS idx_scanner_source_breakdowns_created_at ON scanner_source_breakdowns(created_at);
+CREATE INDEX IF NOT EXISTS idx_sentiment_audit_log_created_at ON sentiment_audit_log(created_at);
+"""
+
+_V13_RETENTION_ROLLUPS_POSTGRES = """
+CREATE TABLE IF NOT EXISTS signal_daily_rollups (
+    id BIGSERIAL PRIMARY KEY,
+    symbol TEXT NOT NULL,
+    timeframe TEXT NOT NULL DEFAULT '',
+    day DATE NOT NULL,
+    samples BIGINT NOT NULL,
+    score_sum DOUBLE PRECISION NOT NULL,
+    score_min DOUBLE PRECISION,
+    score_max DOUBLE PRECISION,
+    UNIQUE(symbol, timeframe, day)
+);
+
+CREATE TABLE IF NOT EXISTS quote_daily_rollups (
+    id BIGSERIAL PRIMARY KEY,
+    symbol TEXT NOT NULL,
+    day DATE NOT NULL,
+    samples BIGINT NOT NULL,
+    open DOUBLE PRECISION,
+    high DOUBLE PRECISION,
+    low DOUBLE PRECISION,
+    close DOUBLE PRECISION,
+    UNIQUE(symbol, day)
+);
+
+CREATE INDEX IF NOT EXISTS idx_raw_payloads_received_at ON raw_payloads(received_at);
+CREATE INDEX IF NOT EXISTS idx_source_snapshots_created_at ON source_snapshots(created_at);
+CREATE INDEX IF NOT EXISTS idx_scanner_source_breakdowns_created_at ON scanner_source_breakdowns(created_at);
+CREATE INDEX IF NOT EXISTS idx_sentiment_audit_log_created_at ON sentiment_audit_log(created_at);
+"""
+
+_V14_PROVIDER_RATE_BUCKETS_SQLITE = """
+CREATE TABLE IF NOT EXISTS provider_rate_buckets (
+    bucket_key TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    day TEXT NOT NULL DEFAULT '',
+    day_count INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+_V14_PROVIDER_RATE_BUCKETS_POSTGRES = """
+CREATE TABLE IF NOT EXISTS provider_rate_buckets (
+    bucket_key TEXT PRIMARY KEY,
+    tokens DOUBLE PRECISION NOT NULL,
+    updated_at DOUBLE PRECISION NOT NULL,
+    day TEXT NOT NULL DEFAULT '',
+    day_count BIGINT NOT NULL DEFAULT 0
+);
+"""
+
+_V15_PROVIDER_HEALTH_SQLITE = """
+CREATE TABLE IF NOT EXISTS provider_health (
+    provider_key TEXT PRIMARY KEY,
+    state TEXT NOT NULL DEFAULT 'ok',
+    reason TEXT NOT NULL DEFAULT '',
+    failures INTEGER NOT NULL DEFAULT 0,
+    blocked_until REAL NOT NULL DEFAULT 0,
+    last_success_at REAL,
+    last_failure_at REAL,
+    updated_at REAL NOT NULL DEFAULT 0
+);
+"""
+
+_V15_PROVIDER_HEALTH_POSTGRES = """
+CREATE TABLE IF NOT EXISTS provider_health (
+    provider_key TEXT PRIMARY KEY,
+    state TEXT NOT NULL DEFAULT 'ok',
+    reason TEXT NOT NULL DEFAULT '',
+    failures INTEGER NOT NULL DEFAULT 0,
+    blocked_until DOUBLE PRECISION NOT NULL DEFAULT 0,
+    last_success_at DOUBLE PRECISION,
+    last_failure_at DOUBLE PRECISION,
+    updated_at DOUBLE PRECISION NOT NULL DEFAULT 0
+);
+"""
+
+MIGRATIONS: List[Migration] = [
+    *(Migration(version, SQLITE_SCHEMA_SQL, POSTGRES_SCHEMA_SQL) for version in _BASELINE_VERSIONS),
+    Migration("v10_latest_quotes", _V10_LATEST_QUOTES_SQLITE, _V10_LATEST_QUOTES_POSTGRES),
+    Migration("v11_instrument_master", _V11_INSTRUMENT_MASTER_SQLITE, _V11_INSTRUMENT_MASTER_POSTGRES),
+    Migration("v12_promoted_payload_columns", _V12_PROMOTED_COLUMNS_SQLITE, _V12_PROMOTED_COLUMNS_POSTGRES),
+    Migration("v13_retention_rollups", _V13_RETENTION_ROLLUPS_SQLITE, _V13_RETENTION_ROLLUPS_POSTGRES),
+    Migration("v14_provider_rate_buckets", _V14_PROVIDER_RATE_BUCKETS_SQLITE, _V14_PROVIDER_RATE_BUCKETS_POSTGRES),
+    Migration("v15_provider_health", _V15_PROVIDER_HEALTH_SQLITE, _V15_PROVIDER_HEALTH_POSTGRES),
+]
+
+_SCHEMA_CURRENT: set = set()
+_SCHEMA_LOCK = threading.Lock()
+_PG_MIGRATION_LOCK_KEY = 6767001
+
+
+def _applied_migrations(conn: DBConnection) -> set:
+    rows = conn.execute("SELECT version FROM schema_migrations").fetchall()
+    return {str(row.get("version")) for row in rows}
+
+
+def _read_applied_migrations() -> Optional[set]:
+    try:
+        with get_connection() as conn:
+            return _applied_migrations(conn)
+    except Exception:
+        # schema_migrations does not exist yet.
+        return None
+
+
+def _apply_migrations(conn: DBConnection, pending: List[Migration]) -> None:
+    # Baseline versions share one script object; run each distinct script once.
+    scripts: List[str] = []
+    for migration in pending:
+        sql = migration.sql_for(conn.backend)
+        if sql.strip() and not any(sql is existing for existing in scripts):
+            scripts.append(sql)
+
+    if conn.backend == "sqlite":
+        # executescript() commits implicitly, so wrap the whole batch in one explicit transaction.
+        markers = "".join(
+            f"INSERT OR IGNORE INTO schema_migrations(version) VALUES ('{m.version}');\n" for m in pending
+        )
+        conn.raw_connection.executescript("BEGIN IMMEDIATE;\n" + "\n".join(scripts) + "\n" + markers + "COMMIT;")
+        return
+
+    for script in scripts:
+        conn.executescript(script)
+    conn.executemany(
+        "INSERT INTO schema_migrations(version) VALUES (?) ON CONFLICT (version) DO NOTHING",
+        [(m.version,) for m in pending],
+    )
 
 
-def init_db() -> None:
+def init_db(force: bool = False) -> List[str]:
     database_url = _resolve_database_url()
-    backend = _parse_backend(database_url)
-    with get_connection() as conn:
-        conn.executescript(POSTGRES_SCHEMA_SQL if backend == "postgres" else SQLITE_SCHEMA_SQL)
-        if backend == "postgres":
-            conn.execute(
-                """
-                INSERT INTO schema_migrations(version)
-                VALUES (?)
-                ON CONFLICT (version) DO NOTHING
-                """,
-                ("v1_initial",),
-            )
-            conn.execute(
-                """
-                INSERT INTO schema_migrations(version)
-                VALUES (?)
-                ON CONFLICT (version) DO NOTHING
-                """,
-                ("v2_ingestion_zones",),
-            )
-        else:
-            conn.execute(
-                "INSERT OR IGNORE INTO schema_migrations(version) VALUES (?)",
-                ("v1_initial",),
-            )
-            conn.execute(
-                "INSERT OR IGNORE INTO schema_migrations(version) VALUES (?)",
-                ("v2_ingestion_zones",),
-            )
-            conn.execute(
-                "INSERT OR IGNORE INTO schema_migrations(version) VALUES (?)",
-                ("v3_admin_sentiment_tactics",),
-            )
-            conn.execute(
-                "INSERT OR IGNORE INTO schema_migrations(version) VALUES (?)",
-                ("v4_monitor_positions",),
-            )
-            conn.execute(
-                "INSERT OR IGNORE INTO schema_migrations(version) VALUES (?)",
-                ("v5_scanner_sources_overlay",),
-            )
-            conn.execute(
-                "INSERT OR IGNORE INTO schema_migrations(version) VALUES (?)",
-                ("v6_strategies_monitor_dashboard",),
-            )
-            conn.execute(
-                "INSERT OR IGNORE INTO schema_migrations(version) VALUES (?)",
-                ("v7_source_snapshots_rss",),
-            )
-            conn.execute(
-                "INSERT OR IGNORE INTO schema_migrations(version) VALUES (?)",
-                ("v8_scanner_connectors_registry",),
-            )
-            conn.execute(
-                "INSERT OR IGNORE INTO schema_migrations(version) VALUES (?)",
-                ("v9_paper_trading_v1",),
-            )
-        if backend == "postgres":
-            conn.execute(
-                """
-                INSERT INTO schema_migrations(version)
-                VALUES (?)
-                ON CONFLICT (version) DO NOTHING
-                """,
-                ("v3_admin_sentiment_tactics",),
-            )
-            conn.execute(
-                """
-                INSERT INTO schema_migrations(version)
-                VALUES (?)
-                ON CONFLICT (version) DO NOTHING
-                """,
-                ("v4_monitor_positions",),
-            )
-            conn.execute(
-                """
-                INSERT INTO schema_migrations(version)
-                VALUES (?)
-                ON CONFLICT (version) DO NOTHING
-                """,
-                ("v5_scanner_sources_overlay",),
-            )
-            conn.execute(
-                """
-                INSERT INTO schema_migrations(version)
-                VALUES (?)
-                ON CONFLICT (version) DO NOTHING
-                """,
-                ("v6_strategies_monitor_dashboard",),
-            )
-            conn.execute(
-                """
-                INSERT INTO schema_migrations(version)
-                VALUES (?)
-                ON CONFLICT (version) DO NOTHING
-                """,
-                ("v7_source_snapshots_rss",),
-            )
-            conn.execute(
-                """
-                INSERT INTO schema_migrations(version)
-                VALUES (?)
-                ON CONFLICT (version) DO NOTHING
-                """,
-                ("v8_scanner_connectors_registry",),
-            )
-            conn.execute(
-                """
-                INSERT INTO schema_migrations(version)
-                VALUES (?)
-                ON CONFLICT (version) DO NOTHING
-                """,
-                ("v9_paper_trading_v1",),
-            )
+    if not force and database_url in _SCHEMA_CURRENT:
+        return []
+
+    with _SCHEMA_LOCK:
+        if not force and database_url in _SCHEMA_CURRENT:
+            return []
+
+        applied = _read_applied_migrations()
+        pending = [m for m in MIGRATIONS if applied is None or m.version not in applied]
+        if pending:
+            with get_connection() as conn:
+                if conn.backend == "postgres":
+                    # Serialise concurrent starters (API workers, poller) and re-check under the lock.
+                    conn.execute("SELECT pg_advisory_xact_lock(?)", (_PG_MIGRATION_LOCK_KEY,))
+                    if applied is not None:
+                        applied = _applied_migrations(conn)
+                        pending = [m for m in MIGRATIONS if m.version not in applied]
+                if pending:
+                    _apply_migrations(conn, pending)
+            logger.info("schema migrations applied: %s", ", ".join(m.version for m in pending))
+
+        _SCHEMA_CURRENT.add(database_url)
+        return [m.version for m in pending]
 
 
 def check_db_connectivity() -> Tuple[bool, str]:
@@ -0,0 +1,426 @@
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from core.storage.db import DBConnection, get_connection
+
+logger = logging.getLogger(__name__)
+
+_PG_MAINTENANCE_LOCK_KEY = 6767002
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    table: str
+    ts_column: str
+    default_days: int
+    rollup: Optional[str] = None
+
+
+# Days to keep per table (RETENTION_DAYS_<TABLE>, 0 keeps forever). Rows carrying a rollup are
+# folded into the daily rollup tables in the same transaction that deletes them.
+RETENTION_POLICIES = (
+    RetentionPolicy("events", "created_at", 30, rollup="quotes"),
+    RetentionPolicy("signals", "created_at", 90, rollup="signals"),
+    RetentionPolicy("raw_payloads", "received_at", 30),
+    RetentionPolicy("source_snapshots", "created_at", 30),
+    RetentionPolicy("scanner_source_breakdowns", "created_at", 30),
+    RetentionPolicy("sentiment_audit_log", "created_at", 180),
+)
+
+# Rollups merge into existing rows so a day split across several delete batches (or runs) adds up:
+# counts and sums accumulate, open keeps the earliest batch and close takes the latest.
+_ROLLUP_SQL = {
+    ("signals", "sqlite"): """
+        INSERT INTO signal_daily_rollups (symbol, timeframe, day, samples, score_sum, score_min, score_max)
+        SELECT symbol, COALESCE(timeframe, ''), SUBSTR(created_at, 1, 10), COUNT(*), SUM(score), MIN(score), MAX(score)
+        FROM signals
+        WHERE id BETWEEN ? AND ? AND created_at < ?
+        GROUP BY symbol, COALESCE(timeframe, ''), SUBSTR(created_at, 1, 10)
+        ON CONFLICT (symbol, timeframe, day) DO UPDATE SET
+            samples = signal_daily_rollups.samples + excluded.samples,
+            score_sum = signal_daily_rollups.score_sum + excluded.score_sum,
+            score_min = MIN(COALESCE(signal_daily_rollups.score_min, excluded.score_min), excluded.score_min),
+            score_max = MAX(COALESCE(signal_daily_rollups.score_max, excluded.score_max), excluded.score_max)
+    """,
+    ("signals", "postgres"): """
+        INSERT INTO signal_daily_rollups (symbol, timeframe, day, samples, score_sum, score_min, score_max)
+        SELECT symbol, COALESCE(timeframe, ''), (created_at AT TIME ZONE 'UTC')::date,
+            COUNT(*), SUM(score), MIN(score), MAX(score)
+        FROM signals
+        WHERE id BETWEEN ? AND ? AND created_at < ?
+        GROUP BY 1, 2, 3
+        ON CONFLICT (symbol, timeframe, day) DO UPDATE SET
+            samples = signal_daily_rollups.samples + EXCLUDED.samples,
+            score_sum = signal_daily_rollups.score_sum + EXCLUDED.score_sum,
+            score_min = LEAST(signal_daily_rollups.score_min, EXCLUDED.score_min),
+            score_max = GREATEST(signal_daily_rollups.score_max, EXCLUDED.score_max)
+        RETURNING id
+    """,
+    ("quotes", "sqlite"): """
+        INSERT INTO quote_daily_rollups (symbol, day, samples, open, high, low, close)
+        SELECT
+            g.symbol, g.day, g.samples,
+            (SELECT CAST(json_extract(e.payload, '$.quote.last') AS REAL) FROM events e WHERE e.id = g.first_id),
+            g.high, g.low,
+            (SELECT CAST(json_extract(e.payload, '$.quote.last') AS REAL) FROM events e WHERE e.id = g.last_id)
+        FROM (
+            SELECT
+                symbol,
+                SUBSTR(created_at, 1, 10) AS day,
+                COUNT(*) AS samples,
+                MIN(id) AS first_id,
+                MAX(id) AS last_id,
+                MAX(CAST(json_extract(payload, '$.quote.last') AS REAL)) AS high,
+                MIN(CAST(json_extract(payload, '$.quote.last') AS REAL)) AS low
+            FROM events
+            WHERE id BETWEEN ? AND ? AND created_at < ?
+              AND event_type = 'worker.quote' AND symbol IS NOT NULL AND json_valid(payload)
+            GROUP BY symbol, SUBSTR(created_at, 1, 10)
+        ) g
+        WHERE true
+        ON CONFLICT (symbol, day) DO UPDATE SET
+            samples = quote_daily_rollups.samples + excluded.samples,
+            high = MAX(COALESCE(quote_daily_rollups.high, excluded.high), COALESCE(excluded.high, quote_daily_rollups.high)),
+            low = MIN(COALESCE(quote_daily_rollups.low, excluded.low), COALESCE(excluded.low, quote_daily_rollups.low)),
+            open = COALESCE(quote_daily_rollups.open, excluded.open),
+            close = COALESCE(excluded.close, quote_daily_rollups.close)
+    """,
+    ("quotes", "postgres"): """
+        INSERT INTO quote_daily_rollups (symbol, day, samples, open, high, low, close)
+        SELECT
+            g.symbol, g.day, g.samples,
+            (SELECT (e.payload->'quote'->>'last')::DOUBLE PRECISION FROM events e
+             WHERE e.id = g.first_id AND jsonb_typeof(e.payload->'quote'->'last') = 'number'),
+            g.high, g.low,
+            (SELECT (e.payload->'quote'->>'last')::DOUBLE PRECISION FROM events e
+             WHERE e.id = g.last_id AND jsonb_typeof(e.payload->'quote'->'last') = 'number')
+        FROM (
+            SELECT
+                symbol,
+                (created_at AT TIME ZONE 'UTC')::date AS day,
+                COUNT(*) AS samples,
+                MIN(id) AS first_id,
+                MAX(id) AS last_id,
+                MAX(CASE WHEN jsonb_typeof(payload->'quote'->'last') = 'number'
+                    THEN (payload->'quote'->>'last')::DOUBLE PRECISION END) AS high,
+                MIN(CASE WHEN jsonb_typeof(payload->'quote'->'last') = 'number'
+                    THEN (payload->'quote'->>'last')::DOUBLE PRECISION END) AS low
+            FROM events
+            WHERE id BETWEEN ? AND ? AND created_at < ?
+              AND event_type = 'worker.quote' AND symbol IS NOT NULL
+            GROUP BY 1, 2
+        ) g
+        ON CONFLICT (symbol, day) DO UPDATE SET
+            samples = quote_daily_rollups.samples + EXCLUDED.samples,
+            high = GREATEST(quote_daily_rollups.high, EXCLUDED.high),
+            low = LEAST(quote_daily_rollups.low, EXCLUDED.low),
+            open = COALESCE(quote_daily_rollups.open, EXCLUDED.open),
+            close = COALESCE(EXCLUDED.close, quote_daily_rollups.close)
+        RETURNING id
+    """,
+}
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    raw = os.getenv(name)
+    if raw is None:
+        return default
+    return raw.strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(0, int(os.getenv(name, str(default))))
+    except ValueError:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return max(0.0, float(os.getenv(name, str(default))))
+    except ValueError:
+        return default
+
+
+def maintenance_enabled() -> bool:
+    return _env_bool("MAINTENANCE_ENABLED", True)
+
+
+def retention_days(policy: RetentionPolicy) -> int:
+    return _env_int(f"RETENTION_DAYS_{policy.table.upper()}", policy.default_days)
+
+
+def _cutoff(days: int, now: datetime) -> datetime:
+    # Whole UTC days only, so a rolled-up day is never split between kept and deleted rows.
+    midnight = now.astimezone(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    return midnight - timedelta(days=days)
+
+
+def _cutoff_param(conn: DBConnection, cutoff: datetime) -> Any:
+    # SQLite stores "YYYY-MM-DD HH:MM:SS" or ISO-8601 text; a midnight prefix sorts correctly for both.
+    if conn.backend == "postgres":
+        return cutoff
+    return cutoff.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _purge_batch(policy: RetentionPolicy, cutoff: datetime, batch_size: int) -> int:
+    with get_connection() as conn:
+        bound = _cutoff_param(conn, cutoff)
+        # The timestamp index finds where expired rows start (so the final, empty batch is a seek, not a
+        # scan of everything still inside the window); a primary-key walk from there bounds the batch.
+        start = conn.execute(
+            f"""
+            SELECT MIN(id) AS lo
+            FROM (SELECT id FROM {policy.table} WHERE {policy.ts_column} < ? ORDER BY {policy.ts_column} LIMIT ?) batch
+            """,
+            (bound, batch_size),
+        ).fetchall()
+        if not start or start[0]["lo"] is None:
+            return 0
+        lo = int(start[0]["lo"])
+        end = conn.execute(
+            f"""
+            SELECT MAX(id) AS hi
+            FROM (SELECT id FROM {policy.table} WHERE id >= ? AND {policy.ts_column} < ? ORDER BY id LIMIT ?) batch
+            """,
+            (lo, bound, batch_size),
+        ).fetchall()
+        hi = int(end[0]["hi"])
+        # The timestamp predicate stays on every statement so Postgres can prune partitions.
+        if policy.rollup:
+            conn.execute(_ROLLUP_SQL[(policy.rollup, conn.backend)], (lo, hi, bound))
+        deleted = conn.execute(
+            f"DELETE FROM {policy.table} WHERE id BETWEEN ? AND ? AND {policy.ts_column} < ?",
+            (lo, hi, bound),
+        )
+        return max(0, deleted.rowcount)
+
+
+def purge_table(
+    policy: RetentionPolicy,
+    now: Optional[datetime] = None,
+    batch_size: int = 5000,
+    pause_seconds: float = 0.05,
+    max_batches: int = 1000,
+) -> Dict[str, Any]:
+    days = retention_days(policy)
+    if days <= 0:
+        return {"table": policy.table, "retention_days": 0, "deleted": 0, "batches": 0}
+    cutoff = _cutoff(days, now or datetime.now(timezone.utc))
+    deleted = 0
+    batches = 0
+    # Each batch is its own short transaction; the pause lets queued writers take the lock.
+    while batches < max_batches:
+        count = _purge_batch(policy, cutoff, batch_size)
+        if not count:
+            break
+        deleted += count
+        batches += 1
+        time.sleep(pause_seconds)
+    return {
+        "table": policy.table,
+        "retention_days": days,
+        "cutoff": cutoff.isoformat(),
+        "deleted": deleted,
+        "batches": batches,
+        "rollup": policy.rollup,
+    }
+
+
+def checkpoint_and_optimize(analyze: bool = False, tables: Optional[List[str]] = None) -> Dict[str, Any]:
+    with get_connection() as conn:
+        if conn.backend == "sqlite":
+            # PASSIVE never waits on readers or writers; it copies what it can and we retry next tick.
+            busy, wal_frames, checkpointed = tuple(conn.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchall()[0].values())
+            conn.execute("PRAGMA optimize")
+            if analyze:
+                conn.execute("ANALYZE")
+            return {
+                "backend": "sqlite",
+                "wal_busy": bool(busy),
+                "wal_frames": wal_frames,
+                "wal_checkpointed": checkpointed,
+                "analyzed": analyze,
+            }
+        # Autovacuum reclaims dead tuples on Postgres; refresh planner stats where we just deleted.
+        analyzed = list(tables or []) if analyze else []
+        for table in analyzed:
+            conn.execute(f"ANALYZE {table}")
+        return {"backend": "postgres", "analyzed": analyzed}
+
+
+def run_maintenance(
+    now: Optional[datetime] = None,
+    analyze: bool = True,
+    batch_size: Optional[int] = None,
+    pause_seconds: Optional[float] = None,
+) -> Dict[str, Any]:
+    started = time.monotonic()
+    batch_size = batch_size or max(1, _env_int("MAINTENANCE_BATCH_SIZE", 5000))
+    pause_seconds = pause_seconds if pause_seconds is not None else _env_float("MAINTENANCE_BATCH_PAUSE_SECONDS", 0.05)
+    report: Dict[str, Any] = {"started_at": datetime.now(timezone.utc).isoformat(), "tables": []}
+
+    with get_connection() as lock_conn:
+        # One maintenance run per Postgres cluster; the session lock is held on a dedicated connection.
+        if lock_conn.backend == "postgres":
+            got = lock_conn.execute("SELECT pg_try_advisory_lock(?) AS locked", (_PG_MAINTENANCE_LOCK_KEY,)).fetchall()
+            if not got or not got[0]["locked"]:
+                report["skipped"] = "locked"
+                return report
+        try:
+            for policy in RETENTION_POLICIES:
+                try:
+                    report["tables"].append(
+                        purge_table(policy, now=now, batch_size=batch_size, pause_seconds=pause_seconds)
+                    )
+                except Exception as exc:
+                    logger.error("maintenance_purge_failed table=%s error=%s", policy.table, exc)
+                    report["tables"].append({"table": policy.table, "error": str(exc)})
+            touched = [entry["table"] for entry in report["tables"] if entry.get("deleted")]
+            report["housekeeping"] = checkpoint_and_optimize(analyze=analyze, tables=touched)
+        finally:
+            if lock_conn.backend == "postgres":
+                lock_conn.execute("SELECT pg_advisory_unlock(?)", (_PG_MAINTENANCE_LOCK_KEY,))
+
+    report["duration_ms"] = round((time.monotonic() - started) * 1000.0, 1)
+    report["deleted"] = sum(int(entry.get("deleted") or 0) for entry in report["tables"])
+    return report
+
+
+class MaintenanceScheduler:
+    def __init__(
+        self,
+        interval_seconds: float = 3600.0,
+        checkpoint_interval_seconds: float = 300.0,
+        analyze_interval_seconds: float = 86400.0,
+    ) -> None:
+        self.interval_seconds = max(1.0, interval_seconds)
+        self.checkpoint_interval_seconds = max(1.0, checkpoint_interval_seconds)
+        self.analyze_interval_seconds = analyze_interval_seconds
+        self._lock = threading.Lock()
+        self._run_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_run_at = 0.0
+        self._last_analyze_at = 0.0
+        self._last_report: Optional[Dict[str, Any]] = None
+        self._last_checkpoint: Optional[Dict[str, Any]] = None
+        self._runs = 0
+        self._failures = 0
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._loop, name="storage-maintenance", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout_seconds: float = 5.0) -> None:
+        self._stopping.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout=timeout_seconds)
+
+    def run_now(self) -> Dict[str, Any]:
+        # Serialises with the background loop; a manual run waits for an in-flight one.
+        with self._run_lock:
+            analyze = time.monotonic() - self._last_analyze_at >= self.analyze_interval_seconds
+            try:
+                report = run_maintenance(analyze=analyze)
+            except Exception as exc:
+                with self._lock:
+                    self._failures += 1
+                logger.error("maintenance_run_failed error=%s", exc)
+                raise
+            now = time.monotonic()
+            with self._lock:
+                self._runs += 1
+                self._last_run_at = now
+                if analyze and not report.get("skipped"):
+                    self._last_analyze_at = now
+                self._last_report = report
+            logger.info(
+                "maintenance_run deleted=%s duration_ms=%s", report.get("deleted", 0), report.get("duration_ms")
+            )
+            return report
+
+    def _loop(self) -> None:
+        # First pass runs one checkpoint interval after start so it never competes with startup.
+        while not self._stopping.wait(self.checkpoint_interval_seconds):
+            try:
+                if time.monotonic() - self._last_run_at >= self.interval_seconds:
+                    self.run_now()
+                else:
+                    with self._run_lock:
+                        checkpoint = checkpoint_and_optimize()
+                    with self._lock:
+                        self._last_checkpoint = checkpoint
+            except Exception as exc:
+                logger.warning("maintenance_tick_failed error=%s", exc)
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": maintenance_enabled(),
+                "running": self._thread is not None and self._thread.is_alive(),
+                "interval_seconds": self.interval_seconds,
+                "checkpoint_interval_seconds": self.checkpoint_interval_seconds,
+                "runs": self._runs,
+                "failures": self._failures,
+                "retention_days": {policy.table: retention_days(policy) for policy in RETENTION_POLICIES},
+                "last_report": self._last_report,
+                "last_checkpoint": self._last_checkpoint,
+            }
+
+
+_SCHEDULER: Optional[MaintenanceScheduler] = None
+_SCHEDULER_LOCK = threading.Lock()
+
+
+def get_maintenance_scheduler() -> MaintenanceScheduler:
+    global _SCHEDULER
+    with _SCHEDULER_LOCK:
+        if _SCHEDULER is None:
+            _SCHEDULER = MaintenanceScheduler(
+                interval_seconds=_env_float("MAINTENANCE_INTERVAL_SECONDS", 3600.0),
+                checkpoint_interval_seconds=_env_float("MAINTENANCE_CHECKPOINT_INTERVAL_SECONDS", 300.0),
+                analyze_interval_seconds=_env_float("MAINTENANCE_ANALYZE_INTERVAL_SECONDS", 86400.0),
+            )
+        return _SCHEDULER
+
+
+def start_maintenance_scheduler() -> Optional[MaintenanceScheduler]:
+    if not maintenance_enabled():
+        return None
+    scheduler = get_maintenance_scheduler()
+    scheduler.start()
+    return scheduler
+
+
+def stop_maintenance_scheduler() -> None:
+    with _SCHEDULER_LOCK:
+        scheduler = _SCHEDULER
+    if scheduler is not None:
+        scheduler.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Apply storage retention, rollups and housekeeping once.")
+    parser.add_argument("--no-analyze", action="store_true", help="Skip ANALYZE after purging.")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    print(json.dumps(run_maintenance(analyze=not args.no_analyze), indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
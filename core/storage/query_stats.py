@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (ms) of the duration histogram buckets; the last bucket is open-ended.
+HISTOGRAM_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+_MAX_STATEMENTS = 500
+_EXPLAIN_COOLDOWN_SECONDS = 60.0
+_EXPLAINABLE = ("SELECT", "WITH", "UPDATE", "DELETE")
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PG_PLACEHOLDER = re.compile(r"%s")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_VALUES_LIST = re.compile(r"(VALUES\s*\([^()]*\))(?:\s*,\s*\([^()]*\))+", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+# Frames from these modules are plumbing; the caller is the first frame outside them.
+_INTERNAL_MODULES = ("core.storage.db", "core.storage.query_stats", "core.storage.write_behind", "contextlib")
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    raw = os.getenv(name)
+    if raw is None:
+        return default
+    return raw.strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def normalize_sql(sql: str) -> str:
+    text = _STRING_LITERAL.sub("?", sql)
+    text = _PG_PLACEHOLDER.sub("?", text)
+    text = _NUMBER_LITERAL.sub("?", text)
+    text = _WHITESPACE.sub(" ", text).strip().rstrip(";")
+    text = _IN_LIST.sub("IN (?, ...)", text)
+    text = _VALUES_LIST.sub(r"\1, ...", text)
+    return text[:1000]
+
+
+def _caller() -> str:
+    frame = sys._getframe(2)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if not module.startswith(_INTERNAL_MODULES):
+            return f"{module}:{frame.f_code.co_name}"
+        frame = frame.f_back
+    return "unknown"
+
+
+class _StatementStats:
+    __slots__ = ("count", "total_ms", "max_ms", "rows", "buckets", "callers", "last_explain_at")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+        self.buckets = [0] * (len(HISTOGRAM_BUCKETS_MS) + 1)
+        self.callers: Dict[str, int] = {}
+        self.last_explain_at = 0.0
+
+    def record(self, duration_ms: float, rows: int, caller: str) -> None:
+        self.count += 1
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+        self.rows += rows
+        index = len(HISTOGRAM_BUCKETS_MS)
+        for i, bound in enumerate(HISTOGRAM_BUCKETS_MS):
+            if duration_ms <= bound:
+                index = i
+                break
+        self.buckets[index] += 1
+        self.callers[caller] = self.callers.get(caller, 0) + 1
+
+    def as_dict(self, statement: str) -> Dict[str, Any]:
+        labels = [f"<={bound}ms" for bound in HISTOGRAM_BUCKETS_MS] + [f">{HISTOGRAM_BUCKETS_MS[-1]}ms"]
+        return {
+            "statement": statement,
+            "count": self.count,
+            "total_ms": round(self.total_ms, 3),
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "rows": self.rows,
+            "histogram": {label: n for label, n in zip(labels, self.buckets) if n},
+            "callers": dict(sorted(self.callers.items(), key=lambda item: item[1], reverse=True)),
+        }
+
+
+class QueryStats:
+    def __init__(self, enabled: bool, slow_query_ms: float, explain_slow: bool) -> None:
+        self.enabled = enabled
+        self.slow_query_ms = slow_query_ms
+        self.explain_slow = explain_slow
+        self._lock = threading.Lock()
+        self._statements: Dict[str, _StatementStats] = {}
+        self._dropped = 0
+        self._slow_count = 0
+        self._since = time.time()
+
+    def record(
+        self,
+        sql: str,
+        duration_ms: float,
+        rows: int,
+        explain: Optional[Callable[[], List[str]]] = None,
+    ) -> None:
+        statement = normalize_sql(sql)
+        caller = _caller()
+        run_explain = False
+        with self._lock:
+            stats = self._statements.get(statement)
+            if stats is None:
+                if len(self._statements) >= _MAX_STATEMENTS:
+                    self._dropped += 1
+                    return
+                stats = _StatementStats()
+                self._statements[statement] = stats
+            stats.record(duration_ms, rows, caller)
+            is_slow = duration_ms >= self.slow_query_ms
+            if is_slow:
+                self._slow_count += 1
+                now = time.monotonic()
+                if (
+                    self.explain_slow
+                    and explain is not None
+                    and statement.upper().startswith(_EXPLAINABLE)
+                    and now - stats.last_explain_at >= _EXPLAIN_COOLDOWN_SECONDS
+                ):
+                    stats.last_explain_at = now
+                    run_explain = True
+        if not is_slow:
+            return
+
+        plan: List[str] = []
+        if run_explain:
+            try:
+                plan = explain()
+            except Exception as exc:
+                plan = [f"explain failed: {exc}"]
+        logger.warning(
+            "slow_query duration_ms=%.1f rows=%s caller=%s sql=%s%s",
+            duration_ms,
+            rows,
+            caller,
+            statement,
+            "".join(f"\n  plan: {line}" for line in plan),
+        )
+
+    def snapshot(self, limit: int = 50, order_by: str = "total_ms") -> Dict[str, Any]:
+        with self._lock:
+            items: List[Tuple[str, _StatementStats]] = list(self._statements.items())
+            rows = [stats.as_dict(statement) for statement, stats in items]
+            dropped = self._dropped
+            slow_count = self._slow_count
+        key = order_by if order_by in {"total_ms", "avg_ms", "max_ms", "count", "rows"} else "total_ms"
+        rows.sort(key=lambda row: row[key], reverse=True)
+        return {
+            "enabled": self.enabled,
+            "slow_query_ms": self.slow_query_ms,
+            "since": self._since,
+            "statements_tracked": len(rows),
+            "statements_dropped": dropped,
+            "slow_queries": slow_count,
+            "histogram_buckets_ms": list(HISTOGRAM_BUCKETS_MS),
+            "statements": rows[: max(1, int(limit))],
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._statements.clear()
+            self._dropped = 0
+            self._slow_count = 0
+            self._since = time.time()
+
+
+QUERY_STATS = QueryStats(
+    enabled=_env_bool("DB_QUERY_STATS_ENABLED", False),
+    slow_query_ms=_env_float("DB_SLOW_QUERY_MS", 200.0),
+    explain_slow=_env_bool("DB_SLOW_QUERY_EXPLAIN", True),
+)
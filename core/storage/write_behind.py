@@ -0,0 +1,274 @@
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from core.storage.db import DBConnection, get_connection
+
+logger = logging.getLogger(__name__)
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.getenv(name, str(default))))
+    except ValueError:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return max(0.0, float(os.getenv(name, str(default))))
+    except ValueError:
+        return default
+
+
+def write_behind_enabled() -> bool:
+    return os.getenv("WRITE_BEHIND_ENABLED", "true").strip().lower() in {"1", "true", "yes", "on"}
+
+
+@dataclass(frozen=True)
+class _Insert:
+    sqlite_sql: str
+    postgres_sql: str
+    params: Tuple[Any, ...]
+
+    def group_key(self) -> Tuple[Any, ...]:
+        return ("insert", self.sqlite_sql, self.postgres_sql)
+
+
+@dataclass(frozen=True)
+class _Upsert:
+    table: str
+    columns: Tuple[str, ...]
+    conflict_columns: Tuple[str, ...]
+    update_columns: Optional[Tuple[str, ...]]
+    row: Tuple[Any, ...]
+
+    def group_key(self) -> Tuple[Any, ...]:
+        return ("upsert", self.table, self.columns, self.conflict_columns, self.update_columns)
+
+
+_Write = Union[_Insert, _Upsert]
+
+
+def _apply(conn: DBConnection, writes: Sequence[_Write]) -> None:
+    # Writes with the same statement are grouped into one executemany/upsert_many; groups keep
+    # first-seen order and rows keep submit order within a group.
+    groups: Dict[Tuple[Any, ...], List[_Write]] = {}
+    for write in writes:
+        groups.setdefault(write.group_key(), []).append(write)
+    for group in groups.values():
+        head = group[0]
+        if isinstance(head, _Insert):
+            sql = head.postgres_sql if conn.backend == "postgres" else head.sqlite_sql
+            conn.executemany(sql, [write.params for write in group])
+        else:
+            conn.upsert_many(
+                head.table,
+                head.columns,
+                [write.row for write in group],
+                conflict_columns=head.conflict_columns,
+                update_columns=head.update_columns,
+            )
+
+
+class WriteBehindQueue:
+    def __init__(
+        self,
+        max_size: int = 10000,
+        batch_size: int = 500,
+        flush_interval_seconds: float = 0.5,
+        block_timeout_seconds: float = 1.0,
+    ) -> None:
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self.block_timeout_seconds = block_timeout_seconds
+        self._queue: "queue.Queue[_Write]" = queue.Queue(maxsize=max_size)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._counters = {
+            "submitted": 0,
+            "written": 0,
+            "failed": 0,
+            "batches": 0,
+            "sync_writes": 0,
+            "backpressure_waits": 0,
+        }
+
+    def submit_insert(
+        self,
+        sql: str,
+        params: Sequence[Any],
+        postgres_sql: Optional[str] = None,
+        sync: bool = False,
+    ) -> None:
+        self._submit(_Insert(sql, postgres_sql or sql, tuple(params)), sync)
+
+    def submit_upsert(
+        self,
+        table: str,
+        columns: Sequence[str],
+        row: Sequence[Any],
+        conflict_columns: Sequence[str],
+        update_columns: Optional[Sequence[str]] = None,
+        sync: bool = False,
+    ) -> None:
+        write = _Upsert(
+            table,
+            tuple(columns),
+            tuple(conflict_columns),
+            tuple(update_columns) if update_columns is not None else None,
+            tuple(row),
+        )
+        self._submit(write, sync)
+
+    def _submit(self, write: _Write, sync: bool) -> None:
+        if sync or not write_behind_enabled() or self._stopping.is_set():
+            self._write_now([write])
+            return
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(write)
+        except queue.Full:
+            # Backpressure: wait for the writer to drain, then fall back to writing inline rather
+            # than dropping audit rows.
+            self._bump("backpressure_waits")
+            try:
+                self._queue.put(write, timeout=self.block_timeout_seconds)
+            except queue.Full:
+                self._write_now([write])
+                return
+        self._bump("submitted")
+
+    def _write_now(self, writes: List[_Write]) -> None:
+        with get_connection() as conn:
+            _apply(conn, writes)
+        self._bump("sync_writes", len(writes))
+        self._bump("written", len(writes))
+
+    def _bump(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[name] += amount
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+            self._thread.start()
+
+    def _drain(self, first: _Write) -> List[_Write]:
+        batch = [first]
+        deadline = time.monotonic() + self.flush_interval_seconds
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0 or self._stopping.is_set():
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            try:
+                first = self._queue.get(timeout=self.flush_interval_seconds)
+            except queue.Empty:
+                if self._stopping.is_set():
+                    return
+                continue
+            batch = self._drain(first)
+            try:
+                self._flush_batch(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _flush_batch(self, batch: List[_Write]) -> None:
+        try:
+            with get_connection() as conn:
+                _apply(conn, batch)
+            self._bump("batches")
+            self._bump("written", len(batch))
+            return
+        except Exception as exc:
+            logger.warning("write_behind_batch_failed size=%s error=%s; retrying row by row", len(batch), exc)
+        # One bad row must not discard the rest of the batch.
+        for write in batch:
+            try:
+                with get_connection() as conn:
+                    _apply(conn, [write])
+                self._bump("written")
+            except Exception as exc:
+                self._bump("failed")
+                logger.error("write_behind_write_failed key=%s error=%s", write.group_key()[:2], exc)
+
+    def flush(self, timeout_seconds: float = 10.0) -> bool:
+        deadline = time.monotonic() + timeout_seconds
+        while self._queue.unfinished_tasks:
+            if self._thread is None or not self._thread.is_alive():
+                self._ensure_started()
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def close(self, timeout_seconds: float = 10.0) -> bool:
+        flushed = self.flush(timeout_seconds)
+        self._stopping.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout=max(0.1, self.flush_interval_seconds * 2))
+        if not flushed:
+            logger.error("write_behind_close_timeout pending=%s", self._queue.qsize())
+        return flushed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out: Dict[str, Any] = dict(self._counters)
+        out["pending"] = self._queue.qsize()
+        out["max_size"] = self.max_size
+        out["enabled"] = write_behind_enabled()
+        return out
+
+
+_WRITER: Optional[WriteBehindQueue] = None
+_WRITER_LOCK = threading.Lock()
+
+
+def get_write_behind() -> WriteBehindQueue:
+    global _WRITER
+    with _WRITER_LOCK:
+        if _WRITER is None:
+            _WRITER = WriteBehindQueue(
+                max_size=_env_int("WRITE_BEHIND_MAX_PENDING", 10000),
+                batch_size=_env_int("WRITE_BEHIND_BATCH_SIZE", 500),
+                flush_interval_seconds=_env_float("WRITE_BEHIND_FLUSH_INTERVAL_SECONDS", 0.5),
+                block_timeout_seconds=_env_float("WRITE_BEHIND_BLOCK_TIMEOUT_SECONDS", 1.0),
+            )
+        return _WRITER
+
+
+def close_write_behind(timeout_seconds: float = 10.0) -> bool:
+    global _WRITER
+    with _WRITER_LOCK:
+        writer = _WRITER
+        _WRITER = None
+    if writer is None:
+        return True
+    return writer.close(timeout_seconds)
+
+
+atexit.register(close_write_behind)
@@ -1,6 +1,10 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from core.repositories.instruments import canonical_instrument_id
+from core.storage.bar_archive import BarArchive, get_bar_archive
 
 
 def _as_float(value: Any) -> Optional[float]:
@@ -11,7 +15,7 @@ def _as_float(value: Any) -> Optional[float]:
         return None
 
 
-def _sma(values: List[float], window: int) -> List[Optional[float]]:
+def _sma(values: Sequence[float], window: int) -> List[Optional[float]]:
     out: List[Optional[float]] = []
     if window <= 0:
         return [None for _ in values]
@@ -24,7 +28,7 @@ def _sma(values: List[float], window: int) -> List[Optional[float]]:
     return out
 
 
-def _rsi(values: List[float], period: int = 14) -> List[Optional[float]]:
+def _rsi(values: Sequence[float], period: int = 14) -> List[Optional[float]]:
     out: List[Optional[float]] = [None] * len(values)
     if len(values) <= period:
         return out
@@ -60,15 +64,22 @@ def _max_drawdown(equity_curve: List[float]) -> float:
     return max_dd
 
 
-def run_backtest(strategy_payload: Dict[str, Any], bars: List[Dict[str, Any]]) -> Dict[str, Any]:
+def _empty_result() -> Dict[str, Any]:
+    return {
+        "total_return_pct": 0.0,
+        "max_drawdown_pct": 0.0,
+        "trades_count": 0,
+        "win_rate": 0.0,
+        "equity_curve": [],
+    }
+
+
+def run_backtest(strategy_payload: Dict[str, Any], bars: Any) -> Dict[str, Any]:
     if not bars:
-        return {
-            "total_return_pct": 0.0,
-            "max_drawdown_pct": 0.0,
-            "trades_count": 0,
-            "win_rate": 0.0,
-            "equity_curve": [],
-        }
+        return _empty_result()
+    if hasattr(bars, "ts_iso"):
+        # Columnar bars (a BarSeries or an archive slice) are sorted and clean already.
+        return _run_on_closes(strategy_payload, bars.close, bars.ts_iso)
 
     closes: List[float] = []
     ts_labels: List[str] = []
@@ -80,14 +91,40 @@ def run_backtest(strategy_payload: Dict[str, Any], bars: List[Dict[str, Any]]) -
         ts_labels.append(str((b or {}).get("ts_event") or (b or {}).get("ts_ingest") or ""))
 
     if not closes:
-        return {
-            "total_return_pct": 0.0,
-            "max_drawdown_pct": 0.0,
-            "trades_count": 0,
-            "win_rate": 0.0,
-            "equity_curve": [],
-        }
-
+        return _empty_result()
+    return _run_on_closes(strategy_payload, closes, ts_labels.__getitem__)
+
+
+def run_backtest_archive(
+    strategy_payload: Dict[str, Any],
+    instrument_id: str,
+    timeframe: str,
+    start: Any = None,
+    end: Any = None,
+    limit: Optional[int] = None,
+    min_bars: int = 1,
+    archive: Optional[BarArchive] = None,
+    max_age_seconds: Optional[int] = None,
+) -> Optional[Dict[str, Any]]:
+    # Reads closes straight from the memory-mapped archive; None when it holds fewer than min_bars
+    # or was last appended more than max_age_seconds ago.
+    source = archive or get_bar_archive()
+    with source.open_slice(canonical_instrument_id(instrument_id), timeframe, start=start, end=end, limit=limit) as bars:
+        if len(bars) < max(1, int(min_bars)):
+            return None
+        if max_age_seconds is not None:
+            if bars.updated_at is None or time.time() - bars.updated_at > max(1, int(max_age_seconds)):
+                return None
+        result = _run_on_closes(strategy_payload, bars.close, bars.ts_iso)
+        result["bars_count"] = len(bars)
+        return result
+
+
+def _run_on_closes(
+    strategy_payload: Dict[str, Any],
+    closes: Sequence[float],
+    ts_label: Callable[[int], str],
+) -> Dict[str, Any]:
     mode = str((strategy_payload or {}).get("mode") or "trend_breakout").strip().lower()
     lookback = int((strategy_payload or {}).get("lookback") or 20)
 
@@ -139,7 +176,7 @@ def run_backtest(strategy_payload: Dict[str, Any], bars: List[Dict[str, Any]]) -
 
         mark_equity = equity if position == 0.0 else position * close
         equity_values.append(mark_equity)
-        equity_curve.append({"ts": ts_labels[i], "equity": round(mark_equity, 6)})
+        equity_curve.append({"ts": ts_label(i), "equity": round(mark_equity, 6)})
 
     if position > 0.0:
         final_close = closes[-1]
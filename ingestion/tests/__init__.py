@@ -3,4 +3,6 @@
 Usage:
 - python -m ingestion.tests.contract_tests
 - python -m ingestion.tests.failure_injection
+- python -m ingestion.tests.storage_tests
+- python -m ingestion.tests.bar_series_tests
 """
@@ -0,0 +1,91 @@
+import math
+from datetime import datetime, timedelta, timezone
+
+from app.providers.bar_delta import delta_start, merge_bars
+from app.providers.bar_series import BarSeries
+from app.validation.market_data import ValidationError
+
+_DAY = 86400
+
+
+def _daily(days, close_offset=0.0, hour=0, source_provider="stored"):
+    midnight = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    rows = []
+    for back in days:
+        ts = midnight - timedelta(days=back) + timedelta(hours=hour)
+        rows.append((ts, 10.0, 11.0, 9.0, 10.0 + close_offset - back, 100.0))
+    return BarSeries.from_rows(rows, instrument_id="A67.TEST", source_provider=source_provider)
+
+
+def _run_from_rows_checks() -> None:
+    series = BarSeries.from_rows(
+        [
+            ("2026-01-03T00:00:00+00:00", 3, 3, 3, 3, "30"),
+            ("2026-01-01T00:00:00Z", 1, 1, 1, 1, None),
+            ("2026-01-02T00:00:00+00:00", 2, 2, 2, 2, 20),
+            ("2026-01-03T00:00:00+00:00", 4, 4, 4, 4, 40),
+        ],
+        instrument_id="A67.TEST",
+        source_provider="contract_test",
+    )
+    # Sorted by ts, and a repeated ts keeps the row seen last.
+    assert len(series) == 3
+    assert list(series.close) == [1.0, 2.0, 4.0]
+    assert list(series.ts) == sorted(series.ts)
+
+    # A missing volume is NaN in the column and None outside it.
+    assert math.isnan(series.volume[0])
+    assert series[0].volume is None
+    assert next(series.records())[5] is None
+    first = series.to_dicts()[0]
+    assert first["volume"] is None
+    assert first["ts_event"] == "2026-01-01T00:00:00+00:00"
+    assert first["source_provider"] == "contract_test"
+
+    for bad in [("2026-01-01", 1, 1, 1, None, 1), ("not a date", 1, 1, 1, 1, 1), ("2026-01-01", 1, 1, 1, "nan", 1)]:
+        try:
+            BarSeries.from_rows([bad])
+            raise AssertionError(f"Expected ValidationError for {bad!r}")
+        except ValidationError:
+            pass
+
+    assert len(BarSeries.from_rows([])) == 0
+    assert len(BarSeries.coerce([{"ts_event": "2026-01-01", "open": 1, "high": 1, "low": 1, "close": 1}])) == 1
+
+
+def _run_merge_checks() -> None:
+    stored = _daily(range(9, -1, -1))
+    # Yahoo stamps a daily bar at the session open, TwelveData at midnight: same session, one bar.
+    fresh = _daily([0, -1], close_offset=0.5, hour=13, source_provider="yahoo")
+    merged = merge_bars(stored, fresh, "1day")
+    assert len(merged) == 11
+    assert list(merged.close[:9]) == list(stored.close[:9])
+    assert list(merged.close[-2:]) == list(fresh.close)
+    assert merged.source_provider == "yahoo"
+
+    # An empty delta keeps the stored series as is.
+    assert merge_bars(stored, BarSeries(), "1day") is stored
+
+
+def _run_delta_start_checks() -> None:
+    stored = _daily(range(29, -1, -1))
+    start = delta_start(stored, "1day", 20)
+    assert start == stored.ts_event(len(stored) - 1)
+
+    # Not enough history, a hole in the window, or a window too old: fetch in full instead.
+    assert delta_start(stored, "1day", 40) is None
+    holed = stored.select([i for i in range(len(stored)) if not 20 <= i < 27])
+    assert delta_start(holed, "1day", 20) is None
+    assert delta_start(_daily(range(80, 50, -1)), "1day", 20) is None
+    assert delta_start(BarSeries(), "1day", 20) is None
+
+
+def run() -> None:
+    _run_from_rows_checks()
+    _run_merge_checks()
+    _run_delta_start_checks()
+    print("PASS: bar series tests")
+
+
+if __name__ == "__main__":
+    run()
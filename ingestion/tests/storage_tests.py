@@ -0,0 +1,122 @@
+import os
+import tempfile
+from contextlib import contextmanager
+
+from app.providers.rate_limit import RateLimiter
+from core.storage.db import MIGRATIONS, close_pools, get_connection, init_db
+from core.storage.write_behind import WriteBehindQueue
+
+
+@contextmanager
+def _fresh_database():
+    # Every check starts from an empty SQLite file so migrations run from scratch.
+    previous = os.environ.get("DATABASE_URL")
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'storage_tests.db')}"
+        try:
+            yield
+        finally:
+            close_pools()
+            if previous is None:
+                os.environ.pop("DATABASE_URL", None)
+            else:
+                os.environ["DATABASE_URL"] = previous
+
+
+def _run_migration_checks() -> None:
+    applied = init_db(force=True)
+    assert applied == [m.version for m in MIGRATIONS], applied
+    for version in (
+        "v10_latest_quotes",
+        "v11_instrument_master",
+        "v12_promoted_payload_columns",
+        "v13_retention_rollups",
+        "v14_provider_rate_buckets",
+        "v15_provider_health",
+    ):
+        assert version in applied, version
+    with get_connection() as conn:
+        for table in ("latest_quotes", "canonical_instrument_aliases", "provider_rate_buckets", "provider_health"):
+            conn.execute(f"SELECT COUNT(*) AS n FROM {table}").fetchall()
+
+    # A second run finds everything applied and changes nothing.
+    assert init_db(force=True) == []
+
+
+def _age_bucket(key: str, seconds: float) -> None:
+    with get_connection() as conn:
+        conn.execute(
+            "UPDATE provider_rate_buckets SET updated_at = updated_at - ? WHERE bucket_key = ?",
+            (seconds, key),
+        )
+
+
+def _run_rate_limit_checks() -> None:
+    first = RateLimiter(backend="db")
+    second = RateLimiter(backend="db")
+
+    # Two limiters (two processes) draw on one provider_rate_buckets row.
+    assert first.try_acquire("check:quote", per_minute=2)
+    assert second.try_acquire("check:quote", per_minute=2)
+    assert not first.try_acquire("check:quote", per_minute=2)
+    assert not second.try_acquire("check:quote", per_minute=2)
+
+    # Refill is continuous at per_minute / 60 tokens a second: 30 s buys back one token of two.
+    _age_bucket("check:quote", 30)
+    assert second.try_acquire("check:quote", per_minute=2)
+    assert not first.try_acquire("check:quote", per_minute=2)
+
+    # Multi-token requests are all or nothing; try_acquire_up_to shrinks to what is left.
+    assert not first.try_acquire("check:bars", per_minute=5, tokens=8)
+    assert first.try_acquire_up_to("check:bars", per_minute=5, tokens=8) == 5
+    assert second.try_acquire_up_to("check:bars", per_minute=5, tokens=8) == 0
+
+    # The per-day cap holds across limiters even when the minute bucket has room.
+    assert first.try_acquire("check:day", per_minute=60, per_day=3, tokens=2)
+    assert not second.try_acquire("check:day", per_minute=60, per_day=3, tokens=2)
+    assert second.try_acquire("check:day", per_minute=60, per_day=3)
+    assert not first.try_acquire("check:day", per_minute=60, per_day=3)
+    _age_bucket("check:day", 60)
+    assert not first.acquire("check:day", per_minute=60, per_day=3, timeout_seconds=0.2)
+
+    for limiter in (first, second):
+        stats = limiter.stats()
+        assert stats["db_errors"] == 0, stats
+        assert not stats["local_buckets"], stats
+    assert set(first.stats()["shared_buckets"]) == {"check:quote", "check:bars", "check:day"}
+
+
+def _run_write_behind_checks() -> None:
+    with get_connection() as conn:
+        conn.execute("CREATE TABLE write_behind_check (id INTEGER PRIMARY KEY, note TEXT NOT NULL)")
+
+    writer = WriteBehindQueue(batch_size=500, flush_interval_seconds=0.5)
+    for i in range(25):
+        writer.submit_insert("INSERT INTO write_behind_check (id, note) VALUES (?, ?)", (i, f"row {i}"))
+
+    # close() drains everything still queued before the writer thread stops.
+    assert writer.close(timeout_seconds=10.0)
+    with get_connection() as conn:
+        rows = conn.execute("SELECT COUNT(*) AS n FROM write_behind_check").fetchall()
+    assert int(rows[0]["n"]) == 25
+    stats = writer.stats()
+    assert stats["written"] == 25 and stats["pending"] == 0 and stats["failed"] == 0, stats
+
+    # After close, writes go straight to the database instead of a queue nobody drains.
+    writer.submit_insert("INSERT INTO write_behind_check (id, note) VALUES (?, ?)", (25, "late"))
+    with get_connection() as conn:
+        rows = conn.execute("SELECT COUNT(*) AS n FROM write_behind_check").fetchall()
+    assert int(rows[0]["n"]) == 26
+    assert writer.stats()["sync_writes"] == 1
+
+
+def run() -> None:
+    with _fresh_database():
+        _run_migration_checks()
+        _run_rate_limit_checks()
+        _run_write_behind_checks()
+    print("PASS: storage tests")
+
+
+if __name__ == "__main__":
+    run()
@@ -1,12 +1,16 @@
 import argparse
 import json
 import logging
+import os
 import time
-from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import Any, Optional
 
 from app.providers.alphavantage import AlphaVantageClient
+from app.providers.bar_delta import bars_since, delta_start, load_stored_bars, merge_bars
+from app.providers.bar_series import BarSeries
+from app.providers.health import get_provider_health
+from app.providers.rate_limit import get_rate_limiter
 from app.providers.twelvedata import ProviderError, TwelveDataClient
 from app.services.basic_signal import compute_basic_signal
 from app.services.trade_signal import compute_trade_signal
@@ -17,40 +21,28 @@ from core.papertrading.engine import (
     ROTATE_N,
     PaperTradingEngine,
 )
+from core.repositories.instruments import canonical_instrument_id, register_instruments
+from core.repositories.latest_quotes import LatestQuotesRepository
 from core.repositories.paper_trading import PaperTradingRepository
-from core.storage.db import get_connection
+from core.storage.bar_archive import archive_enabled, get_bar_archive
+from core.storage.db import get_connection, init_db
+from core.storage.write_behind import close_write_behind, get_write_behind
+from ingestion.repository import PRICE_BAR_COLUMNS, PRICE_BAR_CONFLICT_COLUMNS
 
 logger = logging.getLogger(__name__)
 
+_INSERT_QUOTE_EVENT_SQL = """
+INSERT INTO events (event_type, source, payload, symbol)
+VALUES (?, ?, ?, ?)
+"""
+_INSERT_SIGNAL_SQL = """
+INSERT INTO signals (symbol, timeframe, score, payload)
+VALUES (?, ?, ?, ?)
+"""
 
-@dataclass
-class ProviderState:
-    failures: int = 0
-    next_retry_at: float = 0.0
-    circuit_open_until: float = 0.0
-
-    def can_attempt(self, now: float) -> bool:
-        return now >= self.next_retry_at and now >= self.circuit_open_until
-
-    def record_success(self) -> None:
-        self.failures = 0
-        self.next_retry_at = 0.0
-        self.circuit_open_until = 0.0
-
-    def record_failure(
-        self,
-        now: float,
-        *,
-        base_backoff_seconds: int,
-        max_backoff_seconds: int,
-        circuit_failures: int,
-        circuit_seconds: int,
-    ) -> None:
-        self.failures += 1
-        backoff = min(max_backoff_seconds, base_backoff_seconds * (2 ** (self.failures - 1)))
-        self.next_retry_at = now + backoff
-        if self.failures >= circuit_failures:
-            self.circuit_open_until = now + circuit_seconds
+# Same per-minute defaults as the API selector; the buckets are shared, so both draw on one budget.
+_PROVIDER_MINUTE_LIMITS = {"twelvedata": 20, "alphavantage": 5}
+_PROVIDER_CALLS_DAY_LIMIT = 10000
 
 
 class MarketPoller:
@@ -65,8 +57,10 @@ class MarketPoller:
         backoff_max_seconds: int = 300,
         circuit_failures: int = 3,
         circuit_seconds: int = 60,
+        rate_limit_wait_seconds: float = 5.0,
     ) -> None:
         self.poll_interval_seconds = poll_interval_seconds
+        self.rate_limit_wait_seconds = rate_limit_wait_seconds
         self.bars_interval = bars_interval
         self.bars_outputsize = bars_outputsize
         self.bars_cache_ttl_seconds = bars_cache_ttl_seconds
@@ -76,11 +70,11 @@ class MarketPoller:
         self.circuit_failures = circuit_failures
         self.circuit_seconds = circuit_seconds
 
-        self._provider_states: dict[str, ProviderState] = {
-            "twelvedata": ProviderState(),
-            "alphavantage": ProviderState(),
-        }
+        # Backoff and circuit state live in the shared provider health registry, so the API and
+        # the poller agree on which providers are down.
+        self._provider_health = get_provider_health()
         self._provider_clients: dict[str, Any] = {}
+        self._latest_quotes_repo = LatestQuotesRepository()
 
         self._bars_cache: dict[str, dict[str, Any]] = {}
         self._last_prices_by_symbol: dict[str, float] = {}
@@ -160,7 +154,7 @@ class MarketPoller:
 
     def _poll_symbol(self, symbol: str) -> None:
         quote, quote_provider = self._fetch_quote(symbol)
-        bars, bars_provider = self._fetch_bars(symbol)
+        bars, fresh_bars, bars_provider = self._fetch_bars(symbol)
 
         if quote is not None and quote_provider is not None:
             self._persist_quote_event(symbol, quote_provider, quote)
@@ -172,7 +166,9 @@ class MarketPoller:
                 pass
 
         if bars is not None and bars_provider is not None:
-            self._persist_bars(bars)
+            # Only new bars and the re-fetched last one are written; older history is unchanged.
+            if fresh_bars:
+                self._persist_bars(fresh_bars)
             self._bars_cache[symbol] = {
                 "provider": bars_provider,
                 "cached_at": time.monotonic(),
@@ -204,57 +200,98 @@ class MarketPoller:
                 )
 
     def _fetch_quote(self, symbol: str):
-        now = time.monotonic()
         last_error: Optional[Exception] = None
 
         for provider_name in ("twelvedata", "alphavantage"):
-            state = self._provider_states[provider_name]
-            if not state.can_attempt(now):
+            if not self._provider_health.is_available(provider_name, "quote"):
+                continue
+
+            if not self._acquire_provider_call(provider_name, "quote"):
+                last_error = ProviderError(f"[RATE_LIMIT] {provider_name} quote local rate limit reached")
                 continue
 
             try:
                 client = self._get_provider_client(provider_name)
                 quote = client.fetch_quote(symbol=symbol)
-                state.record_success()
+                self._provider_health.record_success(provider_name, "quote")
                 logger.info("poller_quote_ok symbol=%s provider=%s", symbol, provider_name)
                 return quote, provider_name
             except Exception as exc:
                 last_error = exc
-                self._mark_provider_failure(provider_name, exc)
+                self._mark_provider_failure(provider_name, "quote", exc)
 
         if last_error is not None:
             raise last_error
         raise ProviderError("No quote provider available")
 
+    def _stored_bars(self, symbol: str) -> BarSeries:
+        cached = self._bars_cache.get(symbol)
+        if cached is not None:
+            return cached["bars"]
+        try:
+            return load_stored_bars(symbol, self.bars_interval, self.bars_outputsize)
+        except Exception as exc:
+            logger.warning("poller_stored_bars_failed symbol=%s error=%s", symbol, exc)
+            return BarSeries()
+
     def _fetch_bars(self, symbol: str):
-        now = time.monotonic()
+        # Returns (window, fresh, provider): fresh is only what the provider sent since the last
+        # stored bar, which is all that needs persisting.
         last_error: Optional[Exception] = None
+        stored = self._stored_bars(symbol)
+        start = delta_start(stored, self.bars_interval, self.bars_outputsize)
 
         for provider_name in ("twelvedata", "alphavantage"):
-            state = self._provider_states[provider_name]
-            if not state.can_attempt(now):
+            if not self._provider_health.is_available(provider_name, "bars"):
+                continue
+
+            if not self._acquire_provider_call(provider_name, "bars"):
+                last_error = ProviderError(f"[RATE_LIMIT] {provider_name} bars local rate limit reached")
                 continue
 
             try:
                 client = self._get_provider_client(provider_name)
-                bars = client.fetch_bars(
-                    symbol=symbol,
-                    interval=self.bars_interval,
-                    outputsize=self.bars_outputsize,
+                if provider_name == "twelvedata":
+                    result = client.fetch_bars(
+                        symbol=symbol,
+                        interval=self.bars_interval,
+                        outputsize=self.bars_outputsize,
+                        start=start,
+                    )
+                else:
+                    # Alpha Vantage has no range parameter; compact is its smallest response.
+                    result = client.fetch_bars(
+                        symbol=symbol,
+                        interval=self.bars_interval,
+                        outputsize=self.bars_outputsize,
+                    )
+                fresh = BarSeries.coerce(getattr(result, "bars", result))
+                if start is not None:
+                    fresh = bars_since(fresh, start, self.bars_interval)
+                    bars = merge_bars(stored, fresh, self.bars_interval)[-self.bars_outputsize:]
+                else:
+                    bars = fresh
+                if not bars:
+                    raise ProviderError(f"{provider_name} bars empty for {symbol}")
+                self._provider_health.record_success(provider_name, "bars")
+                logger.info(
+                    "poller_bars_ok symbol=%s provider=%s count=%s new=%s",
+                    symbol,
+                    provider_name,
+                    len(bars),
+                    len(fresh),
                 )
-                state.record_success()
-                logger.info("poller_bars_ok symbol=%s provider=%s count=%s", symbol, provider_name, len(bars))
-                return bars, provider_name
+                return bars, fresh, provider_name
             except Exception as exc:
                 last_error = exc
-                self._mark_provider_failure(provider_name, exc)
+                self._mark_provider_failure(provider_name, "bars", exc)
 
         cached = self._bars_cache.get(symbol)
         if cached is not None:
             age = time.monotonic() - float(cached["cached_at"])
             if age <= self.bars_cache_ttl_seconds:
                 logger.info("poller_bars_cache_hit symbol=%s age_s=%.1f", symbol, age)
-                return cached["bars"], str(cached["provider"])
+                return cached["bars"], BarSeries(), str(cached["provider"])
 
         if last_error is not None:
             raise last_error
@@ -266,23 +303,21 @@ class MarketPoller:
             return None
 
         bars = cached["bars"]
-        bars_payload = [bar.model_dump(mode="json") if hasattr(bar, "model_dump") else bar for bar in bars]
-        if not bars_payload:
+        if not bars:
             return None
 
-        return compute_basic_signal(bars_payload)
+        return compute_basic_signal(bars)
 
     def _compute_trade_from_cached_bars(self, symbol: str, provider_used: str) -> Optional[dict[str, Any]]:
         cached = self._bars_cache.get(symbol)
         if cached is None:
             return None
         bars = cached["bars"]
-        bars_payload = [bar.model_dump(mode="json") if hasattr(bar, "model_dump") else bar for bar in bars]
-        if not bars_payload:
+        if not bars:
             return None
         try:
             return compute_trade_signal(
-                bars_payload,
+                bars,
                 symbol=symbol,
                 provider_used=provider_used,
                 timeframe=self.bars_interval,
@@ -318,24 +353,38 @@ class MarketPoller:
         except Exception:
             return
 
-    def _mark_provider_failure(self, provider_name: str, exc: Exception) -> None:
-        now = time.monotonic()
-        state = self._provider_states[provider_name]
-        state.record_failure(
-            now,
+    def _acquire_provider_call(self, provider_name: str, kind: str) -> bool:
+        # Waits briefly for a shared token instead of failing over at once; a denial is not a
+        # provider fault, so it does not feed the backoff/circuit state.
+        limit = _PROVIDER_MINUTE_LIMITS.get(provider_name, 20)
+        raw = os.getenv("PROVIDER_CALLS_PER_MINUTE_LIMIT", "").strip()
+        if raw:
+            try:
+                limit = max(1, int(raw))
+            except ValueError:
+                pass
+        wait = min(self.rate_limit_wait_seconds, max(0.0, self.poll_interval_seconds / 2))
+        acquired = get_rate_limiter().acquire(
+            f"{provider_name}:{kind}",
+            per_minute=limit,
+            per_day=_PROVIDER_CALLS_DAY_LIMIT,
+            timeout_seconds=wait,
+        )
+        if not acquired:
+            logger.warning("poller_rate_limited provider=%s kind=%s", provider_name, kind)
+        return acquired
+
+    def _mark_provider_failure(self, provider_name: str, kind: str, exc: Exception) -> None:
+        self._provider_health.record_error(
+            provider_name,
+            kind,
+            exc,
             base_backoff_seconds=self.backoff_base_seconds,
             max_backoff_seconds=self.backoff_max_seconds,
             circuit_failures=self.circuit_failures,
             circuit_seconds=self.circuit_seconds,
         )
-        logger.warning(
-            "poller_provider_fail provider=%s failures=%s next_retry_in_s=%.1f circuit_open_for_s=%.1f error=%s",
-            provider_name,
-            state.failures,
-            max(0.0, state.next_retry_at - now),
-            max(0.0, state.circuit_open_until - now),
-            exc,
-        )
+        logger.warning("poller_provider_fail provider=%s kind=%s error=%s", provider_name, kind, exc)
 
     def _get_provider_client(self, provider_name: str):
         if provider_name in self._provider_clients:
@@ -388,87 +437,58 @@ class MarketPoller:
             "quote": quote.model_dump(mode="json") if hasattr(quote, "model_dump") else quote,
             "recorded_at": datetime.now(timezone.utc).isoformat(),
         }
+        get_write_behind().submit_insert(
+            _INSERT_QUOTE_EVENT_SQL,
+            ("worker.quote", provider, json.dumps(payload), symbol.upper()),
+        )
+        self._latest_quotes_repo.upsert(symbol, provider, payload["quote"], deferred=True)
+
+    def _persist_bars(self, bars: BarSeries) -> None:
+        # One series is one instrument from one provider, so provenance is resolved once.
+        instrument_id = canonical_instrument_id(bars.instrument_id)
+        source = bars.source_provider or "unknown"
+        ts_ingest = bars.ts_ingest.isoformat() if isinstance(bars.ts_ingest, datetime) else bars.ts_ingest
+        rows = [
+            (
+                instrument_id,
+                self.bars_interval,
+                datetime.fromtimestamp(ts, tz=timezone.utc).isoformat(),
+                ts_ingest,
+                open_,
+                high,
+                low,
+                close,
+                volume or 0.0,
+                source,
+                "[]",
+            )
+            for ts, open_, high, low, close, volume in bars.records()
+        ]
         with get_connection() as conn:
-            conn.execute(
-                """
-                INSERT INTO events (event_type, source, payload)
-                VALUES (?, ?, ?)
-                """,
-                ("worker.quote", provider, json.dumps(payload)),
+            register_instruments(conn, [(bars.instrument_id, source)])
+            conn.bulk_upsert(
+                "canonical_price_bars",
+                PRICE_BAR_COLUMNS,
+                rows,
+                conflict_columns=PRICE_BAR_CONFLICT_COLUMNS,
             )
+        self._append_bar_archive(instrument_id, bars)
 
-    def _persist_bars(self, bars: list[Any]) -> None:
-        with get_connection() as conn:
-            for bar in bars:
-                instrument_id = getattr(bar, "instrument_id", None)
-                ts_event = getattr(bar, "ts_event", None)
-                ts_ingest = getattr(bar, "ts_ingest", None)
-                quality_flags = getattr(bar, "quality_flags", [])
-
-                if conn.backend == "postgres":
-                    conn.execute(
-                        """
-                        INSERT INTO canonical_price_bars (
-                            instrument_id, timeframe, ts_event, ts_ingest,
-                            open, high, low, close, volume, source_provider, quality_flags
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        ON CONFLICT (instrument_id, timeframe, ts_event) DO UPDATE SET
-                            ts_ingest = EXCLUDED.ts_ingest,
-                            open = EXCLUDED.open,
-                            high = EXCLUDED.high,
-                            low = EXCLUDED.low,
-                            close = EXCLUDED.close,
-                            volume = EXCLUDED.volume,
-                            source_provider = EXCLUDED.source_provider,
-                            quality_flags = EXCLUDED.quality_flags
-                        """,
-                        (
-                            instrument_id,
-                            self.bars_interval,
-                            ts_event.isoformat() if ts_event else None,
-                            ts_ingest.isoformat() if ts_ingest else None,
-                            float(getattr(bar, "open", 0)),
-                            float(getattr(bar, "high", 0)),
-                            float(getattr(bar, "low", 0)),
-                            float(getattr(bar, "close", 0)),
-                            float(getattr(bar, "volume", 0)),
-                            getattr(bar, "source_provider", "unknown"),
-                            json.dumps(list(quality_flags or [])),
-                        ),
-                    )
-                else:
-                    conn.execute(
-                        """
-                        INSERT OR REPLACE INTO canonical_price_bars (
-                            instrument_id, timeframe, ts_event, ts_ingest,
-                            open, high, low, close, volume, source_provider, quality_flags
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        """,
-                        (
-                            instrument_id,
-                            self.bars_interval,
-                            ts_event.isoformat() if ts_event else None,
-                            ts_ingest.isoformat() if ts_ingest else None,
-                            float(getattr(bar, "open", 0)),
-                            float(getattr(bar, "high", 0)),
-                            float(getattr(bar, "low", 0)),
-                            float(getattr(bar, "close", 0)),
-                            float(getattr(bar, "volume", 0)),
-                            getattr(bar, "source_provider", "unknown"),
-                            json.dumps(list(quality_flags or [])),
-                        ),
-                    )
+    def _append_bar_archive(self, instrument_id: str, bars: BarSeries) -> None:
+        if not archive_enabled():
+            return
+        try:
+            appended = get_bar_archive().append(instrument_id, self.bars_interval, bars)
+            logger.debug("poller_bar_archive_append instrument=%s appended=%s", instrument_id, appended)
+        except OSError as exc:
+            logger.warning("poller_bar_archive_append_failed instrument=%s error=%s", instrument_id, exc)
 
     def _persist_signal(self, symbol: str, signal_payload: dict[str, Any]) -> None:
         score = float(signal_payload.get("score", 0) or 0)
-        with get_connection() as conn:
-            conn.execute(
-                """
-                INSERT INTO signals (symbol, timeframe, score, payload)
-                VALUES (?, ?, ?, ?)
-                """,
-                (symbol, self.bars_interval, score, json.dumps(signal_payload)),
-            )
+        get_write_behind().submit_insert(
+            _INSERT_SIGNAL_SQL,
+            (symbol, self.bars_interval, score, json.dumps(signal_payload)),
+        )
 
 
 def _configure_logging(debug: bool) -> None:
@@ -487,12 +507,16 @@ def main() -> None:
     args = parser.parse_args()
 
     _configure_logging(args.debug)
+    init_db()
     poller = MarketPoller(poll_interval_seconds=args.interval)
 
-    if args.once:
-        poller.run_once()
-        return
-    poller.run_forever()
+    try:
+        if args.once:
+            poller.run_once()
+            return
+        poller.run_forever()
+    finally:
+        close_write_behind()
 
 
 if __name__ == "__main__":